@@ -0,0 +1,248 @@
+'''
+    Columnar export of hand history actions to NumPy
+
+    The tokens of every hand accepted by hhnative.HandParser go straight
+    into array.array columns, one row per action (blind posts and shows
+    included), without building Hand records or trees. Player names and
+    table names are dictionary encoded to ints. Whenever a chunk holds
+    chunk_rows actions it is written as chunk-NNNNN.npz with two
+    structured arrays, actions (ACTION_DTYPE) and hands (HAND_DTYPE), so
+    memory stays bounded by the chunk size; dictionaries.npz holds the
+    players and tables by id. load() reads a directory back.
+
+    The columns are filled from hhnative line tokens, not from the records
+    of hhparser_lalr: a Lark tree per hand would cost more than the export
+    itself, and hhnative accepts the same hands.
+
+    usage: python hhcolumns.py [-o DIRECTORY] [--chunk-rows ROWS] file...
+'''
+import argparse
+import glob
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from hhnative import HandParser, LineToken
+
+STREETS = ('preflop', 'flop', 'turn', 'river')
+ACTIONS = ('posts', 'straddles', 'folds', 'checks', 'calls', 'bets', 'raises', 'shows')
+
+# seat is 0 for a player without a seat line, amount is NaN without an amount
+ACTION_DTYPE = np.dtype([('hand', '<i8'), ('street', 'u1'), ('seat', 'u1'), ('action', 'u1'),
+                         ('amount', '<f8'), ('allin', '?'), ('player', '<i4')])
+HAND_DTYPE = np.dtype([('hand', '<i8'), ('table', '<i4'), ('button', 'u1'), ('seats', 'u1')])
+
+# the array.array typecode of every column
+_ACTION_CODES = {'hand': 'q', 'street': 'B', 'seat': 'B', 'action': 'B',
+                 'amount': 'd', 'allin': 'B', 'player': 'i'}
+_HAND_CODES = {'hand': 'q', 'table': 'i', 'button': 'B', 'seats': 'B'}
+
+_STREET_CODES = {'HOLE': 0, 'FLOP': 1, 'TURN': 2, 'RIVER': 3}
+_ACTION_KINDS = {'POST': 0, 'STRADDLE': 1, 'FOLD': 2, 'CHECK': 3, 'CALL': 4, 'BET': 5,
+                 'RAISE': 6, 'SHOW': 7}
+_NAN = float('nan')
+
+class Dictionary:
+    '''
+        Dictionary encoding of strings to dense ints, in order of first use
+    '''
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: list[str] = []
+        self.ids: dict[str, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        '''
+            the id of value, numbering it if it is new
+        '''
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+def _amount(text: Optional[str]) -> float:
+    if text is None:
+        return _NAN
+    try:
+        return float(text.replace(',', ''))
+    except ValueError:
+        return _NAN
+
+class ColumnarWriter:
+    '''
+        Writes the actions of hands to a directory of .npz chunks.
+        Use it as a context manager or call close() to write the last
+        chunk and the dictionaries.
+            compress = np.savez_compressed instead of np.savez
+    '''
+    def __init__(self, directory: str, chunk_rows: int = 1 << 20, compress: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.players = Dictionary()
+        self.tables = Dictionary()
+        self.chunks = 0
+        self.rows = 0
+        self.hands = 0
+        self._save = np.savez_compressed if compress else np.savez
+        self._actions = {name: array(code) for name, code in _ACTION_CODES.items()}
+        self._hands = {name: array(code) for name, code in _HAND_CODES.items()}
+
+    def add(self, tokens: list[LineToken]): # pylint: disable=too-many-locals
+        '''
+            appends the actions of the tokens of one accepted hand
+        '''
+        columns = self._actions
+        hand_column, street_column = columns['hand'], columns['street']
+        seat_column, action_column = columns['seat'], columns['action']
+        amount_column, allin_column = columns['amount'], columns['allin']
+        player_column = columns['player']
+        encode = self.players.encode
+
+        number = int(tokens[0].fields[0])
+        seats: dict[str, int] = {}
+        table, button = -1, 0
+        street = 0
+        in_summary = False
+        for token in tokens:
+            kind = token.value
+            fields = token.fields
+            action = _ACTION_KINDS.get(kind) # type: ignore
+            if action is not None:
+                if action <= 1:
+                    # posts the small blind 1
+                    amount = _amount(fields[2].rsplit(' ', 1)[-1])
+                else:
+                    amount = _amount(fields[5])
+                player = fields[0]
+                hand_column.append(number)
+                street_column.append(street)
+                seat_column.append(seats.get(player, 0))
+                action_column.append(action)
+                amount_column.append(amount)
+                allin_column.append(fields[6] is not None if 2 <= action <= 6 else 0)
+                player_column.append(encode(player))
+            elif kind == 'SEAT':
+                if not in_summary:
+                    seats[fields[1]] = int(fields[0])
+            elif kind in _STREET_CODES:
+                street = _STREET_CODES[kind] # type: ignore
+            elif kind == 'TABLE':
+                table, button = self.tables.encode(fields[0]), int(fields[1])
+            elif kind == 'SUMMARY':
+                in_summary = True
+        hands = self._hands
+        hands['hand'].append(number)
+        hands['table'].append(table)
+        hands['button'].append(button)
+        hands['seats'].append(len(seats))
+        self.hands += 1
+        if len(hand_column) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        '''
+            writes the rows collected so far as the next chunk
+        '''
+        if not self._hands['hand']:
+            return
+        actions = _structured(self._actions, ACTION_DTYPE)
+        hands = _structured(self._hands, HAND_DTYPE)
+        self._save(os.path.join(self.directory, f'chunk-{self.chunks:05d}.npz'),
+                   actions=actions, hands=hands)
+        self.rows += len(actions)
+        self.chunks += 1
+        for column in (*self._actions.values(), *self._hands.values()):
+            del column[:]
+
+    def close(self):
+        '''
+            writes the last chunk and the dictionaries
+        '''
+        self.flush()
+        self._save(os.path.join(self.directory, 'dictionaries.npz'),
+                   players=np.array(self.players.values, dtype=str),
+                   tables=np.array(self.tables.values, dtype=str))
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _structured(columns: dict[str, array], dtype: np.dtype) -> np.ndarray:
+    result = np.empty(len(next(iter(columns.values()))), dtype=dtype)
+    for name, column in columns.items():
+        result[name] = np.frombuffer(column, dtype=np.dtype(column.typecode))
+    return result
+
+@dataclass
+class Columns:
+    '''
+        Data class to hold an export read back
+            actions = ACTION_DTYPE rows, hands = HAND_DTYPE rows
+            players, tables = names by id
+    '''
+    actions: np.ndarray
+    hands: np.ndarray
+    players: np.ndarray
+    tables: np.ndarray
+
+def export(lines: Iterable[str], directory: str, chunk_rows: int = 1 << 20,
+           compress: bool = False) -> ColumnarWriter:
+    '''
+        parses lines and writes their actions to directory, returns the
+        closed writer for its counts
+    '''
+    parser = HandParser()
+    with ColumnarWriter(directory, chunk_rows, compress) as writer:
+        for tokens in parser.token_records(lines):
+            writer.add(tokens)
+    return writer
+
+def iter_chunks(directory: str) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    '''
+        Generator of the (actions, hands) of every chunk, in order
+    '''
+    for filename in sorted(glob.glob(os.path.join(directory, 'chunk-*.npz'))):
+        with np.load(filename) as chunk:
+            yield chunk['actions'], chunk['hands']
+
+def load(directory: str) -> Columns:
+    '''
+        reads a whole export back into memory
+    '''
+    chunks = list(iter_chunks(directory))
+    with np.load(os.path.join(directory, 'dictionaries.npz')) as dictionaries:
+        players, tables = dictionaries['players'], dictionaries['tables']
+    if not chunks:
+        return Columns(np.empty(0, ACTION_DTYPE), np.empty(0, HAND_DTYPE), players, tables)
+    return Columns(np.concatenate([actions for actions, _ in chunks]),
+                   np.concatenate([hands for _, hands in chunks]), players, tables)
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('files', nargs='+')
+    argparser.add_argument('-o', '--output', default='columns')
+    argparser.add_argument('--chunk-rows', type=int, default=1 << 20)
+    argparser.add_argument('--compress', action='store_true')
+    args = argparser.parse_args()
+
+    def all_lines():
+        for filename in args.files:
+            with open(filename, 'r', encoding='utf-8') as file:
+                yield from file
+                yield '\n'
+
+    written = export(all_lines(), args.output, args.chunk_rows, args.compress)
+    print(f'{written.hands} hands, {written.rows} actions, {written.chunks} chunks, '
+          f'{len(written.players)} players, {len(written.tables)} tables -> {args.output}')
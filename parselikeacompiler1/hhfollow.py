@@ -0,0 +1,173 @@
+'''
+    Follow mode for hand history files that poker clients keep appending to
+
+    HandFollower remembers the byte offset right after the last hand it
+    parsed. Each poll stats the file and, only when it grew, reads the
+    bytes from that offset on and parses the hands that are complete. A
+    hand is complete once the next hand header follows it, or a blank
+    line does; a trailing hand without either is held back and read
+    again on the next poll. Idle polls cost one stat, so following a
+    file at a fraction of a second latency takes next to no CPU.
+
+    A file that shrank or was replaced by another one (new inode) is
+    followed again from its start. A malformed hand is logged and
+    skipped, the hands around it are still parsed.
+
+    usage: python hhfollow.py [--interval SECONDS] [--from-start] FILE
+'''
+import argparse
+import logging
+import os
+import re
+import time
+from typing import Callable, Iterator, Optional
+
+from hhnative import Hand, HandParser
+
+HEADER = re.compile(rb'^#\d+:', re.MULTILINE)
+BLANK_END = re.compile(rb'\n[ \t\r]*\n\s*$')
+
+_log = logging.getLogger(__name__)
+
+class HandFollower:
+    '''
+        Parses the hands appended to the file at path
+            offset = byte offset where the next unparsed hand starts,
+                     keep it to resume following later
+            inode, size = of the file when it was last read, keep them
+                          with offset to notice a replaced file on resume
+    '''
+    def __init__(self, path: str, offset: int = 0, # pylint: disable=too-many-arguments
+                 parser: Optional[HandParser] = None,
+                 inode: Optional[int] = None, size: int = -1):
+        self.path = path
+        self.offset = offset
+        self._parser = parser or HandParser()
+        self._inode = inode
+        self._size = size
+
+    @property
+    def inode(self) -> Optional[int]:
+        '''
+            the inode of the file when it was last read, None before
+        '''
+        return self._inode
+
+    @property
+    def size(self) -> int:
+        '''
+            the size of the file when it was last read, -1 before
+        '''
+        return self._size
+
+    def poll(self, final: bool = False) -> list[Hand]:
+        '''
+            the Hands completed since the last poll. With final the file
+            is taken as finished and a trailing hand is parsed too.
+        '''
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if self._inode is not None and stat.st_ino != self._inode \
+                or stat.st_size < max(self.offset, self._size):
+            self.offset = 0
+            self._size = -1
+        self._inode = stat.st_ino
+        if stat.st_size == self._size and not final:
+            return []
+        self._size = stat.st_size
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read()
+        end = len(data) if final else complete_end(data)
+        if not data[:end].strip():
+            return []
+        try:
+            hands = list(self._parser.parse(data[:end].decode().splitlines()))
+        except (MemoryError, RecursionError):
+            raise
+        except Exception: # pylint: disable=broad-except
+            hands = self._parse_each(data[:end])
+        self.offset += end
+        return hands
+
+    def _parse_each(self, data: bytes) -> list[Hand]:
+        '''
+            the hands of data parsed one by one, skipping the malformed ones
+        '''
+        starts = [match.start() for match in HEADER.finditer(data)]
+        if not starts or starts[0]:
+            starts.insert(0, 0)
+        hands = []
+        for start, stop in zip(starts, starts[1:] + [len(data)]):
+            try:
+                hands.extend(self._parser.parse(data[start:stop].decode().splitlines()))
+            except (MemoryError, RecursionError):
+                raise
+            except Exception as error: # pylint: disable=broad-except
+                _log.warning('%s: skipping the malformed hand at byte %d: %s',
+                             self.path, self.offset + start, error)
+        return hands
+
+    def follow(self, interval: float = 0.25,
+               stop: Optional[Callable[[], bool]] = None) -> Iterator[Hand]:
+        '''
+            Generator of the hands completed from now on, polling every
+            interval seconds until stop() returns True
+        '''
+        while stop is None or not stop():
+            yield from self.poll()
+            time.sleep(interval)
+
+def complete_end(data: bytes) -> int:
+    '''
+        the length of the part of data made of complete hands
+    '''
+    if BLANK_END.search(data):
+        return len(data)
+    last = None
+    for last in HEADER.finditer(data):
+        pass
+    return 0 if last is None else last.start()
+
+def end_offset(path: str, window: int = 1 << 16) -> int:
+    '''
+        the offset of path right after its last complete hand, found in
+        its last window bytes when they hold a hand boundary
+    '''
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        start = max(0, size - window)
+        file.seek(start)
+        tail = file.read()
+        end = complete_end(tail)
+        if end or not start:
+            return start + end
+        file.seek(0)
+        return complete_end(file.read())
+
+def follow(path: str, callback: Callable[[Hand], None], interval: float = 0.25,
+           from_start: bool = False, stop: Optional[Callable[[], bool]] = None):
+    '''
+        calls callback with every hand appended to path, and with the
+        hands already there when from_start is set
+    '''
+    offset = 0 if from_start or not os.path.exists(path) else end_offset(path)
+    for hand in HandFollower(path, offset).follow(interval, stop):
+        callback(hand)
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('file')
+    argparser.add_argument('--interval', type=float, default=0.25)
+    argparser.add_argument('--from-start', action='store_true')
+    args = argparser.parse_args()
+    try:
+        follow(args.file, lambda hand: print(f'#{hand.number} {hand.when} '
+                                             f'{", ".join(w.player for w in hand.winners)}',
+                                             flush=True),
+               args.interval, args.from_start)
+    except KeyboardInterrupt:
+        pass
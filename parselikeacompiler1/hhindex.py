@@ -0,0 +1,232 @@
+'''
+    Byte offset index of the hands of a hand history file
+
+    The index maps a hand number to the byte offset and length of its
+    text. It is built with one pass over the file through mmap that only
+    looks at '#NNN:' header lines, and is kept next to the file as
+    FILE.idx. When the file grew since, only the bytes from the last
+    indexed hand on are scanned again (the last hand may have been
+    incomplete). If the file shrank or the last indexed bytes changed,
+    the file was rewritten and the index is rebuilt; edits in place that
+    keep the size are not detected. A hand or a range of hands is then
+    read with one seek each and parsed on its own.
+
+    usage: python hhindex.py FILE [HAND [LAST]]
+        prints the hand HAND, or the hands HAND to LAST, of FILE
+'''
+import argparse
+import bisect
+import mmap
+import os
+import re
+import struct
+import zlib
+from array import array
+from typing import Iterator, Optional
+
+from hhnative import Hand, HandParser
+
+HEADER = re.compile(rb'^#(\d+):', re.MULTILINE)
+
+# magic, indexed bytes, crc32 of the tail of the indexed bytes, hands
+_FILE_HEADER = struct.Struct('<8sQIQ')
+_MAGIC = b'HHIDX001'
+_TAIL = 64
+
+class HandIndex:
+    '''
+        Index of the hands of the file at path, in file order
+            numbers, offsets, lengths = per hand
+            covered = number of bytes of the file indexed
+        A hand number seen twice keeps its first position.
+    '''
+    def __init__(self, path: str):
+        self.path = path
+        self.numbers = array('q')
+        self.offsets = array('Q')
+        self.lengths = array('Q')
+        self.covered = 0
+        self._tail = 0
+        self._positions: dict[int, int] = {}
+        self._sorted: Optional[list[int]] = None
+        self._parser: Optional[HandParser] = None
+
+    @property
+    def index_path(self) -> str:
+        '''
+            where the index is kept
+        '''
+        return self.path + '.idx'
+
+    @staticmethod
+    def open(path: str) -> 'HandIndex':
+        '''
+            the index of path, read from its index file when there is a
+            valid one, brought up to date and saved when it changed
+        '''
+        index = HandIndex(path)
+        if not index._load():
+            index._reset()
+        if index.update():
+            index.save()
+        return index
+
+    def _reset(self):
+        for column in (self.numbers, self.offsets, self.lengths):
+            del column[:]
+        self.covered = 0
+        self._tail = 0
+        self._positions.clear()
+        self._sorted = None
+
+    def _tail_crc(self, buffer, end: int) -> int:
+        return zlib.crc32(buffer[max(0, end - _TAIL):end])
+
+    def update(self) -> int:
+        '''
+            indexes what was appended to the file since the last update
+            and returns the number of hands added. Rebuilds the whole
+            index when the indexed bytes changed.
+        '''
+        size = os.path.getsize(self.path)
+        if size == self.covered:
+            return 0
+        with open(self.path, 'rb') as file:
+            if size == 0:
+                self._reset()
+                return 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if size < self.covered or self._tail_crc(buffer, self.covered) != self._tail:
+                    self._reset()
+                before = len(self.numbers)
+                start = 0
+                if self.numbers:
+                    # the last hand may have been cut short, scan it again
+                    start = self.offsets[-1]
+                    self._drop_last()
+                for match in HEADER.finditer(buffer, start): # type: ignore
+                    self._add(int(match.group(1)), match.start())
+                if self.lengths:
+                    self.lengths[-1] = size - self.offsets[-1]
+                self.covered = size
+                self._tail = self._tail_crc(buffer, size)
+        self._sorted = None
+        return len(self.numbers) - before
+
+    def _drop_last(self):
+        number = self.numbers.pop()
+        self.offsets.pop()
+        self.lengths.pop()
+        if self._positions.get(number) == len(self.numbers):
+            del self._positions[number]
+
+    def _add(self, number: int, offset: int):
+        if self.offsets:
+            self.lengths[-1] = offset - self.offsets[-1]
+        self._positions.setdefault(number, len(self.numbers))
+        self.numbers.append(number)
+        self.offsets.append(offset)
+        self.lengths.append(0)
+
+    def save(self):
+        '''
+            writes the index file, replacing the old one at once
+        '''
+        temporary = self.index_path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(_FILE_HEADER.pack(_MAGIC, self.covered, self._tail, len(self.numbers)))
+            for column in (self.numbers, self.offsets, self.lengths):
+                column.tofile(file)
+        os.replace(temporary, self.index_path)
+
+    def _load(self) -> bool:
+        '''
+            reads the index file, False when there is none or it is not
+            an index
+        '''
+        try:
+            with open(self.index_path, 'rb') as file:
+                magic, covered, tail, count = _FILE_HEADER.unpack(file.read(_FILE_HEADER.size))
+                if magic != _MAGIC:
+                    return False
+                for column in (self.numbers, self.offsets, self.lengths):
+                    column.fromfile(file, count)
+        except (OSError, struct.error, EOFError, ValueError):
+            self._reset()
+            return False
+        self.covered, self._tail = covered, tail
+        for position, number in enumerate(self.numbers):
+            self._positions.setdefault(number, position)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __contains__(self, number: int) -> bool:
+        return number in self._positions
+
+    def locate(self, number: int) -> tuple[int, int]:
+        '''
+            the (byte offset, length) of hand number
+        '''
+        position = self._positions.get(number)
+        if position is None:
+            raise Exception(f'Hand #{number} is not in {self.path}')
+        return self.offsets[position], self.lengths[position]
+
+    def read(self, number: int) -> str:
+        '''
+            the text of hand number
+        '''
+        offset, length = self.locate(number)
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            return file.read(length).decode()
+
+    def read_range(self, first: int, last: int) -> Iterator[str]:
+        '''
+            Generator of the texts of the hands numbered first to last,
+            both included, in number order
+        '''
+        if self._sorted is None:
+            self._sorted = sorted(self._positions)
+        start = bisect.bisect_left(self._sorted, first)
+        stop = bisect.bisect_right(self._sorted, last)
+        with open(self.path, 'rb') as file:
+            for number in self._sorted[start:stop]:
+                offset, length = self.locate(number)
+                file.seek(offset)
+                yield file.read(length).decode()
+
+    def parse(self, number: int) -> Hand:
+        '''
+            the Hand record of hand number
+        '''
+        if self._parser is None:
+            self._parser = HandParser()
+        return next(self._parser.parse(self.read(number).splitlines()))
+
+    def parse_range(self, first: int, last: int) -> Iterator[Hand]:
+        '''
+            Generator of the Hand records of the hands numbered first to
+            last, both included, in number order
+        '''
+        if self._parser is None:
+            self._parser = HandParser()
+        for text in self.read_range(first, last):
+            yield from self._parser.parse(text.splitlines())
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('file')
+    argparser.add_argument('hand', type=int, nargs='?')
+    argparser.add_argument('last', type=int, nargs='?')
+    args = argparser.parse_args()
+    hand_index = HandIndex.open(args.file)
+    if args.hand is None:
+        print(f'{len(hand_index)} hands, {hand_index.covered} bytes indexed')
+    else:
+        for hand_text in hand_index.read_range(args.hand, args.hand if args.last is None
+                                                          else args.last):
+            print(hand_text, end='')
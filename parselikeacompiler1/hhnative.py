@@ -0,0 +1,383 @@
+'''
+    Streaming hand history parser on the parsers package
+    (pip install -e ../parsers)
+
+    hhparser_lalr.py has Lark tokenize every line into words and build a
+    generic Tree of the whole file. Every line of a hand history is one
+    of a few fixed shapes, so here a line is one token: the lexer
+    classifies it by its first characters and one regex, and keeps the
+    captured fields on the token. The LL(1) parser checks the order of
+    the lines against HAND_GRAMMAR, one hand at a time through
+    LLParser.parse_records, and each accepted hand is built into a typed
+    Hand record right away. Memory is bounded by the largest hand.
+
+    The grammar is the one of hhparser_lalr.py with lines as terminals.
+    Player names are anything up to the action, where Lark only knows
+    foo, bar, foobar and Mr Foo.
+
+    usage: python hhnative.py [--check] [--bench COPIES] file...
+        --check   compares the records with those hhstream.py builds
+                  with the hhparser_lalr.py grammar
+        --bench   times both parsers over COPIES copies of the files
+'''
+import argparse
+import re
+from dataclasses import astuple, dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from parsers import Grammar, LLParser, Token, TokenType, create_grammar
+
+# one production per line: terminals are upper case, X* X+ X? repeat X,
+# e is ε and the first nonterminal is the start
+HAND_GRAMMAR = '''
+    hand : HEADER WHEN TABLE SEAT* post* HOLE DEAL* action* flop turn river BOARD* summary
+    post : POST
+    post : STRADDLE
+    action : FOLD
+    action : RAISE
+    action : BET
+    action : CALL
+    action : CHECK
+    action : SHOW
+    flop : FLOP action*
+    flop : e
+    turn : TURN action*
+    turn : e
+    river : RIVER action*
+    river : e
+    summary : SUMMARY SEAT+ winner SHOW*
+    winner : WIN
+    winner : SPLITWIN*
+'''
+
+@dataclass(slots=True)
+class Seat:
+    '''
+        a seat line, of the hand or of its summary
+            change = signed amount won or lost, summary lines only
+    '''
+    seat: int
+    player: str
+    stack: float
+    change: Optional[float] = None
+
+@dataclass(slots=True)
+class Post:
+    '''
+        a blind
+            kind = 'posts' or 'straddles'
+            what = the rest of the line, e.g. 'the small blind 1'
+    '''
+    player: str
+    kind: str
+    what: str
+
+@dataclass(slots=True)
+class Deal:
+    '''
+        the hole cards dealt to a player, X for unknown ones
+    '''
+    player: str
+    cards: str
+
+@dataclass(slots=True)
+class Action:
+    '''
+        a player action
+            kind = 'folds', 'checks', 'raises', 'bets', 'calls' or 'shows'
+            amount = chips raised to, bet or called
+            cards = the shown cards
+    '''
+    player: str
+    kind: str
+    amount: Optional[float] = None
+    allin: bool = False
+    cards: Optional[str] = None
+
+@dataclass(slots=True)
+class Street:
+    '''
+        a betting round
+            name = 'preflop', 'flop', 'turn' or 'river'
+            board = the cards before the round, card = the card it adds
+    '''
+    name: str
+    board: str = ''
+    card: str = ''
+    actions: list[Action] = field(default_factory=list)
+
+@dataclass(slots=True)
+class Board:
+    '''
+        a board of a run it more than once hand
+    '''
+    number: int
+    layout: str
+    cards: str
+
+@dataclass(slots=True)
+class Winner:
+    '''
+        a pot winner
+            split = won a split pot, source = the pot it came from
+    '''
+    player: str
+    amount: float
+    split: bool = False
+    source: Optional[str] = None
+
+@dataclass(slots=True)
+class Hand: # pylint: disable=too-many-instance-attributes
+    '''
+        a parsed hand history
+    '''
+    number: int
+    game: str
+    stakes: str
+    when: str = ''
+    table: str = ''
+    button: int = 0
+    seats: list[Seat] = field(default_factory=list)
+    posts: list[Post] = field(default_factory=list)
+    deals: list[Deal] = field(default_factory=list)
+    streets: list[Street] = field(default_factory=list)
+    boards: list[Board] = field(default_factory=list)
+    summary: list[Seat] = field(default_factory=list)
+    winners: list[Winner] = field(default_factory=list)
+    shows: list[Action] = field(default_factory=list)
+
+@dataclass
+class LineToken(Token):
+    '''
+        Token of a whole line: value is its kind, a terminal of
+        HAND_GRAMMAR, and fields what the line regex captured
+    '''
+    fields: tuple = ()
+
+_AMOUNT = r'(\d[\d,.]*)'
+_HEADER = re.compile(r'#(\d+):([\w ]+)-([\w ]+)/([\w ]+)$')
+_WHEN = re.compile(r'([\d\-: ]+)$')
+_TABLE = re.compile(r"Table '([\w ]+)' Seat (\d+) is the button$")
+# a player name is anything up to what follows it, as in _PLAYER
+_SEAT = re.compile(rf'Seat (\d+): (.+?) ?\({_AMOUNT}\)(?: ([+-]){_AMOUNT})?$')
+_DEAL = re.compile(r'Dealt to (.+?): \[([\w ]+)\]$')
+_STARS = re.compile(r'\*\*\* (?:(HOLE CARDS|SUMMARY)'
+                    r'|(FLOP) \*\*\* \[([\w ]+)'
+                    r'|(TURN|RIVER) \*\*\* \[([\w ]+)\] \[([\w ]+)'
+                    r'|BOARD (\d) - RIVER \*\*\* \[([\w \-]+)\] \[([\w ]+))(?: \*\*\*|\])$')
+_PLAYER = re.compile(r'(.+?)(?:'
+                     r': (posts|straddles) ([\w ]+)'
+                     r'| (folds|checks)'
+                     rf'| (raises to|bets|calls) {_AMOUNT}( and is all in)?'
+                     r'| shows \[([\w ]+)\]'
+                     rf'| wins pot \({_AMOUNT}\)'
+                     rf'| wins \({_AMOUNT}\)(?: from ([\w ]+))?'
+                     r')$')
+# _PLAYER group that is set -> kind
+_PLAYER_KINDS = ((1, None), (3, None), (4, None), (7, 'SHOW'), (8, 'WIN'), (9, 'SPLITWIN'))
+_VERBS = {'posts': 'POST', 'straddles': 'STRADDLE', 'folds': 'FOLD', 'checks': 'CHECK',
+          'raises to': 'RAISE', 'bets': 'BET', 'calls': 'CALL'}
+
+def hand_grammar() -> Grammar:
+    '''
+        the Grammar of HAND_GRAMMAR
+    '''
+    return create_grammar(HAND_GRAMMAR, epsilon='e')
+
+def _classify(line: str) -> Optional[LineToken]:
+    '''
+        the LineToken of a line, None when it has no known shape
+    '''
+    first = line[0]
+    if first == '#':
+        match = _HEADER.match(line)
+        return match and LineToken(TokenType.NAME, 'HEADER', match.groups())
+    if first == '*':
+        match = _STARS.match(line)
+        if match is None:
+            return None
+        groups = match.groups()
+        if groups[0]:
+            return LineToken(TokenType.NAME, 'HOLE' if groups[0] == 'HOLE CARDS' else 'SUMMARY')
+        if groups[1]:
+            return LineToken(TokenType.NAME, 'FLOP', (groups[2],))
+        if groups[3]:
+            return LineToken(TokenType.NAME, groups[3], groups[4:6])
+        return LineToken(TokenType.NAME, 'BOARD', groups[6:9])
+    if first.isdigit():
+        match = _WHEN.match(line)
+        return match and LineToken(TokenType.NAME, 'WHEN', match.groups())
+    if line.startswith('Seat '):
+        match = _SEAT.match(line)
+        if match:
+            return LineToken(TokenType.NAME, 'SEAT', match.groups())
+    elif line.startswith('Table '):
+        match = _TABLE.match(line)
+        if match:
+            return LineToken(TokenType.NAME, 'TABLE', match.groups())
+    elif line.startswith('Dealt to '):
+        match = _DEAL.match(line)
+        if match:
+            return LineToken(TokenType.NAME, 'DEAL', match.groups())
+    match = _PLAYER.match(line)
+    if match is None:
+        return None
+    groups = match.groups()
+    for group, kind in _PLAYER_KINDS:
+        if groups[group] is not None:
+            return LineToken(TokenType.NAME, kind or _VERBS[groups[group]], groups)
+    return None
+
+def line_tokens(lines: Iterable[str]) -> Iterator[Token]:
+    '''
+        Generator of the LineTokens of lines, with an EOF token after
+        every hand. Blank lines are skipped.
+    '''
+    started = False
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        token = _classify(line)
+        if token is None:
+            raise Exception(f'Unrecognized line {number}: {line!r}')
+        if token.value == 'HEADER' and started:
+            yield Token(TokenType.EOF, None)
+        started = True
+        yield token
+    yield Token(TokenType.EOF, None)
+
+def amount(text: str) -> float:
+    '''
+        the value of an amount such as 1,250.50
+    '''
+    return float(text.replace(',', ''))
+
+def build_hand(tokens: list[LineToken]) -> Hand:
+    '''
+        the Hand of the tokens of one accepted hand
+    '''
+    number, game, small, big = tokens[0].fields
+    hand = Hand(int(number), game.strip(), f'{small.strip()}/{big.strip()}')
+    street: Optional[Street] = None
+    in_summary = False
+    for token in tokens[1:]:
+        kind = token.value
+        fields = token.fields
+        if kind == 'SEAT':
+            seat = Seat(int(fields[0]), fields[1], amount(fields[2]))
+            if in_summary:
+                if fields[4] is not None:
+                    seat.change = amount(fields[4]) if fields[3] == '+' else -amount(fields[4])
+                hand.summary.append(seat)
+            else:
+                hand.seats.append(seat)
+        elif kind in ('FOLD', 'CHECK', 'RAISE', 'BET', 'CALL'):
+            action = Action(fields[0], (fields[3] or fields[4]).split()[0])
+            if fields[5] is not None:
+                action.amount = amount(fields[5])
+                action.allin = fields[6] is not None
+            street.actions.append(action) # type: ignore
+        elif kind == 'SHOW':
+            action = Action(fields[0], 'shows', cards=fields[7])
+            (hand.shows if in_summary else street.actions).append(action) # type: ignore
+        elif kind == 'DEAL':
+            hand.deals.append(Deal(*fields))
+        elif kind in ('POST', 'STRADDLE'):
+            hand.posts.append(Post(fields[0], fields[1], fields[2]))
+        elif kind == 'HOLE':
+            street = Street('preflop')
+            hand.streets.append(street)
+        elif kind == 'FLOP':
+            street = Street('flop', fields[0])
+            hand.streets.append(street)
+        elif kind in ('TURN', 'RIVER'):
+            street = Street(kind.lower(), fields[0], fields[1])
+            hand.streets.append(street)
+        elif kind == 'WIN':
+            hand.winners.append(Winner(fields[0], amount(fields[8])))
+        elif kind == 'SPLITWIN':
+            hand.winners.append(Winner(fields[0], amount(fields[9]), True, fields[10]))
+        elif kind == 'BOARD':
+            hand.boards.append(Board(int(fields[0]), fields[1], fields[2]))
+        elif kind == 'SUMMARY':
+            in_summary = True
+        elif kind == 'WHEN':
+            hand.when = fields[0]
+        elif kind == 'TABLE':
+            hand.table, hand.button = fields[0], int(fields[1])
+    return hand
+
+class HandParser: # pylint: disable=too-few-public-methods
+    '''
+        Parses hand histories into Hand records, one hand at a time.
+        The LLParser is built once and reused.
+    '''
+    def __init__(self):
+        self._llparser = LLParser(hand_grammar().freeze())
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Hand]:
+        '''
+            Generator of the Hands of lines, e.g. an open file
+        '''
+        for tokens in self.token_records(lines):
+            yield build_hand(tokens)
+
+    def token_records(self, lines: Iterable[str]) -> Iterator[list[LineToken]]:
+        '''
+            Generator of the LineTokens of each accepted hand of lines,
+            for consumers that do not need Hand records
+        '''
+        yield from self._llparser.parse_records(line_tokens(lines)) # type: ignore
+
+def parse_files(filenames: Iterable[str]) -> Iterator[Hand]:
+    '''
+        Generator of the Hands of several files, in the order given
+    '''
+    parser = HandParser()
+    for filename in filenames:
+        with open(filename, 'r') as file:
+            yield from parser.parse(file)
+
+def _main():
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('files', nargs='+')
+    argparser.add_argument('--check', action='store_true')
+    argparser.add_argument('--bench', type=int, metavar='COPIES', default=0)
+    args = argparser.parse_args()
+
+    if not args.check and not args.bench:
+        for hand in parse_files(args.files):
+            print(hand)
+        return
+
+    # the Lark parser is only needed to compare against
+    from time import perf_counter # pylint: disable=import-outside-toplevel
+    from hhparser_lalr import hh_parser # pylint: disable=import-outside-toplevel
+    text = ''
+    for filename in args.files:
+        with open(filename, 'r') as file:
+            text += file.read().rstrip('\n') + '\n\n'
+    if args.check:
+        from hhstream import parse_hands # pylint: disable=import-outside-toplevel
+        # run as a script this module is __main__, not the hhnative that
+        # hhstream imports, so the records are compared as tuples
+        native = [astuple(hand) for hand in HandParser().parse(text.splitlines())]
+        lark = [astuple(hand) for hand in parse_hands(text.splitlines())]
+        print(f'{len(native)} hands, ' + ('same records' if native == lark else 'DIFFERENT'))
+    if args.bench:
+        text *= args.bench
+        started = perf_counter()
+        hands = sum(1 for _ in HandParser().parse(text.splitlines()))
+        native_seconds = perf_counter() - started
+        started = perf_counter()
+        hh_parser.parse(text)
+        lark_seconds = perf_counter() - started
+        megabytes = len(text) / 1e6
+        print(f'{hands} hands, {megabytes:.1f} MB\n'
+              f'native   {native_seconds:.2f} s {megabytes / native_seconds:.2f} MB/s\n'
+              f'lark     {lark_seconds:.2f} s {megabytes / lark_seconds:.2f} MB/s')
+
+if __name__ == '__main__':
+    _main()
@@ -1,5 +1,5 @@
 from lark import Lark, Transformer
-hh_parser = Lark(r'''
+HH_GRAMMAR = r'''
     handhistories : handhistory*
     handhistory: handdesc datetimewhen table seats posts preflop [flop] [turn] [river] [boards] summary winner [shows]
     datetimewhen: when _NL
@@ -51,9 +51,11 @@ hh_parser = Lark(r'''
     %import common.NEWLINE -> _NL
     %import common.WORD
 
-''', start='handhistories', parser='lalr')
+'''
+hh_parser = Lark(HH_GRAMMAR, start='handhistories', parser='lalr')
 
-with open('sample.txt', 'r') as file:
-    data = file.read()
-tree = hh_parser.parse(data)
-print(tree.pretty())
+if __name__ == '__main__':
+    with open('sample.txt', 'r') as file:
+        data = file.read()
+    tree = hh_parser.parse(data)
+    print(tree.pretty())
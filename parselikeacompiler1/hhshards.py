@@ -0,0 +1,97 @@
+'''
+    Sharded, multi-process parsing of hand history files.
+
+    Hand histories are independent records that start with a '#NNN:' header
+    line. The files are split at those headers into shards of whole hands,
+    the shards are parsed by a process pool and the handhistory trees are
+    yielded back in hand order.
+
+    Unpickling generic trees in the parent costs about as much as parsing
+    them, so for large archives pass a transform that reduces each tree to
+    what the caller needs; it runs inside the workers.
+
+    usage: python hhshards.py [-j PROCESSES] [-n HANDS_PER_SHARD] file...
+'''
+import argparse
+import re
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from lark import Tree
+
+from hhparser_lalr import hh_parser
+
+HAND_HEADER = re.compile(r'#\d+:')
+
+def iter_hands(lines: Iterable[str]) -> Iterator[str]:
+    '''
+        Generator of hand texts from an iterable of lines.
+        A hand starts at a header line and runs up to the next one;
+        blank lines around hands are dropped, so every hand ends in a
+        single newline. Only one hand is held in memory at a time.
+    '''
+    hand: list[str] = []
+    for line in lines:
+        if HAND_HEADER.match(line) and hand:
+            yield ''.join(hand)
+            hand = []
+        if line.strip():
+            hand.append(line if line.endswith('\n') else line + '\n')
+    if hand:
+        yield ''.join(hand)
+
+def iter_file_hands(filenames: Iterable[str]) -> Iterator[str]:
+    '''
+        iter_hands over several files, in the order given
+    '''
+    for filename in filenames:
+        with open(filename, 'r', encoding='utf-8') as file:
+            yield from iter_hands(file)
+
+def iter_shards(hands: Iterable[str], hands_per_shard: int) -> Iterator[str]:
+    '''
+        groups consecutive hands into shards of hands_per_shard hands
+    '''
+    hands = iter(hands)
+    while shard := list(islice(hands, hands_per_shard)):
+        yield '\n'.join(shard)
+
+def parse_shard(shard: str,
+                transform: Optional[Callable[[Tree], Any]] = None) -> list[Any]:
+    '''
+        parses one shard with the worker's parser and returns its
+        handhistory trees, passed through transform when given.
+        hh_parser is built once per process, when the worker imports
+        hhparser_lalr.
+    '''
+    trees = hh_parser.parse(shard).children
+    if transform is None:
+        return trees
+    return [transform(tree) for tree in trees]
+
+def parse_files(filenames: Iterable[str],
+                processes: Optional[int] = None,
+                hands_per_shard: int = 256,
+                transform: Optional[Callable[[Tree], Any]] = None) -> Iterator[Any]:
+    '''
+        parses every hand of filenames on a pool of processes
+        (default: one per core) and yields the handhistory trees, or
+        transform(tree) when transform is given, in the order the hands
+        appear in the files. transform runs in the workers and must be
+        picklable (a module level function).
+    '''
+    shards = iter_shards(iter_file_hands(filenames), hands_per_shard)
+    with Pool(processes) as pool:
+        for results in pool.imap(partial(parse_shard, transform=transform), shards):
+            yield from results
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument('files', nargs='+')
+    argparser.add_argument('-j', '--processes', type=int, default=None)
+    argparser.add_argument('-n', '--hands-per-shard', type=int, default=256)
+    args = argparser.parse_args()
+    for tree in parse_files(args.files, args.processes, args.hands_per_shard):
+        print(tree.pretty())
@@ -0,0 +1,236 @@
+'''
+    Incremental per-player statistics over parsed hands
+
+    StatsAggregator folds Hand records (hhnative or hhstream) into one
+    PlayerStats of counters per player. Counters only ever add up, so
+    adding hands costs O(new hands), and the aggregators of shards parsed
+    by parallel workers merge by summing. The state, counters plus how
+    far each file was read, is saved as JSON; update_file() then parses
+    only what was appended to a file since (hhfollow.HandFollower).
+
+    Per player
+        VPIP = hands with a preflop call, bet or raise / hands dealt in
+        PFR = hands with a preflop bet or raise / hands dealt in
+        AF = postflop bets and raises / postflop calls
+        WTSD = hands still in at the showdown / hands that saw the flop
+        W$SD = showdowns won / showdowns
+        net = sum of the summary changes
+
+    usage: python hhstats.py [--state FILE] file...
+'''
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
+from typing import Iterable, Optional
+
+from hhfollow import HandFollower
+from hhnative import Hand, HandParser
+
+_VOLUNTARY = ('calls', 'bets', 'raises')
+_AGGRESSIVE = ('bets', 'raises')
+_VERSION = 1
+
+@dataclass(slots=True)
+class PlayerStats: # pylint: disable=too-many-instance-attributes
+    '''
+        Data class of the counters of a player, see the module docstring
+    '''
+    hands: int = 0
+    vpip: int = 0
+    pfr: int = 0
+    aggressive: int = 0
+    calls: int = 0
+    saw_flop: int = 0
+    showdowns: int = 0
+    showdowns_won: int = 0
+    net: float = 0.0
+
+    def merge(self, other: 'PlayerStats'):
+        '''
+            adds the counters of other
+        '''
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def ratios(self) -> dict[str, Optional[float]]:
+        '''
+            VPIP, PFR, AF, WTSD and W$SD, None where the denominator is 0
+        '''
+        def ratio(numerator: float, denominator: float) -> Optional[float]:
+            return numerator / denominator if denominator else None
+        return {'VPIP': ratio(self.vpip, self.hands), 'PFR': ratio(self.pfr, self.hands),
+                'AF': ratio(self.aggressive, self.calls),
+                'WTSD': ratio(self.showdowns, self.saw_flop),
+                'W$SD': ratio(self.showdowns_won, self.showdowns)}
+
+_COUNTERS = [counter.name for counter in fields(PlayerStats)]
+
+@dataclass
+class StatsAggregator:
+    '''
+        Data class of the statistics of many hands
+            players = PlayerStats by player name
+            hands = number of hands added
+            offsets = per file, the byte offset update_file() read up to
+            files = per file, its inode and size when it was read, so a
+                    replaced or truncated file is read again from its start
+    '''
+    players: dict[str, PlayerStats] = field(default_factory=dict)
+    hands: int = 0
+    offsets: dict[str, int] = field(default_factory=dict)
+    files: dict[str, tuple[Optional[int], int]] = field(default_factory=dict)
+
+    def _player(self, name: str) -> PlayerStats:
+        stats = self.players.get(name)
+        if stats is None:
+            stats = self.players[name] = PlayerStats()
+        return stats
+
+    def add(self, hand: Hand):
+        '''
+            adds the counters of one hand
+        '''
+        self.hands += 1
+        dealt = [seat.player for seat in hand.seats]
+        folded: set[str] = set()
+        saw_flop: set[str] = set()
+        for street in hand.streets:
+            if street.name != 'preflop' and not saw_flop:
+                saw_flop = {player for player in dealt if player not in folded}
+            preflop = street.name == 'preflop'
+            voluntary: set[str] = set()
+            raised: set[str] = set()
+            for action in street.actions:
+                kind = action.kind
+                if kind == 'folds':
+                    folded.add(action.player)
+                elif preflop:
+                    if kind in _VOLUNTARY:
+                        voluntary.add(action.player)
+                    if kind in _AGGRESSIVE:
+                        raised.add(action.player)
+                elif kind in _AGGRESSIVE:
+                    self._player(action.player).aggressive += 1
+                elif kind == 'calls':
+                    self._player(action.player).calls += 1
+            for player in voluntary:
+                self._player(player).vpip += 1
+            for player in raised:
+                self._player(player).pfr += 1
+
+        remaining = [player for player in dealt if player not in folded]
+        showdown = len(remaining) > 1
+        winners = {winner.player for winner in hand.winners}
+        changes = {seat.player: seat.change or 0 for seat in hand.summary}
+        for player in dealt:
+            stats = self._player(player)
+            stats.hands += 1
+            stats.net += changes.get(player, 0)
+            if player in saw_flop:
+                stats.saw_flop += 1
+                if showdown and player in remaining:
+                    stats.showdowns += 1
+                    stats.showdowns_won += player in winners
+
+    def add_all(self, hands: Iterable[Hand]) -> 'StatsAggregator':
+        '''
+            adds every hand and returns self
+        '''
+        for hand in hands:
+            self.add(hand)
+        return self
+
+    def merge(self, other: 'StatsAggregator') -> 'StatsAggregator':
+        '''
+            adds the statistics of other, e.g. of another shard, and
+            returns self. File offsets keep the furthest one.
+        '''
+        for name, stats in other.players.items():
+            self._player(name).merge(stats)
+        self.hands += other.hands
+        for path, offset in other.offsets.items():
+            if offset > self.offsets.get(path, -1):
+                self.offsets[path] = offset
+                if path in other.files:
+                    self.files[path] = other.files[path]
+        return self
+
+    def update_file(self, path: str, parser: Optional[HandParser] = None,
+                    final: bool = False) -> int:
+        '''
+            adds the hands appended to path since the last update and
+            returns their number. A trailing hand that is not followed by
+            a blank line waits for the next update, unless final is set.
+            A file that was replaced or truncated since is read from its
+            start.
+        '''
+        path = os.path.abspath(path)
+        inode, size = self.files.get(path, (None, -1))
+        follower = HandFollower(path, self.offsets.get(path, 0), parser, inode, size)
+        hands = follower.poll(final)
+        self.add_all(hands)
+        self.offsets[path] = follower.offset
+        self.files[path] = (follower.inode, follower.size)
+        return len(hands)
+
+    def to_json(self) -> dict:
+        '''
+            the state as a JSON-compatible dict
+        '''
+        return {'version': _VERSION, 'hands': self.hands, 'offsets': self.offsets,
+                'files': self.files,
+                'players': {name: asdict(stats) for name, stats in self.players.items()}}
+
+    @staticmethod
+    def from_json(state: dict) -> 'StatsAggregator':
+        '''
+            inverse of to_json
+        '''
+        if state.get('version') != _VERSION:
+            raise Exception(f'Unknown stats version {state.get("version")}')
+        return StatsAggregator({name: PlayerStats(**stats)
+                                    for name, stats in state['players'].items()},
+                               state['hands'], dict(state['offsets']),
+                               {path: tuple(file) for path, file
+                                    in state.get('files', {}).items()})
+
+    def save(self, path: str):
+        '''
+            writes the state to path, replacing it at once
+        '''
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.to_json(), file)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def load(path: str) -> 'StatsAggregator':
+        '''
+            the state saved at path, an empty one when there is no file
+        '''
+        if not os.path.exists(path):
+            return StatsAggregator()
+        with open(path, 'r', encoding='utf-8') as file:
+            return StatsAggregator.from_json(json.load(file))
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('files', nargs='+')
+    argparser.add_argument('--state', metavar='FILE', help='load, update and save the stats')
+    argparser.add_argument('--final', action='store_true',
+                           help='the files are complete, count their last hands too')
+    args = argparser.parse_args()
+    aggregator = StatsAggregator.load(args.state) if args.state else StatsAggregator()
+    hand_parser = HandParser()
+    for filename in args.files:
+        print(f'{filename}: {aggregator.update_file(filename, hand_parser, args.final)} new hands')
+    if args.state:
+        aggregator.save(args.state)
+    print(f'{"player":16} {"hands":>6} ' + ' '.join(f'{name:>6}' for name in PlayerStats().ratios())
+          + f' {"net":>9}')
+    for player_name, player_stats in sorted(aggregator.players.items()):
+        values = ' '.join('     -' if value is None else f'{value:6.2f}'
+                          for value in player_stats.ratios().values())
+        print(f'{player_name:16} {player_stats.hands:6} {values} {player_stats.net:9.2f}')
@@ -0,0 +1,188 @@
+'''
+    Streaming Lark parsing of hand histories into records
+
+    hhparser_lalr.py parses a whole file into one handhistories Tree, so
+    memory grows with the file and nothing comes out before the end.
+    Here the input is cut into hands (hhshards.iter_hands) and each hand
+    is parsed on its own by a LALR parser built with HandTransformer as
+    its inline transformer: the rule callbacks run while parsing, so no
+    Tree is built at all and every handhistory comes out as a slotted
+    hhnative.Hand right away. Peak memory depends on the largest hand,
+    not on the file.
+
+    usage: python hhstream.py file...
+'''
+import argparse
+from typing import Iterable, Iterator
+
+from lark import Lark, Transformer
+
+from hhnative import Action, Board, Deal, Hand, Post, Seat, Street, Winner, amount
+from hhparser_lalr import HH_GRAMMAR
+from hhshards import iter_hands
+
+def _present(children: list) -> list:
+    # optional and repeated parts give None placeholders
+    return [child for child in children if child is not None]
+
+class HandTransformer(Transformer): # pylint: disable=too-many-public-methods
+    '''
+        Turns the rules of HH_GRAMMAR into hhnative records, a
+        handhistory into a Hand. The grammar drops the sign of a summary
+        change, so handhistory takes it from the stacks.
+    '''
+    # pylint: disable=missing-function-docstring,invalid-name
+    def handhistories(self, children):
+        return _present(children)
+
+    def handhistory(self, children):
+        (number, game, stakes), when, (table, button), seats, posts, \
+            (deals, preflop), flop, turn, river, boards, summary, winners, shows = children
+        stacks = {seat.seat: seat.stack for seat in seats}
+        for seat in summary:
+            if seat.change is not None and seat.stack < stacks.get(seat.seat, 0):
+                seat.change = -seat.change
+        return Hand(number, game, stakes, when, table, button, seats, posts, deals,
+                    _present([preflop, flop, turn, river]), boards or [], summary,
+                    winners, shows or [])
+
+    def handdesc(self, children):
+        number, game, small, big = children
+        return int(number), game.strip(), f'{small.strip()}/{big.strip()}'
+
+    def datetimewhen(self, children):
+        return children[0]
+
+    def table(self, children):
+        return children[0], children[1]
+
+    def seats(self, children):
+        return _present(children)
+
+    def seat(self, children):
+        return Seat(*children)
+
+    def posts(self, children):
+        return _present(children)
+
+    def post(self, children):
+        return Post(children[0], 'posts', children[1])
+
+    def straddle(self, children):
+        return Post(children[0], 'straddles', children[1])
+
+    def preflop(self, children):
+        deals, actions = children
+        return deals, Street('preflop', actions=actions)
+
+    def deals(self, children):
+        return _present(children)
+
+    def deal(self, children):
+        return Deal(*children)
+
+    def actions(self, children):
+        return _present(children)
+
+    def fold(self, children):
+        return Action(children[0], 'folds')
+
+    def check(self, children):
+        return Action(children[0], 'checks')
+
+    def raise_(self, children):
+        return Action(children[0], 'raises', children[1], children[2] is not None)
+
+    def bets(self, children):
+        return Action(children[0], 'bets', children[1], children[2] is not None)
+
+    def call(self, children):
+        return Action(children[0], 'calls', children[1], children[2] is not None)
+
+    def andisallin(self, _):
+        return True
+
+    def showdown(self, children):
+        return Action(children[0], 'shows', cards=children[1])
+
+    def flop(self, children):
+        return Street('flop', children[0], actions=children[1])
+
+    def turn(self, children):
+        return Street('turn', *children)
+
+    def river(self, children):
+        return Street('river', *children)
+
+    def summary(self, children):
+        return children
+
+    def playersummary(self, children):
+        seat, player, stack, change = children
+        return Seat(seat, player.strip(), stack, change)
+
+    def winner(self, children):
+        return children
+
+    def normalwinner(self, children):
+        return Winner(*children)
+
+    def splitpotwinner(self, children):
+        return Winner(children[0], children[1], True, children[2])
+
+    def fromwhere(self, children):
+        return children[0]
+
+    def boards(self, children):
+        return children
+
+    def board(self, children):
+        return Board(*children)
+
+    def shows(self, children):
+        return children
+
+    def player(self, children):
+        return children[0]
+
+    def foo(self, children):
+        return str(children[0])
+
+    bar = foobar = mrfoo = words = when = boardlayout = foo
+
+    def seatnum(self, children):
+        return int(children[0])
+
+    boardnum = seatnum
+
+    def stack(self, children):
+        return amount(children[0])
+
+# 'raise' is a Python keyword
+setattr(HandTransformer, 'raise', HandTransformer.raise_)
+
+hand_parser = Lark(HH_GRAMMAR, start='handhistories', parser='lalr',
+                   transformer=HandTransformer())
+
+def parse_hands(lines: Iterable[str]) -> Iterator[Hand]:
+    '''
+        Generator of the Hands of lines, e.g. an open file, parsed one
+        hand at a time
+    '''
+    for text in iter_hands(lines):
+        yield from hand_parser.parse(text)
+
+def parse_files(filenames: Iterable[str]) -> Iterator[Hand]:
+    '''
+        parse_hands over several files, in the order given
+    '''
+    for filename in filenames:
+        with open(filename, 'r', encoding='utf-8') as file:
+            yield from parse_hands(file)
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument('files', nargs='+')
+    args = argparser.parse_args()
+    for hand in parse_files(args.files):
+        print(hand)
@@ -0,0 +1,53 @@
+import os
+import struct
+import unittest
+
+from hhbinary import _uint, decode, decode_hands, encode, encode_hands
+from hhnative import Action, Hand, HandParser, Seat, Street, Winner
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.txt')
+
+def _hand(stack: float) -> Hand:
+    return Hand(1, 'Pot Limit Omaha', '1/2', table='Test', button=1,
+                seats=[Seat(1, 'foo', stack), Seat(2, 'bar', 120.0)],
+                streets=[Street('preflop', actions=[Action('foo', 'raises', 6.0),
+                                                    Action('bar', 'calls', 6.0, allin=True)])],
+                summary=[Seat(1, 'foo', stack, 6.0), Seat(2, 'bar', 120.0, -6.0)],
+                winners=[Winner('foo', 12.0)])
+
+def _amounts(block: bytes) -> tuple[int, bytes]:
+    '''
+        the width and the bytes of the amounts of block
+    '''
+    pos = 0
+    head = []
+    for _ in range(5):
+        value, pos = _uint(block, pos)
+        head.append(value)
+    _, _, length, count, width = head
+    return width, block[pos + length:pos + length + count * width]
+
+class TestBinary(unittest.TestCase):
+    '''
+        Blocks decode to the hands they were encoded from, amounts are
+        little endian int32 or int64 cents
+    '''
+    def test_sample(self):
+        with open(SAMPLE, encoding='utf-8') as file:
+            hands = list(HandParser().parse(file.read().splitlines()))
+        self.assertEqual(decode_hands(encode_hands(hands)), hands)
+        self.assertEqual([decode(encode(hand)) for hand in hands], hands)
+        self.assertEqual(decode_hands(encode_hands([])), [])
+
+    def test_amount_width(self):
+        for stack, width in [(21474836.47, 4), (-21474836.48, 4),
+                             (21474836.48, 8), (-21474836.49, 8), (2.0 ** 40, 8)]:
+            with self.subTest(stack=stack):
+                block = encode(_hand(stack))
+                self.assertEqual(decode(block), _hand(stack))
+                self.assertEqual(_amounts(block)[0], width)
+
+    def test_little_endian(self):
+        width, amounts = _amounts(encode(_hand(1.5)))
+        self.assertEqual(width, 4)
+        self.assertEqual(amounts[:8], struct.pack('<ii', 150, 12000))
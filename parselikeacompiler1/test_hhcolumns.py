@@ -0,0 +1,78 @@
+import glob
+import math
+import os
+import tempfile
+import unittest
+
+from hhcolumns import ACTIONS, STREETS, export, iter_chunks, load
+from hhnative import HandParser
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.txt')
+
+def _rows(hands) -> list[tuple]:
+    '''
+        the (hand, street, seat, action, amount, allin, player) rows of the
+        Hand records, as the export orders them
+    '''
+    rows = []
+    for hand in hands:
+        seats = {seat.player: seat.seat for seat in hand.seats}
+        for post in hand.posts:
+            rows.append((hand.number, 0, seats.get(post.player, 0), ACTIONS.index(post.kind),
+                         float(post.what.rsplit(' ', 1)[-1]), False, post.player))
+        for street in hand.streets:
+            for action in street.actions:
+                rows.append((hand.number, STREETS.index(street.name),
+                             seats.get(action.player, 0), ACTIONS.index(action.kind),
+                             action.amount, action.allin, action.player))
+    return rows
+
+class TestColumns(unittest.TestCase):
+    '''
+        The chunks of an export read back to the actions and hands of the
+        Hand records hhnative parses
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        with open(SAMPLE, encoding='utf-8') as file:
+            self.lines = file.read().splitlines()
+        self.hands = list(HandParser().parse(self.lines))
+
+    def test_columns(self):
+        # small chunks, so the sample spans several of them
+        writer = export(self.lines, self.directory, chunk_rows=4)
+        chunks = list(iter_chunks(self.directory))
+        self.assertEqual(len(chunks), writer.chunks)
+        self.assertGreater(writer.chunks, 1)
+        self.assertEqual(len(glob.glob(os.path.join(self.directory, 'chunk-*.npz'))), writer.chunks)
+
+        columns = load(self.directory)
+        rows = _rows(self.hands)
+        self.assertEqual(writer.rows, len(rows))
+        self.assertEqual(len(columns.actions), len(rows))
+        for idx, name in enumerate(['hand', 'street', 'seat', 'action']):
+            with self.subTest(column=name):
+                self.assertEqual(columns.actions[name].tolist(), [row[idx] for row in rows])
+        with self.subTest(column='amount'):
+            self.assertEqual([None if math.isnan(amount) else amount
+                                for amount in columns.actions['amount'].tolist()],
+                             [row[4] for row in rows])
+        with self.subTest(column='allin'):
+            self.assertEqual(columns.actions['allin'].tolist(), [row[5] for row in rows])
+        with self.subTest(column='player'):
+            self.assertEqual([columns.players[idx] for idx in columns.actions['player']],
+                             [row[6] for row in rows])
+
+        self.assertEqual(columns.hands['hand'].tolist(), [hand.number for hand in self.hands])
+        self.assertEqual([columns.tables[idx] for idx in columns.hands['table']],
+                         [hand.table for hand in self.hands])
+        self.assertEqual(columns.hands['button'].tolist(), [hand.button for hand in self.hands])
+        self.assertEqual(columns.hands['seats'].tolist(), [len(hand.seats) for hand in self.hands])
+
+    def test_one_chunk(self):
+        export(self.lines, self.directory, compress=True)
+        self.assertEqual(len(list(iter_chunks(self.directory))), 1)
+        self.assertEqual(len(load(self.directory).actions), len(_rows(self.hands)))
+
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from hhfollow import HandFollower
+
+with open(os.path.join(os.path.dirname(__file__), 'sample.txt'), encoding='utf-8') as _file:
+    SAMPLE = _file.read()
+FIRST, SECOND = SAMPLE[:SAMPLE.index('#189:')], SAMPLE[SAMPLE.index('#189:'):]
+MALFORMED = '#190: Pot Limit Omaha - 1/2\nthis is no hand history line\n'
+
+class TestFollow(unittest.TestCase):
+    '''
+        Only complete hands are parsed, a malformed one is skipped
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'hands.txt')
+
+    def append(self, text: str):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(text)
+
+    def test_partial_trailing_hand(self):
+        follower = HandFollower(self.path)
+        self.append(FIRST + SECOND[:100])
+        self.assertEqual([hand.number for hand in follower.poll()], [188])
+        self.assertEqual(follower.offset, len(FIRST.encode()))
+        self.assertEqual(follower.poll(), [])
+        self.append(SECOND[100:])
+        self.assertEqual([hand.number for hand in follower.poll()], [189])
+        self.assertEqual(follower.offset, os.path.getsize(self.path))
+
+    def test_final(self):
+        follower = HandFollower(self.path)
+        self.append(FIRST + SECOND.rstrip())
+        self.assertEqual([hand.number for hand in follower.poll()], [188])
+        self.assertEqual([hand.number for hand in follower.poll(final=True)], [189])
+        self.assertEqual(follower.offset, os.path.getsize(self.path))
+        self.assertEqual(follower.poll(final=True), [])
+
+    def test_malformed_hand(self):
+        follower = HandFollower(self.path)
+        self.append(FIRST + MALFORMED + SECOND)
+        with self.assertLogs('hhfollow', 'WARNING') as logs:
+            hands = follower.poll()
+        self.assertEqual([hand.number for hand in hands], [188, 189])
+        self.assertIn(f'at byte {len(FIRST.encode())}', logs.output[0])
+        self.assertEqual(follower.offset, os.path.getsize(self.path))
+        self.append(MALFORMED + '\n')
+        with self.assertLogs('hhfollow', 'WARNING'):
+            self.assertEqual(follower.poll(), [])
+        self.append(FIRST)
+        self.assertEqual([hand.number for hand in follower.poll()], [188])
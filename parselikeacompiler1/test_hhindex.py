@@ -0,0 +1,130 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from hhindex import HandIndex
+from hhnative import HandParser
+
+with open(os.path.join(os.path.dirname(__file__), 'sample.txt'), encoding='utf-8') as _file:
+    SAMPLE = _file.read()
+FIRST, SECOND = SAMPLE[:SAMPLE.index('#189:')], SAMPLE[SAMPLE.index('#189:'):]
+
+def _hands(*numbers: int) -> str:
+    '''
+        the first sample hand once per number, numbered so
+    '''
+    return ''.join(FIRST.replace('#188:', f'#{number}:', 1) for number in numbers)
+
+class TestIndex(unittest.TestCase):
+    '''
+        The index finds every hand, follows appends and is rebuilt when
+        the file or the index file changed under it
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(directory.name, 'hands.txt')
+
+    def write(self, text: str, mode: str = 'w'):
+        with open(self.path, mode, encoding='utf-8') as file:
+            file.write(text)
+
+    def test_sample(self):
+        self.write(SAMPLE)
+        index = HandIndex.open(self.path)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(list(index.numbers), [188, 189])
+        self.assertEqual(index.covered, len(SAMPLE.encode()))
+        self.assertEqual(index.read(188), FIRST)
+        self.assertEqual(index.read(189), SECOND)
+        self.assertEqual(index.parse(189), next(HandParser().parse(SECOND.splitlines())))
+        self.assertIn(188, index)
+        self.assertNotIn(190, index)
+        with self.assertRaises(Exception):
+            index.read(190)
+        with open(index.index_path, 'rb') as file:
+            self.assertEqual(file.read(8), b'HHIDX001')
+        # read back from the index file, nothing to scan
+        again = HandIndex.open(self.path)
+        self.assertEqual(again.update(), 0)
+        self.assertEqual(list(again.offsets), list(index.offsets))
+        self.assertEqual(list(again.lengths), list(index.lengths))
+
+    def test_append(self):
+        self.write(_hands(1, 2) + SECOND[:100])
+        index = HandIndex.open(self.path)
+        self.assertEqual(len(index), 3)
+        self.write(SECOND[100:] + _hands(3), 'a')
+        self.assertEqual(index.update(), 1)
+        self.assertEqual(list(index.numbers), [1, 2, 189, 3])
+        self.assertEqual(index.read(189), SECOND)
+        self.assertEqual(index.read(3), _hands(3))
+        index.save()
+        self.write(_hands(4), 'a')
+        index = HandIndex.open(self.path)
+        self.assertEqual(list(index.numbers), [1, 2, 189, 3, 4])
+        self.assertEqual(index.covered, os.path.getsize(self.path))
+
+    def test_truncated(self):
+        self.write(SAMPLE)
+        HandIndex.open(self.path)
+        self.write(FIRST)
+        index = HandIndex.open(self.path)
+        self.assertEqual(list(index.numbers), [188])
+        self.assertEqual(index.read(188), FIRST)
+
+    def test_replaced(self):
+        self.write(_hands(1, 2))
+        HandIndex.open(self.path)
+        # longer, with other bytes where the indexed ones ended
+        self.write(_hands(5, 6, 7).replace('wins pot (85)', 'wins pot (86)'))
+        index = HandIndex.open(self.path)
+        self.assertEqual(list(index.numbers), [5, 6, 7])
+        self.assertNotIn(1, index)
+        self.assertIn('wins pot (86)', index.read(7))
+
+    def test_corrupted_crc(self):
+        self.write(_hands(1, 2))
+        index = HandIndex.open(self.path)
+        with open(index.index_path, 'r+b') as file:
+            file.seek(16)
+            (crc,) = struct.unpack('<I', file.read(4))
+            file.seek(16)
+            file.write(struct.pack('<I', crc ^ 1))
+        self.write(_hands(3), 'a')
+        index = HandIndex(self.path)
+        self.assertTrue(index._load())
+        # the tail does not match, so every hand is indexed again
+        self.assertEqual(index.update(), 3)
+        self.assertEqual(list(index.numbers), [1, 2, 3])
+
+    def test_corrupted_file(self):
+        self.write(_hands(1, 2))
+        index = HandIndex.open(self.path)
+        with open(index.index_path, 'r+b') as file:
+            file.write(b'NOTANIDX')
+        self.assertFalse(HandIndex(self.path)._load())
+        self.assertEqual(list(HandIndex.open(self.path).numbers), [1, 2])
+        # rewritten by open(), now cut short
+        self.assertTrue(HandIndex(self.path)._load())
+        with open(index.index_path, 'r+b') as file:
+            file.truncate(30)
+        self.assertFalse(HandIndex(self.path)._load())
+        self.assertEqual(list(HandIndex.open(self.path).numbers), [1, 2])
+
+    def test_read_range(self):
+        self.write(_hands(5, 3, 9, 7))
+        index = HandIndex.open(self.path)
+
+        def numbers(first: int, last: int) -> list[int]:
+            return [int(text[1:text.index(':')]) for text in index.read_range(first, last)]
+
+        self.assertEqual(numbers(3, 9), [3, 5, 7, 9])
+        self.assertEqual(numbers(4, 8), [5, 7])
+        self.assertEqual(numbers(5, 5), [5])
+        self.assertEqual(numbers(0, 2), [])
+        self.assertEqual(numbers(10, 20), [])
+        self.assertEqual(numbers(9, 3), [])
+        self.assertEqual([hand.number for hand in index.parse_range(7, 100)], [7, 9])
@@ -0,0 +1,87 @@
+import os
+import unittest
+from dataclasses import astuple
+
+from hhnative import HandParser
+from hhstream import parse_hands
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.txt')
+
+# ten seats, and names with dots and dashes
+TEN_SEATS = '''
+    #190: No Limit Holdem - 1/2
+    2021-03-01 18:02:11
+    Table 'Test Poker' Seat 10 is the button
+    Seat 1: j.doe (100)
+    Seat 2: x-ray (200)
+    Seat 3: foo (100)
+    Seat 4: Mr Foo (120)
+    Seat 5: a.b-c (80)
+    Seat 6: bar (115)
+    Seat 7: foobar (122)
+    Seat 8: d-1 (90)
+    Seat 9: e.e (60)
+    Seat 10: z.z-z (300)
+    j.doe: posts the small blind 1
+    x-ray: posts the big blind 2
+    *** HOLE CARDS ***
+    Dealt to j.doe: [Ah Kh]
+    Dealt to x-ray: [X X]
+    foo folds
+    Mr Foo folds
+    a.b-c raises to 6
+    bar folds
+    foobar folds
+    d-1 folds
+    e.e folds
+    z.z-z calls 6
+    j.doe folds
+    x-ray calls 4
+    *** FLOP *** [2c 7d 9s]
+    x-ray checks
+    a.b-c bets 10
+    z.z-z raises to 30
+    x-ray folds
+    a.b-c calls 20
+    *** TURN *** [2c 7d 9s] [Td]
+    a.b-c checks
+    z.z-z checks
+    *** RIVER *** [2c 7d 9s Td] [3h]
+    a.b-c bets 44 and is all in
+    z.z-z calls 44
+    a.b-c shows [Qs Qd]
+    z.z-z shows [9h 9d]
+    *** SUMMARY ***
+    Seat 1: j.doe (99) -1
+    Seat 2: x-ray (194) -6
+    Seat 5: a.b-c (0) -80
+    Seat 10: z.z-z (387) +87
+    z.z-z wins pot (167)
+'''
+
+class TestNative(unittest.TestCase):
+    '''
+        hhnative builds the same records as hhstream, the Lark parser, and
+        reads the hands Lark does not know
+    '''
+    def test_sample(self):
+        with open(SAMPLE, encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        native = [astuple(hand) for hand in HandParser().parse(lines)]
+        self.assertEqual(len(native), 2)
+        self.assertEqual(native, [astuple(hand) for hand in parse_hands(lines)])
+
+    def test_ten_seats(self):
+        lines = [line.strip() for line in TEN_SEATS.splitlines()]
+        hands = list(HandParser().parse(lines))
+        self.assertEqual(len(hands), 1)
+        hand = hands[0]
+        self.assertEqual(hand.button, 10)
+        self.assertEqual([seat.seat for seat in hand.seats], list(range(1, 11)))
+        self.assertEqual([seat.player for seat in hand.seats],
+                         ['j.doe', 'x-ray', 'foo', 'Mr Foo', 'a.b-c', 'bar', 'foobar', 'd-1',
+                          'e.e', 'z.z-z'])
+        self.assertEqual([deal.player for deal in hand.deals], ['j.doe', 'x-ray'])
+        self.assertEqual([seat.player for seat in hand.summary], ['j.doe', 'x-ray', 'a.b-c', 'z.z-z'])
+        self.assertEqual([seat.seat for seat in hand.summary], [1, 2, 5, 10])
+        self.assertEqual([winner.player for winner in hand.winners], ['z.z-z'])
@@ -0,0 +1,50 @@
+import os
+import unittest
+
+from hhparser_lalr import hh_parser
+from hhshards import iter_file_hands, iter_hands, iter_shards, parse_files, parse_shard
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.txt')
+
+def hand_number(tree) -> int:
+    '''
+        a transform the workers can unpickle
+    '''
+    return int(tree.children[0].children[0])
+
+class TestShards(unittest.TestCase):
+    '''
+        Hands split at their headers, parsed one shard at a time or on a
+        pool, are the hands of the whole file
+    '''
+    @classmethod
+    def setUpClass(cls):
+        with open(SAMPLE, encoding='utf-8') as file:
+            cls.text = file.read()
+        cls.trees = hh_parser.parse(cls.text).children
+
+    def test_iter_hands(self):
+        hands = list(iter_hands(self.text.splitlines()))
+        self.assertEqual(len(hands), 2)
+        self.assertTrue(all(hand.startswith('#') and hand.endswith('\n') for hand in hands))
+        self.assertEqual([tree for hand in hands for tree in parse_shard(hand)], self.trees)
+        self.assertEqual(list(iter_file_hands([SAMPLE])), hands)
+
+    def test_shards(self):
+        hands = list(iter_file_hands([SAMPLE, SAMPLE, SAMPLE]))
+        shards = list(iter_shards(hands, 2))
+        self.assertEqual(len(shards), 3)
+        self.assertEqual([tree for shard in shards for tree in parse_shard(shard)],
+                         self.trees * 3)
+
+    def test_pool(self):
+        for hands_per_shard in (1, 3):
+            with self.subTest(hands_per_shard=hands_per_shard):
+                trees = list(parse_files([SAMPLE, SAMPLE], processes=2,
+                                         hands_per_shard=hands_per_shard))
+                self.assertEqual(trees, self.trees * 2)
+
+    def test_pool_transform(self):
+        numbers = list(parse_files([SAMPLE, SAMPLE], processes=2, hands_per_shard=1,
+                                   transform=hand_number))
+        self.assertEqual(numbers, [188, 189, 188, 189])
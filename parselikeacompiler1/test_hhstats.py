@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+
+from hhstats import StatsAggregator
+
+with open(os.path.join(os.path.dirname(__file__), 'sample.txt'), encoding='utf-8') as _file:
+    SAMPLE = _file.read()
+FIRST, SECOND = SAMPLE[:SAMPLE.index('#189:')], SAMPLE[SAMPLE.index('#189:'):]
+
+class TestStats(unittest.TestCase):
+    '''
+        update_file() reads what was appended since the saved state, and a
+        replaced file from its start
+    '''
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(directory.name, 'hands.txt')
+
+    def write(self, text: str):
+        temporary = os.path.join(self.directory, 'new.txt')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def reloaded(aggregator: StatsAggregator) -> StatsAggregator:
+        return StatsAggregator.from_json(json.loads(json.dumps(aggregator.to_json())))
+
+    def test_appended(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(FIRST)
+        aggregator = StatsAggregator()
+        self.assertEqual(aggregator.update_file(self.path), 1)
+        aggregator = self.reloaded(aggregator)
+        self.assertEqual(aggregator.update_file(self.path), 0)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(SECOND)
+        self.assertEqual(aggregator.update_file(self.path), 1)
+        self.assertEqual(aggregator.hands, 2)
+
+    def test_replaced(self):
+        self.write(FIRST + SECOND)
+        aggregator = StatsAggregator()
+        self.assertEqual(aggregator.update_file(self.path), 2)
+        aggregator = self.reloaded(aggregator)
+        # longer than the old file, so only the inode tells it was replaced
+        self.write(SECOND + FIRST + FIRST)
+        self.assertEqual(aggregator.update_file(self.path), 3)
+        self.assertEqual(aggregator.hands, 5)
+        self.assertEqual(aggregator.offsets[self.path], os.path.getsize(self.path))
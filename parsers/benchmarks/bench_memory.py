@@ -0,0 +1,54 @@
+'''
+    Memory benchmark: bytes per production of the grammar model
+
+    usage (from the parsers directory):
+        python -m benchmarks.bench_memory
+
+    Each grammar is built from ready-made productions under tracemalloc,
+    so only the Grammar, its Rules, Alternates and GrammarTokens are
+    counted, once as built and once more after Grammar.freeze().
+'''
+import gc
+import tracemalloc
+from typing import Callable
+
+from parsers import Grammar
+
+from .grammars import (Productions, expression_productions, keyword_productions,
+                       make_grammar, record_productions)
+
+def traced(build: Callable[[], Grammar]) -> tuple[Grammar, int]:
+    '''
+        returns what build returns and the bytes it still holds
+    '''
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        grammar = build()
+        return grammar, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+def measure(productions: Productions) -> tuple[float, float]:
+    '''
+        bytes per production as built and frozen
+    '''
+    grammar, built = traced(lambda: make_grammar(productions))
+    del grammar
+    _, frozen = traced(lambda: make_grammar(productions).freeze())
+    return built / len(productions), frozen / len(productions)
+
+def main():
+    '''
+        prints one line per grammar
+    '''
+    print(f'{"grammar":<16} {"productions":>11} {"bytes/prod":>11} {"frozen":>8}')
+    for name, productions in [('expression-300', expression_productions(300)),
+                              ('keywords-3000', keyword_productions(3000)),
+                              ('record-1000', record_productions(1000))]:
+        built, frozen = measure(productions)
+        print(f'{name:<16} {len(productions):>11} {built:>11.1f} {frozen:>8.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+    Startup benchmark: first/follow computation, fixed point vs worklist,
+    and the suffix first sets of grammars with long alternates
+
+    usage (from the parsers directory):
+        python -m benchmarks.bench_startup [levels ...]
+
+    The fixed point grows roughly quadratically with the number of
+    precedence levels, so it is only timed up to FIXED_POINT_LIMIT levels.
+'''
+import sys
+from time import perf_counter
+
+from parsers import LLParser
+from parsers.ff_worklist import FirstFollowSolver, first_follow
+
+from .grammars import expression_grammar, record_grammar
+
+FIXED_POINT_LIMIT = 300
+
+def best_of(repeats, func):
+    '''
+        smallest wall time of repeats calls of func
+    '''
+    best = float('inf')
+    for _ in range(repeats):
+        started = perf_counter()
+        func()
+        best = min(best, perf_counter() - started)
+    return best
+
+def main(levels):
+    '''
+        prints one line per grammar size
+    '''
+    print(f'{"productions":>12} {"fixed point s":>14} {"worklist s":>11} {"speedup":>8}')
+    for level in levels:
+        grammar = expression_grammar(level)
+        productions = sum(len(rule.alts) for rule in grammar.data.values())
+        repeats = 3 if level < 200 else 1
+        worklist = best_of(repeats, lambda: first_follow(grammar)) # pylint: disable=cell-var-from-loop
+        if level > FIXED_POINT_LIMIT:
+            print(f'{productions:>12} {"-":>14} {worklist:>11.4f} {"-":>8}')
+            continue
+        reference = LLParser._fixed_point_first_follow(grammar) # pylint: disable=protected-access
+        solved = first_follow(grammar)
+        assert reference[0].data == solved[0].data and reference[1].data == solved[1].data
+        fixed = best_of(repeats, lambda: LLParser._fixed_point_first_follow(grammar)) # pylint: disable=protected-access,cell-var-from-loop
+        print(f'{productions:>12} {fixed:>14.4f} {worklist:>11.4f} {fixed / worklist:>7.1f}x')
+
+def main_records(fields):
+    '''
+        prints the first/follow solving time per record length
+    '''
+    print(f'{"fields":>12} {"worklist s":>11}')
+    for count in fields:
+        grammar = record_grammar(count)
+        solved = best_of(3, lambda: FirstFollowSolver(grammar)) # pylint: disable=cell-var-from-loop
+        print(f'{count:>12} {solved:>11.4f}')
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [10, 30, 100, 300, 700, 2000])
+    main_records([100, 300, 1000, 3000])
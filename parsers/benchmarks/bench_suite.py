@@ -0,0 +1,170 @@
+'''
+    Benchmark suite: grammar compilation and parse throughput
+
+    usage (from the parsers directory):
+        python -m benchmarks.bench_suite [--json FILE] [--quick] [--optimize]
+        python -m benchmarks.bench_suite --compare OLD.json NEW.json [--threshold 0.1]
+
+    Every case is a synthetic grammar at some scale plus a sentence of it.
+    For every case the suite measures
+        construct_seconds = LLParser(grammar), best of the repeats
+                            (LLParser(grammar, optimize=True) with --optimize)
+        table_cells = cells of the parser table
+        push_cells = cells of the push table
+        tokenizer_mb_per_s = tokenizer throughput over the sentence
+        parse_tokens_per_s = LLParser.parse throughput over the sentence
+
+    --compare reads two --json outputs and flags every metric that got
+    worse by more than threshold (a fraction), and exits with status 1
+    when there is at least one regression.
+'''
+import argparse
+import json
+import platform
+import sys
+from time import perf_counter
+from typing import Callable, Optional
+
+from parsers import Grammar, LLParser, TokenType, tokenizer
+
+from .grammars import (expression_grammar, expression_text, json_grammar, json_text,
+                       keyword_grammar, keyword_text, list_grammar, list_text)
+
+# metric -> 1 when higher is better, -1 when lower is better
+METRICS = {
+    'construct_seconds': -1,
+    'table_cells': -1,
+    'push_cells': -1,
+    'tokenizer_mb_per_s': 1,
+    'parse_tokens_per_s': 1,
+}
+
+Case = tuple[str, Callable[[], Grammar], Callable[[], str]]
+
+def cases(quick: bool = False) -> list[Case]:
+    '''
+        the (name, grammar factory, sentence factory) of every case
+    '''
+    scale = 1 if quick else 10
+    suite: list[Case] = []
+    for levels in (5, 20, 100):
+        suite.append((f'expression-{levels}',
+                      lambda levels=levels: expression_grammar(levels),
+                      lambda levels=levels: expression_text(levels, 2000 * scale)))
+    suite.append(('json', json_grammar, lambda: json_text(200 * scale)))
+    suite.append(('list-recursive', lambda: list_grammar(False), lambda: list_text(2000 * scale)))
+    suite.append(('list-loop', lambda: list_grammar(True), lambda: list_text(2000 * scale)))
+    for keywords in (10, 100, 1000):
+        suite.append((f'keywords-{keywords}',
+                      lambda keywords=keywords: keyword_grammar(keywords),
+                      lambda keywords=keywords: keyword_text(keywords, 2000 * scale)))
+    return suite
+
+def best_of(repeats: int, func: Callable) -> float:
+    '''
+        smallest wall time of repeats calls of func
+    '''
+    best = float('inf')
+    for _ in range(repeats):
+        started = perf_counter()
+        func()
+        best = min(best, perf_counter() - started)
+    return best
+
+def measure(grammar_factory: Callable[[], Grammar], text: str, repeats: int,
+            optimize: bool = False) -> dict[str, float]:
+    '''
+        the METRICS of one case
+    '''
+    grammar = grammar_factory()
+    # LLParser adds to the grammar it is given, so every run gets its own,
+    # built before the clock starts
+    grammars = iter([grammar_factory() for _ in range(repeats)])
+    construct = best_of(repeats, lambda: LLParser(next(grammars), optimize=optimize))
+    llparser = LLParser(grammar, optimize=optimize)
+    tokenize = best_of(repeats, lambda: list(tokenizer(iter(text))))
+    tokens = list(tokenizer(iter(text)))
+    parse = best_of(repeats, lambda: llparser.parse(tokens))
+    count = sum(1 for token in tokens if token.tokentype != TokenType.SPACE)
+    # pylint: disable=protected-access
+    return {
+        'construct_seconds': construct,
+        'table_cells': len(llparser._parser_table),
+        'push_cells': len(llparser._push_table),
+        'tokenizer_mb_per_s': len(text.encode('utf-8')) / tokenize / 1e6,
+        'parse_tokens_per_s': count / parse,
+    }
+
+def run(quick: bool = False, repeats: int = 3, optimize: bool = False) -> dict:
+    '''
+        runs every case and returns the results as a json serializable dict
+    '''
+    results: dict = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': {},
+    }
+    for name, grammar_factory, text_factory in cases(quick):
+        results['cases'][name] = measure(grammar_factory, text_factory(), repeats, optimize)
+    return results
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    '''
+        one line per metric present in both runs, regressions marked
+        with REGRESSION. Returns the lines.
+    '''
+    lines = []
+    for name, metrics in new['cases'].items():
+        previous = old['cases'].get(name)
+        if previous is None:
+            continue
+        for metric, direction in METRICS.items():
+            if metric not in metrics or metric not in previous or not previous[metric]:
+                continue
+            change = (metrics[metric] - previous[metric]) / previous[metric]
+            worse = -change * direction > threshold
+            lines.append(f'{name:<16} {metric:<20} {previous[metric]:>14.4f} '
+                         f'{metrics[metric]:>14.4f} {change:>+8.1%}'
+                         + ('  REGRESSION' if worse else ''))
+    return lines
+
+def print_results(results: dict):
+    '''
+        prints results as a table
+    '''
+    print(f'{"case":<16} ' + ' '.join(f'{metric:>20}' for metric in METRICS))
+    for name, metrics in results['cases'].items():
+        print(f'{name:<16} ' + ' '.join(f'{metrics[metric]:>20.4f}' for metric in METRICS))
+
+def main(argv: Optional[list[str]] = None) -> int:
+    '''
+        command line entry point, returns the exit status
+    '''
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('--json', metavar='FILE', help='write the results to FILE')
+    argparser.add_argument('--quick', action='store_true', help='smaller sentences')
+    argparser.add_argument('--optimize', action='store_true', help='optimize the grammars')
+    argparser.add_argument('--repeats', type=int, default=3)
+    argparser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'))
+    argparser.add_argument('--threshold', type=float, default=0.1)
+    args = argparser.parse_args(argv)
+
+    if args.compare:
+        runs = []
+        for filename in args.compare:
+            with open(filename, 'r', encoding='utf-8') as file:
+                runs.append(json.load(file))
+        lines = compare(runs[0], runs[1], args.threshold)
+        print('\n'.join(lines))
+        return 1 if any(line.endswith('REGRESSION') for line in lines) else 0
+
+    results = run(args.quick, args.repeats, args.optimize)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
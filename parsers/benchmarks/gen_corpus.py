@@ -0,0 +1,50 @@
+'''
+    Writes a random corpus of one of the benchmark grammars, for load and
+    soak tests of the parser
+
+    usage (from the parsers directory):
+        python -m benchmarks.gen_corpus CASE SIZE_MB [-o FILE] [--seed N] [--max-depth N]
+
+    CASE is a case name of bench_suite (expression-20, json, list-loop,
+    ...). The corpus has one sentence per line and SIZE_MB megabytes;
+    it goes to stdout without -o. Memory use does not grow with the size.
+'''
+import argparse
+import sys
+from time import perf_counter
+from typing import Optional
+
+from parsers import SentenceGenerator, text_cost
+
+from .bench_suite import cases
+
+def main(argv: Optional[list[str]] = None) -> int:
+    '''
+        command line entry point, returns the exit status
+    '''
+    factories = {name: grammar_factory for name, grammar_factory, _ in cases()}
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('case', choices=sorted(factories))
+    argparser.add_argument('size_mb', type=float)
+    argparser.add_argument('-o', '--output', metavar='FILE')
+    argparser.add_argument('--seed', type=int, default=None)
+    argparser.add_argument('--max-depth', type=int, default=1000)
+    args = argparser.parse_args(argv)
+
+    generator = SentenceGenerator(factories[args.case](), seed=args.seed,
+                                  cost=text_cost, max_depth=args.max_depth)
+    size = int(args.size_mb * 1e6)
+    start = perf_counter()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            written = generator.write(file, size)
+    else:
+        written = generator.write(sys.stdout, size)
+    seconds = perf_counter() - start
+    print(f'{written / 1e6:.1f} MB in {seconds:.1f} s, {written / 1e6 / seconds:.2f} MB/s',
+          file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+'''
+    Synthetic grammars for the benchmarks
+
+    Grammars are written as (nonterminal, [symbols]) productions. The first
+    nonterminal is the start symbol, every symbol that appears on a left
+    side is a nonterminal, EPSILON is ε and everything else is a terminal.
+'''
+
+from parsers import Grammar, GrammarTerminal, NonTerminal, Repeat, create_grammar
+
+EPSILON = 'e'
+
+Productions = list[tuple[str, list[str]]]
+
+def make_grammar(productions: Productions) -> Grammar:
+    '''
+        builds a Grammar out of productions
+    '''
+    text = '\n'.join(f'{name} : {" ".join(symbols)}' for name, symbols in productions)
+    return create_grammar(text, epsilon=EPSILON)
+
+def expression_productions(levels: int) -> Productions:
+    '''
+        an LL(1) expression grammar with one precedence level per operator
+            E0 : E1 Z0         Z0 : op0 E1 Z0 | ε
+            ...
+            En : atom
+            atom : a | ( E0 )
+        3 * levels + 3 productions
+    '''
+    productions: Productions = []
+    for level in range(levels):
+        productions.append((f'E{level}', [f'E{level+1}', f'Z{level}']))
+        productions.append((f'Z{level}', [f'op{level}', f'E{level+1}', f'Z{level}']))
+        productions.append((f'Z{level}', [EPSILON]))
+    productions.append((f'E{levels}', ['atom']))
+    productions.append(('atom', ['a']))
+    productions.append(('atom', ['(', 'E0', ')']))
+    return productions
+
+def expression_grammar(levels: int) -> Grammar:
+    '''
+        see expression_productions
+    '''
+    return make_grammar(expression_productions(levels))
+
+def expression_text(levels: int, operands: int) -> str:
+    '''
+        a sentence of expression_grammar(levels) with operands operands,
+        cycling through the operators and nesting every tenth operand
+    '''
+    parts = []
+    for idx in range(operands):
+        if idx:
+            parts.append(f'op{idx % levels}')
+        parts.append('( a )' if idx % 10 == 9 else 'a')
+    return ' '.join(parts)
+
+def record_productions(fields: int) -> Productions:
+    '''
+        a grammar with one long alternate of optional fields
+            record : F0 F1 ... Fn end
+            Fi : keyi value | ε
+        every suffix behind a field has its own first set, so the
+        suffixes of the record alternate dominate the first/follow work.
+        2 * fields + 1 productions
+    '''
+    productions: Productions = [('record', [f'F{idx}' for idx in range(fields)] + ['end'])]
+    for idx in range(fields):
+        productions.append((f'F{idx}', [f'key{idx}', 'value']))
+        productions.append((f'F{idx}', [EPSILON]))
+    return productions
+
+def record_grammar(fields: int) -> Grammar:
+    '''
+        see record_productions
+    '''
+    return make_grammar(record_productions(fields))
+
+def json_productions() -> Productions:
+    '''
+        a JSON-like grammar over whitespace separated words
+            value : object | array | str | num | true | false | null
+            object : { members }      members : pair more | ε
+            more : , pair more | ε    pair : str : value
+            array : [ elements ]      elements : value items | ε
+            items : , value items | ε
+    '''
+    productions: Productions = [('value', [word]) for word in
+                                    ('object', 'array', 'str', 'num', 'true', 'false', 'null')]
+    productions += [
+        ('object', ['{', 'members', '}']),
+        ('members', ['pair', 'more']),
+        ('members', [EPSILON]),
+        ('more', [',', 'pair', 'more']),
+        ('more', [EPSILON]),
+        ('pair', ['str', ':', 'value']),
+        ('array', ['[', 'elements', ']']),
+        ('elements', ['value', 'items']),
+        ('elements', [EPSILON]),
+        ('items', [',', 'value', 'items']),
+        ('items', [EPSILON]),
+    ]
+    return productions
+
+def json_grammar() -> Grammar:
+    '''
+        see json_productions
+    '''
+    return make_grammar(json_productions())
+
+def json_text(records: int) -> str:
+    '''
+        an array of records objects, each with a nested array and object
+    '''
+    record = '{ str : num , str : [ true , false , null ] , str : { str : str } }'
+    return '[ ' + ' , '.join([record] * records) + ' ]'
+
+def keyword_productions(keywords: int) -> Productions:
+    '''
+        a wide and flat statement grammar
+            statements : statement statements | ε
+            statement : kw0 a | kw1 a | ... | kwn a
+        keywords + 3 productions
+    '''
+    productions: Productions = [('statements', ['statement', 'statements']),
+                                ('statements', [EPSILON])]
+    productions += [('statement', [f'kw{idx}', 'a']) for idx in range(keywords)]
+    return productions
+
+def keyword_grammar(keywords: int) -> Grammar:
+    '''
+        see keyword_productions
+    '''
+    return make_grammar(keyword_productions(keywords))
+
+def keyword_text(keywords: int, statements: int) -> str:
+    '''
+        a sentence of keyword_grammar(keywords) cycling through the keywords
+    '''
+    return ' '.join(f'kw{(idx * 7) % keywords} a' for idx in range(statements))
+
+def list_grammar(loop: bool) -> Grammar:
+    '''
+        a comma separated list of calls f ( a ), as right recursion
+            list : item rest      rest : , item rest | ε
+            item : f ( a )
+        or, when loop is set, as an EBNF repetition
+            list : item (, item)*
+    '''
+    if not loop:
+        return make_grammar([('list', ['item', 'rest']),
+                             ('rest', [',', 'item', 'rest']),
+                             ('rest', [EPSILON]),
+                             ('item', ['f', '(', 'a', ')'])])
+    grammar = make_grammar([('list', ['item']), ('item', ['f', '(', 'a', ')'])])
+    comma, item = GrammarTerminal(',', ','), NonTerminal('item')
+    grammar.terminals.add(comma)
+    grammar.data[grammar.start].alts[0].data += (Repeat.of([comma, item], '*'),)
+    return grammar
+
+def list_text(items: int) -> str:
+    '''
+        a sentence of list_grammar with items items
+    '''
+    return ' , '.join(['f ( a )'] * items)
@@ -3,6 +3,13 @@
 '''
 from .tokenizer import tokenizer, Token, TokenType, TokenizerException
 from .elements import *
-from .llparser import LLParser
+from .grammar_text import create_grammar
+from .llparser import LLParser, ParseException
+from .profiler import ParserProfile
+from .checkpoint import ParseCheckpoint
+from .optimizer import OptimizationReport, optimize_grammar
+from .generator import SentenceGenerator, min_derivations, terminal_text, text_cost
+from .nestedlist import FlatList, parse_flat, parse_nested
+from .cache import CachedParser, CacheStats, ParseOutcome, grammar_fingerprint
 # for testing
 from .ll_ff import FirstFollowSet
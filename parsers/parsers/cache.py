@@ -0,0 +1,198 @@
+'''
+    Module cache puts a cache of parse outcomes in front of LLParser.parse
+
+    A document is looked up by (grammar fingerprint, BLAKE2b digest of its
+    source bytes), so a document seen before costs one hash and one dict
+    lookup instead of tokenizing and parsing it again. LLParser builds no
+    tree, so the outcome of a parse is whether it was accepted and, when
+    not, the error message. The tokenize function is not part of the key,
+    a disk tier should only be shared by parsers that tokenize alike.
+
+    The memory tier is an LRU bounded by the bytes its entries take. The
+    optional disk tier keeps one small file per outcome in a directory. It
+    is shared by every process and grammar that uses the directory, since
+    the fingerprint is part of each name, and nothing is evicted from it.
+'''
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Union
+
+from .elements import grammar_fingerprint
+from .llparser import LLParser, ParseException
+from .tokenizer import Token, TokenizerException, tokenizer
+
+Tokenize = Callable[[str], Iterable[Token]]
+
+def _tokenize(text: str) -> Iterable[Token]:
+    return tokenizer(iter(text))
+
+@dataclass(slots=True)
+class ParseOutcome:
+    '''
+        Data class of a cached parse
+            accepted = True when the document parsed
+            error = the error message when it did not
+    '''
+    accepted: bool
+    error: Optional[str] = None
+
+@dataclass
+class CacheStats:
+    '''
+        Data class of the counters of a CachedParser
+            hits = outcomes found in memory
+            disk_hits = outcomes found on disk only
+            misses = documents parsed
+            evictions = outcomes dropped from memory
+            entries, size = outcomes in memory and the bytes they take
+    '''
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+            the share of lookups that did not parse, 0.0 before any
+        '''
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        '''
+            returns the counters as a plain (json serializable) dict
+        '''
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': self.entries, 'size': self.size,
+                'hit_rate': self.hit_rate}
+
+class CachedParser:
+    '''
+        Parses documents with parser unless their outcome is cached
+            max_bytes = bound of the memory tier
+            directory = where the disk tier is kept, None for no disk tier
+            tokenize = turns the text of a document into tokens
+
+        After an edit of the grammar of parser the outcomes of the old
+        grammar are no longer found. Only documents that do not tokenize
+        or parse have their error cached, any other exception is raised.
+    '''
+    def __init__(self, parser: LLParser, max_bytes: int = 1 << 24,
+                 directory: Optional[str] = None, tokenize: Tokenize = _tokenize):
+        self._parser = parser
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._tokenize = tokenize
+        self._entries: OrderedDict[tuple[str, bytes], tuple[ParseOutcome, int]] = OrderedDict()
+        self.stats = CacheStats()
+        self.fingerprint = grammar_fingerprint(parser.grammar)
+        self._edits = parser.edits
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def refresh(self):
+        '''
+            takes up the grammar of the parser again, outcome() does so
+            when the parser counted an edit
+        '''
+        self.fingerprint = grammar_fingerprint(self._parser.grammar)
+        self._edits = self._parser.edits
+
+    def outcome(self, source: Union[str, bytes]) -> ParseOutcome:
+        '''
+            the ParseOutcome of source, parsing it only when it is in no tier
+        '''
+        if self._parser.edits != self._edits:
+            self.refresh()
+        data = source.encode() if isinstance(source, str) else source
+        key = (self.fingerprint, hashlib.blake2b(data, digest_size=16).digest())
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+        result = self._read(key)
+        if result is not None:
+            self.stats.disk_hits += 1
+        else:
+            self.stats.misses += 1
+            try:
+                self._parser.parse(self._tokenize(data.decode()))
+                result = ParseOutcome(True)
+            except (ParseException, TokenizerException) as error:
+                result = ParseOutcome(False, str(error))
+            self._write(key, result)
+        self._add(key, result)
+        return result
+
+    def parse(self, source: Union[str, bytes]):
+        '''
+            like LLParser.parse: raises the error of source when it does
+            not parse, cached or not
+        '''
+        result = self.outcome(source)
+        if not result.accepted:
+            raise ParseException(result.error)
+
+    def clear(self):
+        '''
+            empties the memory tier, the disk tier stays
+        '''
+        self._entries.clear()
+        self.stats.entries = self.stats.size = 0
+
+    def _add(self, key: tuple[str, bytes], result: ParseOutcome):
+        size = sys.getsizeof(key[1]) + sys.getsizeof(result) + sys.getsizeof(result.error)
+        self._entries[key] = (result, size)
+        self.stats.entries += 1
+        self.stats.size += size
+        while self.stats.size > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.stats.entries -= 1
+            self.stats.size -= evicted
+            self.stats.evictions += 1
+
+    def _path(self, key: tuple[str, bytes]) -> str:
+        return os.path.join(self.directory, f'{key[0]}-{key[1].hex()}') # type: ignore
+
+    def _read(self, key: tuple[str, bytes]) -> Optional[ParseOutcome]:
+        '''
+            the outcome of key on disk: b'1', or b'0' and the error
+        '''
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if data[:1] == b'1':
+            return ParseOutcome(True)
+        if data[:1] == b'0':
+            return ParseOutcome(False, data[1:].decode())
+        return None
+
+    def _write(self, key: tuple[str, bytes], result: ParseOutcome):
+        '''
+            writes the outcome of key to disk, replacing it at once. When
+            that fails the outcome is only kept in memory.
+        '''
+        if self.directory is None:
+            return
+        path = self._path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as file:
+                file.write(b'1' if result.accepted else b'0' + (result.error or '').encode())
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
@@ -0,0 +1,82 @@
+'''
+    Module checkpoint holds the snapshot of a running LLParser
+
+    A checkpoint is taken right before the parser reads the token at
+    token_offset, so the stack it holds is exactly what is needed to carry
+    on parsing from that token. LLParser keeps no value stack, hence the
+    parser state is fully described by the stack and the token offset.
+    The symbol ids only mean something to the grammar they were numbered
+    for, so a checkpoint carries the fingerprint of that grammar.
+'''
+
+import struct
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .tokenizer import Token
+
+_MAGIC = b'LLCP'
+_VERSION = 1
+_HEADER = struct.Struct('<4sI16sQI')
+
+@dataclass(frozen=True)
+class ParseCheckpoint:
+    '''
+        Data class to hold a parser snapshot
+            token_offset = number of tokens (spaces included) consumed
+                           from the token stream
+            stack = parser stack as symbol ids, bottom first
+            grammar = digest of the grammar, see elements.grammar_fingerprint
+    '''
+    token_offset: int
+    stack: tuple[int, ...]
+    grammar: bytes = bytes(16)
+
+    def to_bytes(self) -> bytes:
+        '''
+            compact little-endian encoding: 4 bytes magic, u32 version,
+            16 bytes grammar, u64 token_offset, u32 stack length,
+            u32 symbol id per element
+        '''
+        return _HEADER.pack(_MAGIC, _VERSION, self.grammar,
+                            self.token_offset, len(self.stack)) + \
+                struct.pack(f'<{len(self.stack)}I', *self.stack)
+
+    @staticmethod
+    def from_bytes(buffer: bytes) -> 'ParseCheckpoint':
+        '''
+            inverse of to_bytes
+        '''
+        magic, version, grammar, token_offset, length = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC or version != _VERSION:
+            raise Exception(f'Not a version {_VERSION} checkpoint: {magic!r} {version}')
+        stack = struct.unpack_from(f'<{length}I', buffer, _HEADER.size)
+        return ParseCheckpoint(token_offset, stack, grammar)
+
+class CheckpointingReader: # pylint: disable=too-few-public-methods
+    '''
+        Wraps a TokenReader and calls snapshot(offset) before reading the
+        token at offset, whenever at least every tokens were read since the
+        last snapshot.
+    '''
+    def __init__(self, reader, every: int, snapshot: Callable[[int], None]):
+        self._reader = reader
+        self._every = every
+        self._snapshot = snapshot
+        self._next = reader.offset + every
+
+    @property
+    def offset(self) -> int:
+        '''
+            see TokenReader.offset
+        '''
+        return self._reader.offset
+
+    def nexttoken(self) -> Optional[Token]:
+        '''
+            see TokenReader.nexttoken
+        '''
+        if self._reader.offset >= self._next:
+            self._snapshot(self._reader.offset)
+            self._next = self._reader.offset + self._every
+        return self._reader.nexttoken()
@@ -1,11 +1,19 @@
 '''
 class definitions for elements of a context free grammar
+
+The elements are slotted dataclasses: a grammar holds one object per
+symbol occurrence, and without a per-instance __dict__ each of them is a
+fraction of the size. Equality is unchanged by the slots.
 '''
 
+import hashlib
 from dataclasses import dataclass, field
 from abc import ABC
+from typing import Optional, Union
+
+from .tokenizer import TokenType
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GrammarToken(ABC):
     '''
         Base class for Grammar tokens.
@@ -16,10 +24,56 @@ class NonTerminal(GrammarToken): # pylint: disable=too-few-public-methods
     '''
         The nonterminal
     '''
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return self.symbol
+
+@dataclass(frozen=True, slots=True)
+class Repeat(NonTerminal):
+    '''
+        EBNF repetition inside an alternate
+            body = the repeated tokens
+            op = '*' zero or more, '+' one or more, '?' zero or one
+
+        A Repeat is a nonterminal whose rule Grammar.add_repeat_rules()
+        generates, so first/follow sets and conflicts come out of the
+        usual machinery:
+            (w)*  : w (w)* | ε
+            (w)+  : w (w)*
+            (w)?  : w | ε
+        LLParser runs (w)* as a loop state instead of expanding it once
+        per element. Build it with Repeat.of(body, op).
+    '''
+    body: tuple[GrammarToken, ...] = ()
+    op: str = '*'
+
+    @staticmethod
+    def of(body, op: str) -> 'Repeat':
+        '''
+            the Repeat of the tokens of body, named after them
+        '''
+        if op not in ('*', '+', '?'):
+            raise Exception(f'Unknown repetition {op}')
+        body = tuple(body)
+        if not body:
+            raise Exception('Empty repetition')
+        return Repeat(f'({" ".join(x.symbol for x in body)}){op}', body, op)
+
+    def alternates(self, epsilon: GrammarToken) -> list['Alternate']:
+        '''
+            the alternates of the rule of this Repeat
+        '''
+        if self.op == '*':
+            return [Alternate(self.body + (self,)), Alternate([epsilon])]
+        if self.op == '+':
+            return [Alternate(self.body + (Repeat(self.symbol[:-1] + '*', self.body, '*'),))]
+        return [Alternate(self.body), Alternate([epsilon])]
+
     def __str__(self) -> str:
         return self.symbol
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GrammarTerminal(GrammarToken):
     '''
         GrammarTerminal has a symbol and a val
@@ -36,13 +90,37 @@ class GrammarTerminal(GrammarToken):
     def __str__(self) -> str:
         return self.symbol
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class TokenClass(GrammarTerminal):
+    '''
+        A terminal that matches any input token of a TokenType, e.g. any
+        INT, instead of one value. A token whose value is a literal
+        terminal of the grammar is always that literal, so keywords stay
+        out of <NAME>. Build it with TokenClass.of(tokentype).
+    '''
+    tokentype: TokenType
+
+    @staticmethod
+    def of(tokentype: TokenType) -> 'TokenClass':
+        '''
+            the TokenClass of tokentype, named <INT>, <NAME> or <STRING>
+        '''
+        if tokentype not in TOKEN_CLASSES:
+            raise Exception(f'{tokentype} is not a token class')
+        return TokenClass(f'<{tokentype.name}>', None, tokentype)
+
+    def __str__(self) -> str:
+        return self.symbol
+
+TOKEN_CLASSES = (TokenType.INT, TokenType.NAME, TokenType.STRING)
+
+@dataclass(frozen=True, slots=True)
 class Start(NonTerminal): # pylint: disable=too-few-public-methods
     '''
         The Start class
     '''
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Epsilon(GrammarToken): # pylint: disable=too-few-public-methods
     '''
         The Epsilon
@@ -50,7 +128,7 @@ class Epsilon(GrammarToken): # pylint: disable=too-few-public-methods
     def __str__(self) -> str:
         return self.symbol
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Eof(GrammarToken): # pylint: disable=too-few-public-methods
     '''
         The Eof.
@@ -63,37 +141,231 @@ class Eof(GrammarToken): # pylint: disable=too-few-public-methods
     def __str__(self) -> str:
         return '$'
 
-@dataclass
+@dataclass(slots=True)
 class Alternate:
     '''
         data class to hold the right side of a production A->B
 
-        data = list of tokens
+        data = tuple of tokens, a list given to the constructor is
+               stored as a tuple
     '''
-    data : list[GrammarToken]
+    data : tuple[GrammarToken, ...]
+
+    def __post_init__(self):
+        if not isinstance(self.data, tuple):
+            self.data = tuple(self.data)
 
     def __str__(self) -> str:
         return ''.join([t.symbol for t in self.data])
 
 
-@dataclass
+@dataclass(slots=True)
 class Rule:
     '''
         Simple data class to hold the right side of a production A->B|C
         data = dictionary of rules
             key = NonTerminal A
-            value = List of Rules [B, C]
+            value = List of Rules [B, C], a tuple once the grammar is frozen
     '''
-    alts : list[Alternate]
+    alts : list[Alternate] | tuple[Alternate, ...]
     ident: NonTerminal
 
-@dataclass
+@dataclass(slots=True)
+class SymbolTable:
+    '''
+        Data class that interns GrammarTokens to dense ints
+            tokens = token by id
+            ids = id by token
+            terminals = id of a GrammarTerminal by the value the tokenizer
+                        gives its symbol, which is how input tokens are
+                        looked up: an int for decimal digits written the
+                        way str(int) writes them, so 5 but not 05, else the
+                        symbol text
+            classes = id of a TokenClass by its TokenType, where input
+                      tokens are looked up when their value is none of
+                      the terminals
+
+        Ids are handed out on first use and never change, so tables and
+        int bitmasks built over them stay valid while symbols are added.
+        A set of tokens is held as a bitmask: bit i is set when tokens[i]
+        is in the set.
+    '''
+    tokens: list[GrammarToken] = field(default_factory=list)
+    ids: dict[GrammarToken, int] = field(default_factory=dict)
+    terminals: dict[Union[str, int], int] = field(default_factory=dict)
+    classes: dict[TokenType, int] = field(default_factory=dict)
+
+    def intern(self, token: GrammarToken) -> int:
+        '''
+            returns the id of token, numbering it if it is new
+        '''
+        idx = self.ids.get(token)
+        if idx is None:
+            idx = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+            if isinstance(token, TokenClass):
+                self.classes[token.tokentype] = idx
+            elif isinstance(token, GrammarTerminal):
+                symbol = token.symbol
+                if symbol.isdecimal() and str(int(symbol)) == symbol:
+                    self.terminals[int(symbol)] = idx
+                else:
+                    self.terminals[symbol] = idx
+        return idx
+
+    def token(self, idx: int) -> GrammarToken:
+        '''
+            returns the token of id idx
+        '''
+        return self.tokens[idx]
+
+    def bit(self, token: GrammarToken) -> int:
+        '''
+            returns the single-bit mask of token
+        '''
+        idx = self.ids.get(token)
+        return 1 << (self.intern(token) if idx is None else idx)
+
+    def mask(self, token_s) -> int:
+        '''
+            returns the mask of a set, list or single token
+        '''
+        if isinstance(token_s, GrammarToken):
+            return self.bit(token_s)
+        result = 0
+        for token in token_s:
+            result |= self.bit(token)
+        return result
+
+    def tokens_of(self, mask: int) -> set[GrammarToken]:
+        '''
+            returns the set of tokens of mask
+        '''
+        result = set()
+        while mask:
+            low = mask & -mask
+            result.add(self.tokens[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+@dataclass(slots=True)
 class Grammar:
     '''
         Grammer DataClass
     '''
-    terminals: set[GrammarTerminal]
+    terminals: set[GrammarTerminal] | frozenset[GrammarTerminal]
     data: dict[NonTerminal, Rule]
     start: NonTerminal
     endmarker: Eof
     epsilon: NonTerminal
+    _symbols: Optional[SymbolTable] = field(default=None, init=False,
+                                            repr=False, compare=False)
+    _frozen: bool = field(default=False, init=False, repr=False, compare=False)
+
+    @property
+    def frozen(self) -> bool:
+        '''
+            True once freeze() was called
+        '''
+        return self._frozen
+
+    def freeze(self) -> 'Grammar':
+        '''
+            makes the grammar read only: terminals become a frozenset and
+            every rule keeps its alternates in a tuple. LLParser refuses
+            to edit a frozen grammar. Returns self.
+        '''
+        self.add_repeat_rules()
+        self.terminals = frozenset(self.terminals)
+        for rule in self.data.values():
+            rule.alts = tuple(rule.alts)
+        self._frozen = True
+        return self
+
+    def copy(self) -> 'Grammar':
+        '''
+            a grammar with the same symbols and its own rules and
+            alternates, not frozen, so that editing it leaves self as it is
+        '''
+        return Grammar(set(self.terminals),
+                       {nonterminal: Rule([Alternate(alt.data) for alt in rule.alts], nonterminal)
+                            for nonterminal, rule in self.data.items()},
+                       self.start, self.endmarker, self.epsilon)
+
+    def add_repeat_rules(self) -> list[Repeat]:
+        '''
+            adds the rule of every Repeat used in an alternate that has
+            none yet, nested ones included, and returns those Repeats.
+            A grammar without epsilon gets Epsilon('ε') when it needs one.
+        '''
+        added: list[Repeat] = []
+        todo = [x for rule in self.data.values() for alt in rule.alts
+                    for x in alt.data if isinstance(x, Repeat)]
+        while todo:
+            repeat = todo.pop()
+            if repeat in self.data:
+                continue
+            if self.epsilon is None and repeat.op != '+':
+                self.epsilon = Epsilon('ε')
+            alts = repeat.alternates(self.epsilon)
+            self.data[repeat] = Rule(tuple(alts) if self._frozen else alts, repeat)
+            added.append(repeat)
+            for alt in alts:
+                for x in alt.data: # pylint: disable=invalid-name
+                    if isinstance(x, GrammarTerminal):
+                        self.terminals.add(x) # type: ignore
+                    elif isinstance(x, Repeat):
+                        todo.append(x)
+        return added
+
+    def symbol_table(self) -> SymbolTable:
+        '''
+            the SymbolTable of the grammar: the endmarker, the start, then
+            the nonterminals and the symbols of their alternates in grammar
+            order, the remaining terminals by symbol and epsilon.
+            Symbols added to the grammar since the last call get the next
+            free ids.
+        '''
+        if self._symbols is None:
+            self._symbols = SymbolTable()
+        table = self._symbols
+        table.intern(self.endmarker)
+        table.intern(self.start)
+        for nonterminal, rule in self.data.items():
+            table.intern(nonterminal)
+            for alt in rule.alts:
+                for x in alt.data: # pylint: disable=invalid-name
+                    table.intern(x)
+        for terminal in sorted(self.terminals, key=lambda t: t.symbol):
+            table.intern(terminal)
+        if self.epsilon is not None:
+            table.intern(self.epsilon)
+        return table
+
+def grammar_fingerprint(grammar: Grammar) -> str:
+    '''
+        hex digest of the rules of grammar: rules by symbol, alternates in
+        order (the first one wins a conflict), every symbol with its kind.
+        Grammars that parse alike from the same rules get the same one.
+    '''
+    def kind(token) -> str:
+        if isinstance(token, TokenClass):
+            return 'C'
+        if isinstance(token, NonTerminal):
+            return 'N'
+        if isinstance(token, Epsilon):
+            return 'E'
+        return 'T'
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'start {grammar.start.symbol}\n'.encode())
+    for nonterminal in sorted(grammar.data, key=lambda x: x.symbol):
+        for alt in grammar.data[nonterminal].alts:
+            digest.update(f'{nonterminal.symbol} :'.encode())
+            for token in alt.data:
+                digest.update(f' {kind(token)}{len(token.symbol)}:{token.symbol}'.encode())
+            digest.update(b'\n')
+    return digest.hexdigest()
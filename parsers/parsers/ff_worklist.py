@@ -0,0 +1,470 @@
+'''
+    Internal module that computes first and follow sets with a worklist
+
+    First sets are solved over the nonterminals:
+        Fi(A)    depends on Fi(B) for every B in an alternate of A
+    The first sets of the suffixes of an alternate live in a suffix table,
+    one int per (alternate, position), filled right to left:
+        Fi(x)      = Fi(A) for a nonterminal, { a } for a terminal, { ε } for ε
+        Fi(x w')   = Fi(x) - { ε } ∪ Fi(w') when x is a nonterminal with ε in Fi(x)
+                   = Fi(x) otherwise
+    so no suffix is ever sliced off or hashed.
+
+    Follow sets form a second graph over the nonterminals:
+        Fo(B)    depends on Fo(A) for every A -> wBw' with ε in Fi(w') or w' empty
+    and start from the suffix table entries behind each occurrence of B.
+
+    Both graphs are solved one strongly connected component at a time, in
+    dependency order, so a nonterminal is only revisited while its own
+    component changes. Follow sets push only the newly added tokens (the
+    delta) to the nonterminals that depend on them.
+
+    Sets are int bitmasks over the grammar's symbol ids (see
+    elements.SymbolTable), so unions, differences and change checks are
+    integer operations.
+
+    The result is identical to the fixed point computed by
+    LLParser._fixed_point_first_follow: the firsts property lays the suffix
+    table out with the same keys.
+'''
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Hashable, Iterable, Optional
+
+from .elements import Alternate, Epsilon, Grammar, GrammarTerminal, NonTerminal
+from .ll_ff import BitsetFirstFollowSet, FirstFollowKeyType
+
+Word = FirstFollowKeyType
+
+def _strongly_connected(nodes: Iterable[Hashable],
+                        deps: dict) -> list[list]:
+    '''
+        iterative Tarjan. Returns the components with every component
+        listed after the components it depends on.
+    '''
+    index: dict = {}
+    lowlink: dict = {}
+    onstack: set = set()
+    stack: list = []
+    components: list[list] = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(deps.get(root, ())))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        onstack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    onstack.add(child)
+                    work.append((child, iter(deps.get(child, ()))))
+                    break
+                if child in onstack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onstack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+def _propagate(nodes: list, deps: dict, dependents: dict, base: dict, value: dict) -> int:
+    '''
+        solves value[node] as base[node] or'ed with the values of its deps,
+        component by component, for every node. Returns the number of
+        deltas applied.
+    '''
+    pending: dict = {node: mask for node, mask in base.items() if mask}
+    steps = 0
+    for component in _strongly_connected(nodes, deps):
+        members = set(component)
+        work = deque(node for node in component if node in pending)
+        while work:
+            node = work.popleft()
+            delta = pending.pop(node, 0) & ~value[node]
+            if not delta:
+                continue
+            steps += 1
+            value[node] |= delta
+            for dependent in dependents.get(node, ()):
+                added = delta & ~value[dependent]
+                if added:
+                    pending[dependent] = pending.get(dependent, 0) | added
+                    if dependent in members:
+                        work.append(dependent)
+    return steps
+
+def _closure(seeds: Iterable, dependents: dict) -> set:
+    '''
+        seeds and every node that depends on them, directly or not
+    '''
+    closure = set(seeds)
+    todo = list(closure)
+    while todo:
+        for dependent in dependents.get(todo.pop(), ()):
+            if dependent not in closure:
+                closure.add(dependent)
+                todo.append(dependent)
+    return closure
+
+@dataclass
+class IndexedAlternate:
+    '''
+        Data class for an alternate in the suffix table
+            owner = nonterminal of the rule
+            alt = the Alternate of the grammar
+            data = alt.data as a tuple
+            suffixes = suffixes[i] is the bitmask of Fi(data[i:])
+            positions = nonterminal -> its positions in data
+    '''
+    owner: NonTerminal
+    alt: Alternate
+    data: tuple
+    suffixes: list[int]
+    positions: dict[NonTerminal, list[int]] = field(default_factory=dict)
+
+    @property
+    def first(self) -> int:
+        '''
+            Fi(data), Fi of the empty word is the empty set
+        '''
+        return self.suffixes[0] if self.suffixes else 0
+
+    def suffix(self, idx: int) -> int:
+        '''
+            Fi(data[idx:])
+        '''
+        return self.suffixes[idx] if idx < len(self.suffixes) else 0
+
+class FirstFollowSolver: # pylint: disable=too-many-instance-attributes
+    '''
+        Holds the suffix table, the follow graph of a grammar and their solution.
+
+        first(A), alternates(A) and follow(A) answer in bitmasks over ids.
+        firsts, follows = BitsetFirstFollowSet views with the keys of the
+                          fixed point (built on access)
+        steps = number of worklist steps taken so far
+
+        update() is told about alternates added to or removed from the
+        grammar and re-solves only the nonterminals whose sets can change:
+        the edited ones and everything that depends on them.
+    '''
+    def __init__(self, grammar: Grammar):
+        self._grammar = grammar
+        self.ids = grammar.symbol_table()
+        self._endmarker = self.ids.bit(grammar.endmarker)
+        self._epsilon = self.ids.bit(grammar.epsilon) if grammar.epsilon is not None else 0
+
+        # the suffix table, addressed by alternate index
+        self._alts: list[Optional[IndexedAlternate]] = []
+        self._owned: dict[NonTerminal, list[int]] = {}
+        self._users: dict[NonTerminal, list[int]] = {}
+        self._first: dict[NonTerminal, int] = {}
+
+        # follow graph
+        self._followdeps: dict[NonTerminal, list[NonTerminal]] = {}
+        self._followdependents: dict[NonTerminal, list[NonTerminal]] = {}
+        self._followbase: dict[NonTerminal, int] = {}
+        self._follow: dict[NonTerminal, int] = {}
+
+        self.steps = 0
+        self._views: Optional[tuple[BitsetFirstFollowSet, BitsetFirstFollowSet]] = None
+
+        for nonterminal, rule in grammar.data.items():
+            self._owned.setdefault(nonterminal, [])
+            for alt in rule.alts:
+                self._register(nonterminal, alt)
+        self._solve_first(set(self._owned))
+        self._resolve_follow(set(self._followkeys()))
+
+    def first(self, nonterminal: NonTerminal) -> int:
+        '''
+            Fi(nonterminal)
+        '''
+        return self._first.get(nonterminal, 0)
+
+    def follow(self, nonterminal: NonTerminal) -> int:
+        '''
+            Fo(nonterminal)
+        '''
+        return self._follow.get(nonterminal, 0)
+
+    def alternates(self, nonterminal: NonTerminal) -> list[IndexedAlternate]:
+        '''
+            the alternates of nonterminal in rule order
+        '''
+        return [self._alts[idx] for idx in self._owned.get(nonterminal, ())] # type: ignore
+
+    def unit_parents(self, nonterminal: NonTerminal) -> list[NonTerminal]:
+        '''
+            the nonterminals that have nonterminal as a whole alternate
+        '''
+        return [self._alts[idx].owner for idx in self._users.get(nonterminal, ()) # type: ignore
+                    if len(self._alts[idx].data) == 1] # type: ignore
+
+    @property
+    def firsts(self) -> BitsetFirstFollowSet:
+        '''
+            the first sets keyed by nonterminal, alternate and every suffix
+            behind a nonterminal, like the fixed point computes them
+        '''
+        return self._build_views()[0]
+
+    @property
+    def follows(self) -> BitsetFirstFollowSet:
+        '''
+            the follow sets keyed by nonterminal
+        '''
+        return self._build_views()[1]
+
+    def update(self, added: Iterable[tuple[NonTerminal, Alternate]] = (),
+               removed: Iterable[tuple[NonTerminal, Alternate]] = (),
+               added_rules: Iterable[NonTerminal] = (),
+               removed_rules: Iterable[NonTerminal] = ()) -> set[NonTerminal]:
+        '''
+            re-solves after the grammar was edited: alternates were added
+            to or removed from nonterminals and rules were added or removed.
+            The grammar must already reflect the edit.
+            Returns the nonterminals whose parser table row can change:
+            the edited ones, those with an alternate whose first set changed
+            and those whose follow set changed.
+        '''
+        edited: set[NonTerminal] = set()
+        followseeds: set[NonTerminal] = set()
+        for nonterminal in added_rules:
+            self._owned.setdefault(nonterminal, [])
+            edited.add(nonterminal)
+        for nonterminal, alt in added:
+            for x in alt.data: # pylint: disable=invalid-name
+                if isinstance(x, GrammarTerminal):
+                    self.ids.bit(x)
+            followseeds.update(self._register(nonterminal, alt))
+            edited.add(nonterminal)
+        for nonterminal, alt in removed:
+            followseeds.update(self._unregister(nonterminal, alt))
+            edited.add(nonterminal)
+        for nonterminal in removed_rules:
+            if not self._owned.get(nonterminal):
+                self._owned.pop(nonterminal, None)
+            edited.add(nonterminal)
+
+        affected = self._first_closure(edited)
+        old = {idx: self._alts[idx].first for nonterminal in affected # type: ignore
+                    for idx in self._owned.get(nonterminal, ())}
+        self._solve_first(affected)
+
+        rows = set(edited)
+        for nonterminal in affected:
+            for idx in self._owned.get(nonterminal, ()):
+                alt = self._alts[idx]
+                if old.get(idx) != alt.first: # type: ignore
+                    rows.add(nonterminal)
+                for x in alt.data: # type: ignore # pylint: disable=invalid-name
+                    if isinstance(x, NonTerminal):
+                        followseeds.add(x)
+        rows.update(self._resolve_follow(followseeds))
+        self._views = None
+        return rows
+
+    def _build_views(self) -> tuple[BitsetFirstFollowSet, BitsetFirstFollowSet]:
+        if self._views is None:
+            firsts, follows = BitsetFirstFollowSet(self.ids), BitsetFirstFollowSet(self.ids)
+            for nonterminal in self._grammar.data:
+                firsts.bits[(nonterminal,)] = self.first(nonterminal)
+            for alt in self._alts:
+                if alt is not None:
+                    firsts.bits[alt.data] = alt.first
+            for alt in self._alts:
+                if alt is None:
+                    continue
+                for idx, x in enumerate(alt.data): # pylint: disable=invalid-name
+                    if isinstance(x, NonTerminal):
+                        firsts.bits[alt.data[idx+1:]] = alt.suffix(idx + 1)
+            for nonterminal in self._followkeys():
+                follows.bits[(nonterminal,)] = self.follow(nonterminal)
+            self._views = firsts, follows
+        return self._views
+
+    def _followkeys(self) -> list[NonTerminal]:
+        '''
+            the start and every nonterminal used in an alternate
+        '''
+        keys = {self._grammar.start: None}
+        for nonterminal, users in self._users.items():
+            if users:
+                keys[nonterminal] = None
+        return list(keys)
+
+    def _register(self, nonterminal: NonTerminal, alt: Alternate) -> list[NonTerminal]:
+        '''
+            adds alt to the suffix table and returns the nonterminals in it
+        '''
+        idx = len(self._alts)
+        data = tuple(alt.data)
+        indexed = IndexedAlternate(nonterminal, alt, data, [0] * len(data))
+        self._alts.append(indexed)
+        self._owned.setdefault(nonterminal, []).append(idx)
+        for position, x in enumerate(data): # pylint: disable=invalid-name
+            if isinstance(x, NonTerminal):
+                indexed.positions.setdefault(x, []).append(position)
+        for x in indexed.positions: # pylint: disable=invalid-name
+            self._users.setdefault(x, []).append(idx)
+        return list(indexed.positions)
+
+    def _unregister(self, nonterminal: NonTerminal, alt: Alternate) -> list[NonTerminal]:
+        '''
+            removes the first alternate of nonterminal equal to alt
+        '''
+        for idx in self._owned[nonterminal]:
+            if self._alts[idx].alt == alt: # type: ignore
+                break
+        else:
+            raise Exception(f'{alt} is not an alternate of {nonterminal}')
+        self._owned[nonterminal].remove(idx)
+        used = list(self._alts[idx].positions) # type: ignore
+        for x in used: # pylint: disable=invalid-name
+            self._users[x].remove(idx)
+        self._alts[idx] = None
+        return used
+
+    def _first_closure(self, seeds: Iterable[NonTerminal]) -> set[NonTerminal]:
+        '''
+            seeds and every nonterminal whose alternates use them, directly or not
+        '''
+        closure = set(seeds)
+        todo = list(closure)
+        while todo:
+            for idx in self._users.get(todo.pop(), ()):
+                owner = self._alts[idx].owner # type: ignore
+                if owner not in closure:
+                    closure.add(owner)
+                    todo.append(owner)
+        return closure
+
+    def _fill_suffixes(self, alt: IndexedAlternate):
+        '''
+            fills alt.suffixes right to left
+        '''
+        data, suffixes, epsilon = alt.data, alt.suffixes, self._epsilon
+        last = len(data) - 1
+        for idx in range(last, -1, -1):
+            x = data[idx] # pylint: disable=invalid-name
+            if isinstance(x, GrammarTerminal):
+                suffixes[idx] = self.ids.bit(x)
+            elif isinstance(x, NonTerminal):
+                first = self._first.get(x, 0)
+                if idx < last and first & epsilon:
+                    suffixes[idx] = (first & ~epsilon) | suffixes[idx + 1]
+                else:
+                    suffixes[idx] = first
+            elif isinstance(x, Epsilon) and idx == last:
+                suffixes[idx] = self.ids.bit(x)
+            elif idx == 0 or isinstance(data[idx - 1], NonTerminal):
+                # only suffixes that start a word or follow a nonterminal
+                # are ever read, like the keys of _firsts_loop
+                raise Exception('Unexpected')
+
+    def _solve_first(self, nonterminals: set[NonTerminal]):
+        '''
+            solves Fi of nonterminals, the other first sets being final
+        '''
+        for nonterminal in nonterminals:
+            self._first[nonterminal] = 0
+        deps = {nonterminal: [x for idx in self._owned.get(nonterminal, ())
+                                for x in self._alts[idx].data # type: ignore
+                                if x in nonterminals]
+                    for nonterminal in nonterminals}
+        for component in _strongly_connected(list(nonterminals), deps):
+            members = set(component)
+            work = deque(component)
+            queued = set(component)
+            while work:
+                nonterminal = work.popleft()
+                queued.discard(nonterminal)
+                self.steps += 1
+                first = 0
+                for idx in self._owned.get(nonterminal, ()):
+                    alt = self._alts[idx]
+                    self._fill_suffixes(alt) # type: ignore
+                    first |= alt.first # type: ignore
+                if first == self._first[nonterminal]:
+                    continue
+                self._first[nonterminal] = first
+                for idx in self._users.get(nonterminal, ()):
+                    owner = self._alts[idx].owner # type: ignore
+                    if owner in members and owner not in queued:
+                        queued.add(owner)
+                        work.append(owner)
+
+    def _rebuild_follow(self, nonterminal: NonTerminal):
+        '''
+            recomputes the base and the edges of Fo(nonterminal) from its
+            occurrences and the suffix table
+        '''
+        for dep in self._followdeps.pop(nonterminal, ()):
+            self._followdependents[dep].remove(nonterminal)
+        base = self._endmarker if nonterminal == self._grammar.start else 0
+        owners: dict[NonTerminal, None] = {}
+        for idx in self._users.get(nonterminal, ()):
+            alt = self._alts[idx]
+            for position in alt.positions[nonterminal]: # type: ignore
+                suffix = alt.suffix(position + 1) # type: ignore
+                base |= suffix
+                if suffix & self._epsilon or position + 1 == len(alt.data): # type: ignore
+                    owners[alt.owner] = None # type: ignore
+        self._followdeps[nonterminal] = list(owners)
+        for owner in owners:
+            self._follow.setdefault(owner, 0)
+            self._followdependents.setdefault(owner, []).append(nonterminal)
+        self._followbase[nonterminal] = base
+        self._follow.setdefault(nonterminal, 0)
+
+    def _resolve_follow(self, seeds: set[NonTerminal]) -> set[NonTerminal]:
+        '''
+            rebuilds seeds, resets them and everything depending on them and
+            solves them again from the untouched nonterminals.
+            Returns the nonterminals whose follow changed.
+        '''
+        for nonterminal in seeds:
+            self._rebuild_follow(nonterminal)
+        affected = _closure(seeds, self._followdependents)
+        old = {nonterminal: self._follow.get(nonterminal, 0) for nonterminal in affected}
+        pending: dict[NonTerminal, int] = {}
+        for nonterminal in affected:
+            self._follow[nonterminal] = 0
+        for nonterminal in affected:
+            mask = self._followbase.get(nonterminal, 0)
+            for dep in self._followdeps.get(nonterminal, ()):
+                if dep not in affected:
+                    mask |= self._follow[dep]
+            pending[nonterminal] = mask
+        restricted = {nonterminal: [dep for dep in self._followdeps.get(nonterminal, ())
+                                        if dep in affected]
+                        for nonterminal in affected}
+        self.steps += _propagate(list(affected), restricted, self._followdependents,
+                                 pending, self._follow)
+        return {nonterminal for nonterminal in affected
+                    if self._follow[nonterminal] != old[nonterminal]}
+
+def first_follow(grammar: Grammar) -> tuple[BitsetFirstFollowSet, BitsetFirstFollowSet, int]:
+    '''
+        returns firsts, follows and the number of worklist steps taken.
+        firsts and follows share the grammar's SymbolTable.
+    '''
+    solver = FirstFollowSolver(grammar)
+    return solver.firsts, solver.follows, solver.steps
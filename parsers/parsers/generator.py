@@ -0,0 +1,259 @@
+'''
+    Module generator emits random sentences of a Grammar, for load and
+    soak testing of the parsers
+
+    Every nonterminal gets its minimum derivation length up front, the
+    cost of the cheapest sentence it derives, together with the alternate
+    that achieves it. While generating, the cost already emitted plus the
+    minimum cost of everything still on the stack is known, so an
+    alternate is only picked at random when the sentence can still end
+    within the target size; otherwise the cheapest alternate is taken.
+    The cheapest alternates never loop back, hence generation always
+    terminates.
+
+    Sentences are streamed: the generator holds the pending stack of
+    symbols and nothing of what it already emitted, so a corpus of any
+    size is written in constant memory as long as the stack stays bounded.
+    It does for right recursion and Repeat loops; for nesting grammars
+    such as expressions pass max_depth.
+'''
+
+import bisect
+import heapq
+import itertools
+import random
+from typing import Callable, Iterator, Optional, Sequence, TextIO
+
+from .elements import Alternate, Grammar, GrammarTerminal, GrammarToken, NonTerminal, TokenClass
+from .tokenizer import TokenType
+
+CostType = Callable[[GrammarTerminal], int]
+
+_NEVER = float('inf')
+
+# what a TokenClass is written as, tokenizer() reads it back as its class
+_CLASS_TEXTS = {TokenType.INT: '0', TokenType.NAME: 'name', TokenType.STRING: "'string'"}
+
+def _token_cost(_: GrammarTerminal) -> int:
+    return 1
+
+def terminal_text(terminal: GrammarTerminal) -> str:
+    '''
+        the text of terminal in SentenceGenerator.text: its symbol, or a
+        value of its class for a TokenClass
+    '''
+    if isinstance(terminal, TokenClass):
+        return _CLASS_TEXTS[terminal.tokentype]
+    return terminal.symbol
+
+def text_cost(terminal: GrammarTerminal) -> int:
+    '''
+        the bytes a terminal takes in the text of SentenceGenerator.text,
+        its separator included. Pass it as cost to size corpora in bytes.
+    '''
+    return len(terminal_text(terminal).encode()) + 1
+
+def min_derivations(grammar: Grammar,
+                    cost: CostType = _token_cost) -> tuple[dict[NonTerminal, int],
+                                                           dict[NonTerminal, int]]:
+    '''
+        returns (lengths, cheapest) where lengths[A] is the minimum cost
+        of a sentence A derives and cheapest[A] the index of the alternate
+        of A that achieves it. A terminal costs cost(terminal), ε nothing.
+        Nonterminals that derive no sentence are missing from both.
+
+        Knuth's generalization of Dijkstra: a nonterminal is settled in
+        order of its cost, once every nonterminal of one of its alternates
+        is settled, so following cheapest[] never revisits a nonterminal.
+    '''
+    grammar.add_repeat_rules()
+    lengths: dict[NonTerminal, int] = {}
+    cheapest: dict[NonTerminal, int] = {}
+    # per alternate: the cost of its settled part and its unsettled count
+    partial: dict[tuple[NonTerminal, int], list[int]] = {}
+    waiting: dict[NonTerminal, list[tuple[NonTerminal, int]]] = {}
+    heap: list[tuple[int, int, NonTerminal, int]] = []
+    order = 0
+    for nonterminal, rule in grammar.data.items():
+        for idx, alt in enumerate(rule.alts):
+            total, pending = 0, 0
+            for x in alt.data: # pylint: disable=invalid-name
+                if isinstance(x, NonTerminal):
+                    pending += 1
+                    waiting.setdefault(x, []).append((nonterminal, idx))
+                elif isinstance(x, GrammarTerminal):
+                    total += cost(x)
+            partial[(nonterminal, idx)] = [total, pending]
+            if not pending:
+                heapq.heappush(heap, (total, order, nonterminal, idx))
+                order += 1
+    while heap:
+        length, _, nonterminal, idx = heapq.heappop(heap)
+        if nonterminal in lengths:
+            continue
+        lengths[nonterminal] = length
+        cheapest[nonterminal] = idx
+        for key in waiting.get(nonterminal, ()):
+            counts = partial[key]
+            counts[0] += length
+            counts[1] -= 1
+            if not counts[1] and key[0] not in lengths:
+                heapq.heappush(heap, (counts[0], order, key[0], key[1]))
+                order += 1
+    return lengths, cheapest
+
+class SentenceGenerator:
+    '''
+        Random sentences of a grammar
+            grammar = the grammar, its start must derive a sentence
+            weights = optional relative weights of the alternates of a
+                      nonterminal, in rule order; alternates of other
+                      nonterminals are equally likely
+            seed = seed of the random generator, for reproducible corpora
+            cost = cost of a terminal against the target size, one per
+                   token by default, text_cost to size in bytes
+            max_depth = stack depth from which only cheapest alternates
+                        are taken, which bounds the memory of grammars
+                        whose random derivations nest without end
+
+        Nonterminals that derive no sentence are never chosen.
+    '''
+    def __init__(self, grammar: Grammar,
+                 weights: Optional[dict[NonTerminal, Sequence[float]]] = None,
+                 seed: Optional[int] = None, cost: CostType = _token_cost,
+                 max_depth: Optional[int] = None):
+        self._grammar = grammar
+        self._max_depth = _NEVER if max_depth is None else max_depth
+        self._cost = cost
+        self._random = random.Random(seed)
+        self.min_lengths, self._cheapest = min_derivations(grammar, cost)
+        if grammar.start not in self.min_lengths:
+            raise Exception(f'The start {grammar.start} derives no sentence')
+        weights = weights or {}
+        for nonterminal in weights:
+            if len(weights[nonterminal]) != len(grammar.data[nonterminal].alts):
+                raise Exception(f'{nonterminal} has {len(grammar.data[nonterminal].alts)} '
+                                f'alternates and {len(weights[nonterminal])} weights')
+        symbols = grammar.symbol_table()
+        self._tokens = symbols.tokens
+        self._start = symbols.ids[grammar.start]
+        # by symbol id: the cost of a terminal, -1 for the rest
+        self._costs = [cost(x) if isinstance(x, GrammarTerminal) else -1 # type: ignore
+                        for x in symbols.tokens]
+        # by symbol id of a nonterminal: (pushes, lengths, cumulative
+        # weights, min cost) with the alternates ordered by their min cost,
+        # the cheapest one first. pushes are the alternates as ids,
+        # reversed and without ε, ready to extend the stack; an alternate
+        # that derives no sentence costs _NEVER and has no weight.
+        self._choices: list[Optional[tuple]] = [None] * len(symbols)
+        for nonterminal, rule in grammar.data.items():
+            if nonterminal not in self.min_lengths:
+                continue
+            alt_weights = weights.get(nonterminal, [1.0] * len(rule.alts))
+            cheapest = self._cheapest[nonterminal]
+            order = sorted(range(len(rule.alts)),
+                           key=lambda idx: (self._alt_length(rule.alts[idx]), idx != cheapest))
+            lengths = [self._alt_length(rule.alts[idx]) for idx in order]
+            self._choices[symbols.ids[nonterminal]] = (
+                [tuple(symbols.ids[x] for x in reversed(rule.alts[idx].data)
+                        if isinstance(x, (NonTerminal, GrammarTerminal))) for idx in order],
+                lengths,
+                list(itertools.accumulate(alt_weights[idx] if length != _NEVER else 0
+                                            for idx, length in zip(order, lengths))),
+                self.min_lengths[nonterminal])
+
+    def _alt_length(self, alt: Alternate) -> float:
+        total = 0
+        for x in alt.data: # pylint: disable=invalid-name
+            if isinstance(x, NonTerminal):
+                if x not in self.min_lengths:
+                    return _NEVER
+                total += self.min_lengths[x]
+            elif isinstance(x, GrammarTerminal):
+                total += self._cost(x)
+        return total
+
+    def sentence(self, size: int) -> Iterator[GrammarTerminal]:
+        '''
+            Generator of the terminals of one random sentence whose cost
+            stays within size, or is the cheapest sentence of the grammar
+            when size is below that
+        '''
+        tokens = self._tokens
+        for terminal in self._sentence_ids(size):
+            yield tokens[terminal] # type: ignore
+
+    def _sentence_ids(self, size: int) -> Iterator[int]:
+        costs = self._costs
+        choices = self._choices
+        uniform = self._random.random
+        bisect_right = bisect.bisect_right
+        max_depth = self._max_depth
+        emitted = 0
+        pending = self.min_lengths[self._grammar.start]
+        stack = [self._start]
+        pop = stack.pop
+        extend = stack.extend
+        while stack:
+            top = pop()
+            length = costs[top]
+            if length >= 0:
+                pending -= length
+                emitted += length
+                yield top
+                continue
+            pushes, lengths, cumulative, minimum = choices[top] # type: ignore
+            pending -= minimum
+            # the alternates that fit are a prefix of lengths
+            fitting = bisect_right(lengths, size - emitted - pending) \
+                        if len(stack) < max_depth else 0
+            if fitting > 1 and cumulative[fitting - 1]:
+                idx = bisect_right(cumulative, uniform() * cumulative[fitting - 1], 0, fitting)
+            else:
+                idx = 0
+            pending += lengths[idx]
+            extend(pushes[idx])
+
+    def text(self, size: int, chunk: int = 1 << 16) -> Iterator[str]:
+        '''
+            Generator of the text of a corpus of sentences of total cost
+            size: the terminal_text of the terminals separated by spaces,
+            one sentence per line, in chunks of about chunk characters
+        '''
+        costs = self._costs
+        symbols = [terminal_text(x) if isinstance(x, GrammarTerminal) else ''
+                    for x in self._tokens]
+        spaced = [' ' + symbol for symbol in symbols]
+        parts: list[str] = []
+        append = parts.append
+        buffered = 0
+        total = 0
+        while total < size:
+            before = total
+            # the first word of a sentence goes without a space
+            words = symbols
+            for terminal in self._sentence_ids(size - total):
+                total += costs[terminal]
+                append(words[terminal])
+                words = spaced
+                buffered += len(symbols[terminal]) + 1
+                if buffered >= chunk:
+                    yield ''.join(parts)
+                    parts.clear()
+                    buffered = 0
+            if total == before:
+                break
+            append('\n')
+            buffered += 1
+        if parts:
+            yield ''.join(parts)
+
+    def write(self, file: TextIO, size: int, chunk: int = 1 << 16) -> int:
+        '''
+            writes text(size, chunk) to file and returns the number of
+            characters written
+        '''
+        written = 0
+        for part in self.text(size, chunk):
+            written += file.write(part)
+        return written
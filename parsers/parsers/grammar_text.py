@@ -0,0 +1,65 @@
+'''
+    Module grammar_text builds a Grammar from text
+
+    The text has one alternate per line, "A : x y z". The first
+    nonterminal is the start symbol and every word on the left of a ':'
+    is a nonterminal. On the right
+        epsilon          the epsilon word, when one is given, is ε
+        <INT> <NAME> <STRING>
+                         are the TokenClass terminals of those TokenTypes
+        w* w+ w?         a word of more than one character ending in *, +
+                         or ? is the Repeat of the word before it
+        anything else    is a GrammarTerminal matching that word
+    $ is the endmarker and is reserved.
+'''
+from typing import Optional
+
+from .elements import Alternate, Eof, Epsilon, Grammar, GrammarTerminal, GrammarToken, \
+    NonTerminal, Repeat, Rule, Start, TokenClass
+from .tokenizer import TokenType
+
+def create_grammar(language_buf: str, epsilon: Optional[str] = None) -> Grammar:
+    '''
+        the Grammar of the text language_buf, see the module docstring.
+        epsilon = the word that stands for ε, None when the text has none
+    '''
+    lines = []
+    for line in language_buf.strip().splitlines():
+        if not line.strip():
+            continue
+        name, colon, body = line.partition(':')
+        if not colon or not name.strip():
+            raise Exception(f'Unable to parse rule line {line!r}')
+        lines.append((name.strip(), body.split()))
+    if not lines:
+        raise Exception('The grammar has no rules')
+
+    nonterminals: dict[str, NonTerminal] = {}
+    for name, _ in lines:
+        if name not in nonterminals:
+            nonterminals[name] = Start(name) if not nonterminals else NonTerminal(name)
+    empty = Epsilon(epsilon) if epsilon else None
+    terminals: dict[str, GrammarTerminal] = {}
+
+    def symbol(word: str) -> GrammarToken:
+        if word == epsilon:
+            return empty # type: ignore
+        if word in nonterminals:
+            return nonterminals[word]
+        if len(word) > 1 and word[-1] in '*+?':
+            return Repeat.of([symbol(word[:-1])], word[-1])
+        if word not in terminals:
+            if word[0] == '<' and word[-1] == '>' and word[1:-1] in TokenType.__members__:
+                terminals[word] = TokenClass.of(TokenType[word[1:-1]])
+            else:
+                terminals[word] = GrammarTerminal(word, word)
+        return terminals[word]
+
+    data: dict[NonTerminal, Rule] = {}
+    for name, words in lines:
+        nonterminal = nonterminals[name]
+        data.setdefault(nonterminal, Rule([], nonterminal))
+        data[nonterminal].alts.append(Alternate([symbol(word) for word in words]))
+
+    return Grammar(set(terminals.values()), data, next(iter(nonterminals.values())),
+                   Eof('$'), empty) # type: ignore
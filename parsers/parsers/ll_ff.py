@@ -4,7 +4,7 @@
 '''
 
 from dataclasses import dataclass, field
-from .elements import GrammarToken
+from .elements import GrammarToken, SymbolTable
 
 # Type Variables
 FirstFollowKeyType = tuple[GrammarToken, ...]
@@ -115,3 +115,102 @@ class FirstFollowSet:
             v_str = ','.join([str(x) for x in val])
             combined_str.append(f'[{k_str}] => [{v_str}]')
         return ', '.join(combined_str)
+
+# the bitsets number their tokens with a SymbolTable, usually the grammar's
+TokenIds = SymbolTable
+
+@dataclass
+class BitsetFirstFollowSet:
+    '''
+        FirstFollowSet backed by int bitmasks
+            ids = TokenIds numbering the tokens. Sets that are combined
+                  with get_bits/add_bits must share the same ids.
+            bits = dict
+                key = tuple made up of GrammarElements
+                value = int bitmask over ids
+            dirty = see FirstFollowSet
+
+        Union and change detection are integer operations. The companion
+        methods take and return sets like FirstFollowSet; add_bits and
+        get_bits skip the conversion. add and remove take only tokens that
+        ids has numbered and raise on others.
+    '''
+    ids: TokenIds = field(default_factory=TokenIds)
+    bits: dict[FirstFollowKeyType, int] = field(default_factory=dict, init=False)
+    dirty: bool = field(default=False, init=False)
+
+    @property
+    def data(self) -> dict[FirstFollowKeyType, FirstFollowValueType]:
+        '''
+            the content as a FirstFollowSet.data like dict of sets
+        '''
+        return {k: self.ids.tokens_of(v) for k, v in self.bits.items()}
+
+    def _mask(self, token_s: compatiblevalues) -> int:
+        '''
+            the mask of token_s, tokens that ids has not numbered raise
+        '''
+        ids = self.ids.ids
+        result = 0
+        for token in FirstFollowSet._compatible_value_type(token_s): # pylint: disable=protected-access
+            idx = ids.get(token)
+            if idx is None:
+                raise Exception(f'{token} has no id')
+            result |= 1 << idx
+        return result
+
+    def add_bits(self, key: compatiblekeys, mask: int):
+        '''
+            add mask to bits[key]
+            update dirty if bits[key] was modified
+        '''
+        key = FirstFollowSet._compatible_key_type(key) # pylint: disable=protected-access
+        old = self.bits.get(key)
+        new = (old or 0) | mask
+        if old != new:
+            self.bits[key] = new
+            self.dirty = True
+
+    def add(self, key: compatiblekeys, token_s: compatiblevalues):
+        '''
+            see FirstFollowSet.add
+        '''
+        self.add_bits(key, self._mask(token_s))
+
+    def add_empty(self, k: compatiblekeys):
+        '''
+            see FirstFollowSet.add_empty
+        '''
+        self.add_bits(k, 0)
+
+    def remove(self, k: compatiblekeys, removeset: compatiblevalues):
+        '''
+            see FirstFollowSet.remove
+        '''
+        dictkey = FirstFollowSet._compatible_key_type(k) # pylint: disable=protected-access
+        mask = self._mask(removeset)
+        old = self.bits.get(dictkey)
+        new = (old or 0) & ~mask
+        if old != new:
+            self.bits[dictkey] = new
+            self.dirty = True
+
+    def get_bits(self, k: compatiblekeys) -> int:
+        '''
+            return bits[k], 0 when k is unknown
+        '''
+        return self.bits.get(FirstFollowSet._compatible_key_type(k), 0) # pylint: disable=protected-access
+
+    def get(self, k: compatiblekeys) -> FirstFollowValueType:
+        '''
+            return the set of tokens of bits[k]
+        '''
+        return self.ids.tokens_of(self.get_bits(k))
+
+    def __str__(self):
+        combined_str = []
+        for k,val in self.bits.items():
+            k_str = ','.join([str(x) for x in k])
+            v_str = ','.join([str(x) for x in self.ids.tokens_of(val)])
+            combined_str.append(f'[{k_str}] => [{v_str}]')
+        return ', '.join(combined_str)
@@ -2,90 +2,488 @@
     Module llparser contains the llparser class
 '''
 
-from typing import Optional
-
-from .elements import Alternate, Eof, Grammar, GrammarTerminal, GrammarToken, NonTerminal, Epsilon
-from .ll_ff import FirstFollowSet
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional
+
+from .elements import Alternate, Eof, Grammar, GrammarTerminal, GrammarToken, NonTerminal, Epsilon, Repeat, Rule, \
+    grammar_fingerprint
+from .checkpoint import CheckpointingReader, ParseCheckpoint
+from .ff_worklist import FirstFollowSolver
+from .ll_ff import BitsetFirstFollowSet, FirstFollowSet
+from .optimizer import OptimizationReport, optimize_grammar
+from .profiler import CountingReader, CountingTable, ParserProfile, ProfiledStack
 from .stack import Stack
 from .tokenizer import TokenType, Token
 
 ParserStackElement = NonTerminal|Epsilon|Eof
 ParserTableType =  dict[tuple[ParserStackElement, GrammarToken], list[Alternate]]
+PushTableType = dict[tuple[ParserStackElement, GrammarToken], tuple[GrammarToken, ...]]
+IdTableType = dict[tuple[int, int], tuple[int, ...]]
+
+# kinds of the symbol ids on the parser stack
+_TERMINAL, _NONTERMINAL, _EOF, _OTHER, _LOOP = range(5)
+
+CheckpointCallback = Callable[[ParseCheckpoint], None]
+
+class ParseException(Exception):
+    '''
+        The input is not in the language of the grammar
+    '''
 
 class TokenReader: # pylint: disable=too-few-public-methods
     '''
         TokenReader class wraps an iterator
+        offset = number of tokens (spaces included) taken from the iterator,
+                 starting at the given offset
     '''
-    def __init__(self, tokenlist: list[Token]):
+    def __init__(self, tokenlist: Iterable[Token], offset: int = 0):
         self._itr = iter(tokenlist)
+        self.offset = offset
 
     def nexttoken(self) -> Optional[Token]:
         '''
             retrieve next value from _itr or None for end
             gobbles up spaces
         '''
-        try:
-            nextelem = next(self._itr)
-            if nextelem.tokentype == TokenType.SPACE:
-                return self.nexttoken()
-            return nextelem
-        except StopIteration:
-            return None
+        for nextelem in self._itr:
+            self.offset += 1
+            if nextelem.tokentype != TokenType.SPACE:
+                return nextelem
+        return None
+
+class RecordReader: # pylint: disable=too-few-public-methods
+    '''
+        Wraps a TokenReader and keeps the tokens of the current document,
+        dropping end tokens (EOF or separator)
+    '''
+    def __init__(self, reader: TokenReader, separator: Optional[object]):
+        self._reader = reader
+        self._separator = separator
+        self._record: list[Token] = []
+
+    @property
+    def offset(self) -> int:
+        '''
+            see TokenReader.offset
+        '''
+        return self._reader.offset
+
+    def nexttoken(self) -> Optional[Token]:
+        '''
+            see TokenReader.nexttoken
+        '''
+        token = self._reader.nexttoken()
+        if token is not None and token.tokentype != TokenType.EOF \
+                and token.value != self._separator:
+            self._record.append(token)
+        return token
+
+    def take(self) -> list[Token]:
+        '''
+            returns the tokens kept since the last take()
+        '''
+        record, self._record = self._record, []
+        return record
 
 class LLParser: # pylint: disable=too-few-public-methods
     '''
         LLParser class.
         g -> Grammar
+        profile -> optional ParserProfile that collects instrumentation.
+                   When it is None the parser runs uninstrumented.
+        optimize -> when True the tables are built for the grammar
+                    returned by optimizer.optimize_grammar, and
+                    self.optimization holds its OptimizationReport.
+                    Grammar edits then apply to the optimized grammar.
+        self.edits counts the edits applied to the grammar.
     '''
-    def __init__(self, grammar: Grammar):
+    def __init__(self, grammar: Grammar, profile: Optional[ParserProfile] = None,
+                 optimize: bool = False):
+        self._profile = profile
+        self.optimization: Optional[OptimizationReport] = None
+        if optimize:
+            optimized, self.optimization = optimize_grammar(grammar)
+            # only the parser table of a copy of the grammar as given, for
+            # the report, the grammar itself is left untouched
+            self._grammar = grammar.copy()
+            self._grammar.add_repeat_rules()
+            self._kinds = []
+            self._number_symbols()
+            self._solver = FirstFollowSolver(self._grammar)
+            self._parser_table = self._generate_parser_table()
+            self.optimization.table_cells_before = len(self._parser_table)
+            self.optimization.conflicts_before = self._conflicts()
+            grammar = optimized
         self._grammar = grammar
+        self.edits = 0
+        self._digest = (-1, b'')
+        grammar.add_repeat_rules()
         self._setup_llparser()
+        if self.optimization is not None:
+            self.optimization.table_cells_after = len(self._parser_table)
+            self.optimization.conflicts_after = self._conflicts()
+
+    @property
+    def grammar(self) -> Grammar:
+        '''
+            the grammar the tables are built for, the optimized one with
+            optimize
+        '''
+        return self._grammar
 
-    def parse(self, tokenlist: list[Token]):
+    def parse(self, tokenlist: Iterable[Token],
+              checkpoint_every: int = 0,
+              on_checkpoint: Optional[CheckpointCallback] = None):
         '''
             parses a stream of tokens using LL(1)
+
+            When checkpoint_every is set, on_checkpoint receives a
+            ParseCheckpoint each time that many more tokens were read.
+        '''
+        stack = self._new_stack()
+        stack.extend(self._initial_stack)
+        for _ in self._run(TokenReader(tokenlist), stack, checkpoint_every, on_checkpoint):
+            pass
+
+    def resume(self, checkpoint: ParseCheckpoint,
+               tokenlist: Iterable[Token],
+               checkpoint_every: int = 0,
+               on_checkpoint: Optional[CheckpointCallback] = None):
         '''
+            continues a parse from checkpoint.
+            tokenlist must start at the token at checkpoint.token_offset of
+            the original stream, e.g. the source re-tokenized from there or
+            itertools.islice(tokens, checkpoint.token_offset, None).
+            Later checkpoints carry offsets into the original stream.
+        '''
+        if checkpoint.grammar != self._grammar_digest():
+            raise Exception(f'Checkpoint was taken with another grammar {checkpoint}')
+        if not all(0 <= x < len(self._kinds) for x in checkpoint.stack):
+            raise Exception(f'Checkpoint does not belong to this grammar {checkpoint}')
+        stack = self._new_stack()
+        stack.extend(checkpoint.stack)
+        for _ in self._run(TokenReader(tokenlist, checkpoint.token_offset),
+                           stack, checkpoint_every, on_checkpoint):
+            pass
+
+    def _checkpoint(self, stack: Stack[int], offset: int) -> ParseCheckpoint:
+        return ParseCheckpoint(offset, tuple(reversed(list(stack))), self._grammar_digest())
+
+    def _grammar_digest(self) -> bytes:
+        '''
+            grammar_fingerprint of the grammar as bytes, computed again
+            only after an edit
+        '''
+        edits, digest = self._digest
+        if edits != self.edits:
+            digest = bytes.fromhex(grammar_fingerprint(self._grammar))
+            self._digest = (self.edits, digest)
+        return digest
+
+    def _new_stack(self) -> Stack[int]:
+        if self._profile is None:
+            return Stack()
+        return ProfiledStack(self._profile, self._symbols)
+
+    def _describe(self, stack: Stack[int]) -> list[GrammarToken]:
+        '''
+            the symbols on stack, bottom first, for error messages
+        '''
+        return [self._symbols.token(x) for x in reversed(list(stack))]
+
+    def parse_records(self, tokenlist: Iterable[Token],
+                      separator: Optional[object] = None) -> Iterator[list[Token]]:
+        '''
+            parses a stream of concatenated documents and yields the tokens
+            of each accepted document (spaces and end tokens excluded).
+
+            A document ends on an EOF token or, when separator is given, on
+            a token whose value is separator; separator must not be a
+            terminal of the grammar. The parser resets to start after each
+            document, so one token iterator can carry any number of them.
+            Consecutive end tokens do not produce empty documents.
+        '''
+        reader = RecordReader(TokenReader(tokenlist), separator)
+        stack = self._new_stack()
+        stack.extend(self._initial_stack)
+        for _ in self._run(reader, stack, 0, None, separator, True):
+            yield reader.take()
+
+    def _run(self, tokens: TokenReader, stack: Stack[int], # pylint: disable=too-many-arguments
+             checkpoint_every: int, on_checkpoint: Optional[CheckpointCallback],
+             separator: Optional[object] = None,
+             records: bool = False) -> Iterator[None]:
+        '''
+            wires the optional checkpointing and instrumentation around the
+            token reader and table and drives _parse
+        '''
+        reader = tokens
+        if checkpoint_every:
+            if on_checkpoint is None:
+                raise Exception('checkpoint_every needs an on_checkpoint callback')
+            reader = CheckpointingReader(tokens, checkpoint_every,
+                        lambda offset: on_checkpoint(self._checkpoint(stack, offset)))
+
+        if self._profile is None:
+            yield from self._parse(reader, stack, self._id_table, separator, records)
+            return
 
-        stack: Stack[GrammarToken] = Stack()
-        tokens = TokenReader(tokenlist)
+        # time only what is spent inside the parser, not in the consumer
+        profile = self._profile
+        started = perf_counter()
+        try:
+            for _ in self._parse(CountingReader(reader, profile), stack,
+                                 CountingTable(self._id_table, profile), # type: ignore
+                                 separator, records):
+                profile.parse_seconds += perf_counter() - started
+                yield
+                started = perf_counter()
+        finally:
+            profile.parse_seconds += perf_counter() - started
+
+    def _parse(self, tokens, stack: Stack[int], # pylint: disable=too-many-arguments,too-many-branches
+               table: IdTableType,
+               separator: Optional[object],
+               records: bool) -> Iterator[None]:
+        '''
+            the LL(1) driver. _run() hands in either the plain or the
+            instrumented tokens, stack and table.
+            Yields each time a document is accepted. Unless records is set
+            that has to be the end of the token stream.
+
+            The stack and table hold symbol ids, an input token is looked
+            up by value among the ids of the grammar terminals and, when
+            its value is none of them, by its TokenType among the ids of
+            the token classes.
+        '''
+        kinds = self._kinds
+        terminals = self._symbols.terminals
+        classes = self._symbols.classes
+        endmarker = self._initial_stack[0]
 
-        stack.push(self._grammar.endmarker)
-        stack.push(self._grammar.start)
         e = tokens.nexttoken() # pylint: disable=invalid-name
+        if records:
+            e = LLParser._skip_ends(tokens, e, separator) # pylint: disable=invalid-name
 
         # the static typechecker is unable to catch e != none here
         # so we have to ignore some type errors below
         while e is not None and len(stack) != 0:
-            eterminal: GrammarToken
-            if e.tokentype == TokenType.EOF: # type: ignore
-                eterminal = self._grammar.endmarker
+            # the EOF token has no value, so with no separator this is
+            # only true for EOF
+            end = e.tokentype == TokenType.EOF or e.value == separator # type: ignore
+            if end:
+                eterminal = endmarker
             else:
-                eterminal = GrammarTerminal(e.value, e.value) # type: ignore
+                eterminal = terminals.get(e.value, -1) # type: ignore
+                if eterminal < 0:
+                    eterminal = classes.get(e.tokentype, -1) # type: ignore
 
-            if isinstance(stack.peek(), GrammarTerminal) and \
-                    stack.peek().symbol == e.value: # type: ignore
+            top = stack.peek()
+            kind = kinds[top]
+            if kind == _TERMINAL and top == eterminal:
                 stack.pop()
                 e = tokens.nexttoken() # pylint: disable=invalid-name
-            elif isinstance(stack.peek(), Epsilon):
+            elif kind == _NONTERMINAL:
+                push = table.get((top, eterminal))
+                if push is None:
+                    raise ParseException(f'Unable to parse e={e}, stack={self._describe(stack)}')
                 stack.pop()
-            elif isinstance(stack.peek(), NonTerminal) and \
-                    (stack.peek(), eterminal) in self._parser_table:
-                nonterminal: NonTerminal = stack.pop() # type: ignore
-                production_rule = self._parser_table[(nonterminal, eterminal)][0].data
-                for x in reversed(production_rule): # pylint: disable=invalid-name
-                    stack.push(x)
-            elif isinstance(stack.peek(), Eof) and \
-                    e.tokentype == TokenType.EOF: # type: ignore
+                stack.extend(push)
+            elif kind == _LOOP:
+                # the loop stays on the stack while the lookahead starts
+                # its body, anything else leaves it
+                push = table.get((top, eterminal))
+                if push:
+                    stack.extend(push)
+                else:
+                    stack.pop()
+            elif kind == _EOF and end:
                 stack.pop()
+                yield
                 e = tokens.nexttoken() # pylint: disable=invalid-name
+                if records:
+                    e = LLParser._skip_ends(tokens, e, separator) # pylint: disable=invalid-name
+                    if e is not None:
+                        stack.extend(self._initial_stack)
             else:
-                raise Exception(f'Unable to parse e={e}, stack={stack}')
+                raise ParseException(f'Unable to parse e={e}, stack={self._describe(stack)}')
 
         if e is None and len(stack) == 0:
             return
 
+        if e is None and records:
+            raise ParseException(f'Unexpected end of stream, stack={self._describe(stack)}')
+
         # this is likely unreachable. Test the conditions
-        raise Exception(f'Potentially Unreachable to parse e={e}, stack={stack}')
+        raise ParseException(f'Potentially Unreachable to parse e={e}, stack={self._describe(stack)}')
+
+    @staticmethod
+    def _skip_ends(tokens, e: Optional[Token], separator: Optional[object]) -> Optional[Token]:
+        while e is not None and \
+                (e.tokentype == TokenType.EOF or e.value == separator):
+            e = tokens.nexttoken() # pylint: disable=invalid-name
+        return e
+
+    def add_alternate(self, nonterminal: NonTerminal,
+                      alternate: Alternate) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            adds alternate to the rule of nonterminal, creating the rule
+            when needed, and updates the parser in place.
+            Returns the parser table cells that became conflicts.
+        '''
+        self._check_editable()
+        added_rules = []
+        if nonterminal not in self._grammar.data:
+            self._grammar.data[nonterminal] = Rule(alts=[], ident=nonterminal)
+            added_rules.append(nonterminal)
+        self._grammar.data[nonterminal].alts.append(alternate)
+        self._grammar.terminals.update(x for x in alternate.data
+                                        if isinstance(x, GrammarTerminal))
+        added = [(nonterminal, alternate)]
+        for repeat in self._grammar.add_repeat_rules():
+            added_rules.append(repeat)
+            added.extend((repeat, alt) for alt in self._grammar.data[repeat].alts)
+        return self._apply_edit({nonterminal}, added=added, added_rules=added_rules)
+
+    def remove_alternate(self, nonterminal: NonTerminal,
+                         alternate: Alternate) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            removes alternate from the rule of nonterminal and updates the
+            parser in place. The rule stays, even when it has no alternate left.
+            Returns the parser table cells that became conflicts.
+        '''
+        self._check_editable()
+        self._grammar.data[nonterminal].alts.remove(alternate)
+        return self._apply_edit({nonterminal}, removed=[(nonterminal, alternate)])
+
+    def add_rule(self, rule: Rule) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            adds a rule for a nonterminal that has none yet
+            Returns the parser table cells that became conflicts.
+        '''
+        self._check_editable()
+        if rule.ident in self._grammar.data:
+            raise Exception(f'{rule.ident} already has a rule')
+        self._grammar.data[rule.ident] = rule
+        for alt in rule.alts:
+            self._grammar.terminals.update(x for x in alt.data
+                                            if isinstance(x, GrammarTerminal))
+        added = [(rule.ident, alt) for alt in rule.alts]
+        added_rules = [rule.ident]
+        for repeat in self._grammar.add_repeat_rules():
+            added_rules.append(repeat)
+            added.extend((repeat, alt) for alt in self._grammar.data[repeat].alts)
+        return self._apply_edit({rule.ident}, added=added, added_rules=added_rules)
+
+    def remove_rule(self, nonterminal: NonTerminal) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            removes the rule of nonterminal. Alternates that still refer to
+            nonterminal can no longer be expanded through it.
+            Returns the parser table cells that became conflicts.
+        '''
+        self._check_editable()
+        rule = self._grammar.data.pop(nonterminal)
+        return self._apply_edit({nonterminal},
+                                removed=[(nonterminal, alt) for alt in rule.alts],
+                                removed_rules=[nonterminal])
+
+    def _conflicts(self) -> int:
+        return sum(1 for alts in self._parser_table.values() if len(alts) > 1)
+
+    def _check_editable(self):
+        if self._grammar.frozen:
+            raise Exception('The grammar is frozen and cannot be edited')
+
+    def _apply_edit(self, edited: set[NonTerminal],
+                    **changes) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            propagates an edit of the grammar through the first/follow
+            solver and rebuilds the table rows whose cells can change:
+            the edited rules, rules with an alternate whose first set
+            changed and rules whose follow set changed.
+        '''
+        self.edits += 1
+        self._number_symbols()
+        rows = edited | self._solver.update(**changes)
+        return self._update_rows(rows)
+
+    def _update_rows(self, rows: set[NonTerminal]) -> list[tuple[NonTerminal, GrammarToken]]:
+        '''
+            recomputes the parser table rows of rows and the push table
+            rows of rows and of the rules that unit-collapse into them
+        '''
+        pushrows = set(rows)
+        todo = list(rows)
+        while todo:
+            for parent in self._solver.unit_parents(todo.pop()):
+                if parent not in pushrows:
+                    pushrows.add(parent)
+                    todo.append(parent)
+
+        for nonterminal in pushrows:
+            for terminal in self._row_terminals.get(nonterminal, ()):
+                self._push_table.pop((nonterminal, terminal), None)
+                self._id_table.pop(self._id_key((nonterminal, terminal)), None)
+
+        before = {}
+        for nonterminal in rows:
+            for terminal in self._row_terminals.pop(nonterminal, ()):
+                before[(nonterminal, terminal)] = len(self._parser_table.pop((nonterminal, terminal)))
+            if nonterminal in self._grammar.data:
+                row = self._table_row(nonterminal)
+                self._row_terminals[nonterminal] = list(row)
+                for terminal, alts in row.items():
+                    self._parser_table[(nonterminal, terminal)] = alts
+
+        for nonterminal in pushrows:
+            for terminal in self._row_terminals.get(nonterminal, ()):
+                self._compile_push_cell(self._push_table, (nonterminal, terminal), frozenset())
+        for nonterminal in pushrows:
+            for terminal in self._row_terminals.get(nonterminal, ()):
+                self._set_id_cell((nonterminal, terminal))
+
+        return [(nonterminal, terminal) for nonterminal in rows
+                    for terminal in self._row_terminals.get(nonterminal, ())
+                    if len(self._parser_table[(nonterminal, terminal)]) > 1 and
+                        before.get((nonterminal, terminal), 0) <= 1]
+
+    @property
+    def _firsts(self) -> BitsetFirstFollowSet:
+        '''
+            the first sets in the layout of _fixed_point_first_follow
+        '''
+        return self._solver.firsts
+
+    @property
+    def _follows(self) -> BitsetFirstFollowSet:
+        '''
+            the follow sets in the layout of _fixed_point_first_follow
+        '''
+        return self._solver.follows
+
+    def _table_row(self, nonterminal: NonTerminal) -> dict[GrammarToken, list[Alternate]]:
+        '''
+            the cells T[nonterminal, a] of the parser table, see _generate_parser_table
+        '''
+        solver = self._solver
+
+        # Fi(w) is the first entry of the alternate in the solver's suffix
+        # table, a cell is a bit of (Fi(w) | Fo(A) if ε in Fi(w)) & terminals
+        ids = solver.ids
+        terminals = self._terminal_mask
+        epsilon = ids.bit(self._grammar.epsilon) if self._grammar.epsilon is not None else 0
+
+        row: dict[GrammarToken, list[Alternate]] = {}
+        follow = solver.follow(nonterminal)
+        for indexed in solver.alternates(nonterminal):
+            first = indexed.first
+            cells = first | follow if first & epsilon else first
+            for terminal in ids.tokens_of(cells & terminals):
+                if terminal in row:
+                    row[terminal].append(indexed.alt)
+                else:
+                    row[terminal] = [indexed.alt]
+        return row
 
     def _generate_parser_table(self) -> ParserTableType:
         '''
@@ -95,22 +493,93 @@ class LLParser: # pylint: disable=too-few-public-methods
                     ε is in Fi(w) and a is in Fo(A).
             (From: https://en.wikipedia.org/wiki/LL_parser)
         '''
-        firsts , follows = self._firsts, self._follows
-
         parser_table : ParserTableType = {}
+        self._row_terminals = {}
         for nonterminal in self._grammar.data:
-            for alt in self._grammar.data[nonterminal].alts:
-                for terminal in self._grammar.terminals.union([self._grammar.endmarker]):
-                    if terminal in firsts.get(alt.data) or \
-                        (self._grammar.epsilon in firsts.get(alt.data) \
-                         and terminal in follows.get(nonterminal)):
+            row = self._table_row(nonterminal)
+            self._row_terminals[nonterminal] = list(row)
+            for terminal, alts in row.items():
+                parser_table[(nonterminal, terminal)] = alts
+        return parser_table
+
+    def _generate_push_table(self) -> PushTableType:
+        '''
+            compiles every cell of the parser table into the tuple that
+            parse() pushes on the stack when it expands the cell:
+                - the alternate is reversed ahead of time
+                - Epsilon is dropped, an ε-alternate becomes ()
+                - unit productions A → B are collapsed when the lookahead
+                  fixes B's alternate as well, so that T[A,a] pushes
+                  what T[B,a] would have pushed
+
+            As in parse(), a conflicting cell uses its first alternate.
+        '''
+        push_table: PushTableType = {}
+        for key in self._parser_table:
+            self._compile_push_cell(push_table, key, frozenset())
+        return push_table
+
+    def _compile_push_cell(self, push_table: PushTableType, key, visiting):
+        if key in push_table:
+            return push_table[key]
+        alt = self._parser_table[key][0].data
+        if len(alt) == 1 and isinstance(alt[0], NonTerminal):
+            chained = (alt[0], key[1])
+            if chained not in visiting and \
+                    len(self._parser_table.get(chained, [])) == 1:
+                push_table[key] = self._compile_push_cell(push_table, chained,
+                                                          visiting | {key})
+                return push_table[key]
+        push_table[key] = tuple(x for x in reversed(alt)
+                                    if not isinstance(x, Epsilon))
+        return push_table[key]
+
+    def _number_symbols(self):
+        '''
+            brings the grammar's SymbolTable up to date with the grammar
+            and records the kind of every symbol id. Ids are stable, so
+            the id table stays valid across grammar edits.
+        '''
+        self._symbols = self._grammar.symbol_table()
+        kinds = self._kinds
+        for token in self._symbols.tokens[len(kinds):]:
+            if isinstance(token, GrammarTerminal):
+                kinds.append(_TERMINAL)
+            elif isinstance(token, Repeat) and token.op == '*':
+                kinds.append(_LOOP)
+            elif isinstance(token, NonTerminal):
+                kinds.append(_NONTERMINAL)
+            elif isinstance(token, Eof):
+                kinds.append(_EOF)
+            else:
+                kinds.append(_OTHER)
+        self._initial_stack = (self._symbols.ids[self._grammar.endmarker],
+                               self._symbols.ids[self._grammar.start])
+        self._terminal_mask = self._symbols.mask(
+                                self._grammar.terminals.union([self._grammar.endmarker]))
 
+    def _id_key(self, key: tuple[ParserStackElement, GrammarToken]) -> tuple[int, int]:
+        return self._symbols.ids[key[0]], self._symbols.ids[key[1]]
 
-                        if (nonterminal, terminal) in parser_table:
-                            parser_table[(nonterminal,terminal)].append(alt)
-                        else:
-                            parser_table[(nonterminal,terminal)] = [alt]
-        return parser_table
+    def _set_id_cell(self, key: tuple[ParserStackElement, GrammarToken]):
+        '''
+            copies the push table cell key into the id table that parse() runs on
+        '''
+        self._id_table[self._id_key(key)] = self._id_push(key, self._push_table[key])
+
+    def _id_push(self, key: tuple[ParserStackElement, GrammarToken],
+                 push: tuple[GrammarToken, ...]) -> tuple[int, ...]:
+        '''
+            push as ids. The cell of a loop that enters its body holds the
+            body only: the loop is still on the stack when parse() pushes it.
+        '''
+        ids = self._symbols.ids
+        if push and push[0] == key[0] and self._kinds[ids[key[0]]] == _LOOP:
+            if self._solver.alternates(key[0])[0].first & \
+                    self._symbols.bit(self._grammar.epsilon):
+                raise Exception(f'{key[0]} repeats a body that can be empty')
+            push = push[1:]
+        return tuple(ids[x] for x in push)
 
     def _setup_llparser(self):
 
@@ -162,24 +631,56 @@ class LLParser: # pylint: disable=too-few-public-methods
             For a language Ai->Wi
             Fi(w) = set(a,b,c) => the elements of Fi(w) are terminals that
 
+            The fixed point above rescans every word until nothing changes;
+            ff_worklist.first_follow reaches the same sets by propagating
+            only the changes along the dependencies between words.
+
         '''
 
+        profile = self._profile
+        started = perf_counter()
+
+        self._kinds: list[int] = []
+        self._number_symbols()
+        self._solver = FirstFollowSolver(self._grammar)
+
+        converged = perf_counter()
+
+        self._parser_table = self._generate_parser_table()
+        self._push_table = self._generate_push_table()
+        self._id_table: IdTableType = {self._id_key(key): self._id_push(key, push)
+                                        for key, push in self._push_table.items()}
+
+        if profile is not None:
+            profile.fixed_point_iterations += self._solver.steps
+            profile.add_phase('first_follow', converged - started)
+            profile.add_phase('parser_table', perf_counter() - converged)
+
+    @staticmethod
+    def _fixed_point_first_follow(grammar: Grammar) -> tuple[FirstFollowSet, FirstFollowSet, int]:
+        '''
+            reference implementation of the algorithm described in
+            _setup_llparser: rescans the whole grammar with _firsts_loop
+            until nothing changes. Returns firsts, follows and the number
+            of passes. ff_worklist.first_follow gives identical sets.
+        '''
         firsts, follows = FirstFollowSet(), FirstFollowSet()
 
-        for nonterminal in self._grammar.data:
+        for nonterminal in grammar.data:
             firsts.add_empty([nonterminal])
-            for rule in self._grammar.data[nonterminal].alts:
+            for rule in grammar.data[nonterminal].alts:
                 firsts.add_empty(rule.data)
 
-        follows.add(self._grammar.start, self._grammar.endmarker)
+        follows.add(grammar.start, grammar.endmarker)
 
+        iterations = 0
         firsts.dirty, follows.dirty = True, True
         while firsts.dirty or follows.dirty:
             firsts.dirty, follows.dirty = False, False
-            LLParser._firsts_loop(self._grammar, firsts, follows)
+            LLParser._firsts_loop(grammar, firsts, follows)
+            iterations += 1
 
-        self._firsts, self._follows = firsts, follows
-        self._parser_table = self._generate_parser_table()
+        return firsts, follows, iterations
 
     @staticmethod
     def _firsts_loop(grammar: Grammar, # pylint: disable=too-many-branches
@@ -0,0 +1,140 @@
+'''
+    Module nestedlist parses bracketed lists like [test, me, [I, am, nested]]
+
+        list: "[" [listelem ("," listelem)*] "]"
+        listelem: list | WORD
+
+    A WORD is any run of characters other than white-space, brackets and
+    commas. The parsers never recurse: open lists are kept on an explicit
+    Stack, so the nesting depth is only bounded by memory, and every
+    element costs O(1). parse_nested() builds the Python lists right away,
+    parse_flat() builds FlatList, the nodes as flat arrays in preorder.
+'''
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Union
+
+from .stack import Stack
+
+NestedList = list[Union[str, 'NestedList']]
+
+_TOKEN = re.compile(r'[\[\],]|[^\s\[\],]+')
+
+def _elements(text: str) -> Iterator[str]:
+    '''
+        Generator of the '[', ']' and words of text, checked against the
+        grammar, the commas left out
+    '''
+    depth = 0
+    # after '[' a value or ']', after ',' a value, after a value ',' or ']'
+    value_expected, close_allowed = True, False
+    done = False
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if done:
+            raise Exception(f'Unexpected {token} after the list at {match.start()}')
+        if token == '[':
+            if not value_expected:
+                raise Exception(f'Expected , or ] at {match.start()}')
+            depth += 1
+            close_allowed = True
+        elif token == ']':
+            if not close_allowed:
+                raise Exception(f'Unexpected ] at {match.start()}')
+            depth -= 1
+            done = depth == 0
+            value_expected, close_allowed = False, True
+        elif token == ',':
+            if value_expected:
+                raise Exception(f'Expected a list or a word at {match.start()}')
+            value_expected, close_allowed = True, False
+            continue
+        else:
+            if not value_expected or not depth:
+                raise Exception(f'Unexpected {token} at {match.start()}')
+            value_expected = False
+            close_allowed = True
+        yield token
+    if not done:
+        raise Exception('Unexpected end of text' if depth else 'Expected a list')
+
+def parse_nested(text: str) -> NestedList:
+    '''
+        the list of text as nested Python lists of words
+    '''
+    stack: Stack[NestedList] = Stack()
+    root: NestedList = []
+    for token in _elements(text):
+        if token == '[':
+            opened: NestedList = []
+            if len(stack):
+                stack.peek().append(opened)
+            else:
+                root = opened
+            stack.push(opened)
+        elif token == ']':
+            stack.pop()
+        else:
+            stack.peek().append(token)
+    return root
+
+@dataclass(slots=True)
+class FlatList:
+    '''
+        Data class of the nodes of a nested list in preorder, node 0 is
+        the outer list
+            words = the word of each node, None for a list
+            parents = the parent node of each node, -1 for node 0
+            ends = the node after the last descendant of each node
+    '''
+    words: list[Optional[str]] = field(default_factory=list)
+    parents: array = field(default_factory=lambda: array('q'))
+    ends: array = field(default_factory=lambda: array('q'))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def children(self, node: int) -> Iterator[int]:
+        '''
+            Generator of the child nodes of node
+        '''
+        child = node + 1
+        end = self.ends[node]
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def to_nested(self) -> NestedList:
+        '''
+            the same list as parse_nested() returns. A parent comes
+            before its children in preorder, so no stack is needed.
+        '''
+        nodes: list = []
+        for word, parent in zip(self.words, self.parents):
+            node = [] if word is None else word
+            if parent >= 0:
+                nodes[parent].append(node)
+            nodes.append(node)
+        return nodes[0] if nodes else []
+
+def parse_flat(text: str) -> FlatList:
+    '''
+        the list of text as a FlatList
+    '''
+    flat = FlatList()
+    words, parents, ends = flat.words, flat.parents, flat.ends
+    stack: Stack[int] = Stack()
+    for token in _elements(text):
+        if token == ']':
+            ends[stack.pop()] = len(words)
+            continue
+        parents.append(stack.peek() if len(stack) else -1)
+        if token == '[':
+            stack.push(len(words))
+            ends.append(0)
+            words.append(None)
+        else:
+            ends.append(len(words) + 1)
+            words.append(token)
+    return flat
@@ -0,0 +1,255 @@
+'''
+    Module optimizer rewrites a Grammar into a smaller equivalent one
+    before LLParser builds its tables
+
+    optimize_grammar() copies the grammar and runs these passes until none
+    of them changes anything:
+        unproductive  removes nonterminals that derive no sentence and the
+                      alternates that use them
+        unreachable   removes nonterminals the start cannot reach
+        inline        replaces a nonterminal with a single alternate by its
+                      body everywhere, and a nonterminal used once, first
+                      in an alternate, by its alternates
+        merge         removes duplicate alternates of a rule
+        left_factor   moves the common prefix of alternates starting with
+                      the same symbol into a new rule A' of the suffixes
+
+    Repeat rules are generated from their body, so they are kept as they
+    are and nonterminals used in a Repeat body are never inlined.
+'''
+
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .elements import (Alternate, Epsilon, Grammar, GrammarTerminal, GrammarToken,
+                       NonTerminal, Repeat, Rule)
+
+@dataclass
+class OptimizationReport: # pylint: disable=too-many-instance-attributes
+    '''
+        Data class to hold what optimize_grammar changed
+            unproductive = removed nonterminals that derive no sentence
+            unreachable = removed nonterminals the start cannot reach
+            inlined = nonterminals replaced by their alternates
+            merged = number of duplicate alternates removed
+            factored = new nonterminals holding factored suffixes
+            productions_before, productions_after = number of alternates
+            table_cells_before, table_cells_after,
+            conflicts_before, conflicts_after = parser table cells and
+                cells with more than one alternate, filled in by
+                LLParser(grammar, optimize=True)
+    '''
+    unproductive: list[str] = field(default_factory=list)
+    unreachable: list[str] = field(default_factory=list)
+    inlined: list[str] = field(default_factory=list)
+    merged: int = 0
+    factored: list[str] = field(default_factory=list)
+    productions_before: int = 0
+    productions_after: int = 0
+    table_cells_before: int = 0
+    table_cells_after: int = 0
+    conflicts_before: int = 0
+    conflicts_after: int = 0
+
+    def __str__(self) -> str:
+        lines = [
+            f'productions: {self.productions_before} -> {self.productions_after}',
+            f'table cells: {self.table_cells_before} -> {self.table_cells_after}',
+            f'conflicts: {self.conflicts_before} -> {self.conflicts_after}',
+            f'merged alternates: {self.merged}',
+        ]
+        for name in ('unproductive', 'unreachable', 'inlined', 'factored'):
+            values = getattr(self, name)
+            if values:
+                lines.append(f'{name}: {", ".join(values)}')
+        return '\n'.join(lines)
+
+def optimize_grammar(grammar: Grammar) -> tuple[Grammar, OptimizationReport]:
+    '''
+        returns an optimized copy of grammar and the report of the passes.
+        grammar itself is left untouched.
+    '''
+    optimized = grammar.copy()
+    optimized.add_repeat_rules()
+    report = OptimizationReport(productions_before=_productions(optimized))
+
+    passes: list[Callable[[Grammar, OptimizationReport], bool]] = [
+        _remove_unproductive, _remove_unreachable, _inline, _merge, _left_factor]
+    changed = True
+    while changed:
+        changed = False
+        for optimization in passes:
+            changed = optimization(optimized, report) or changed
+
+    optimized.terminals = {x for rule in optimized.data.values() for alt in rule.alts
+                                for x in alt.data if isinstance(x, GrammarTerminal)}
+    report.productions_after = _productions(optimized)
+    return optimized, report
+
+def _productions(grammar: Grammar) -> int:
+    return sum(len(rule.alts) for rule in grammar.data.values())
+
+def _remove_unproductive(grammar: Grammar, report: OptimizationReport) -> bool:
+    productive: set[NonTerminal] = set()
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, rule in grammar.data.items():
+            if nonterminal not in productive and \
+                    any(all(not isinstance(x, NonTerminal) or x in productive for x in alt.data)
+                        for alt in rule.alts):
+                productive.add(nonterminal)
+                changed = True
+    if grammar.start not in productive:
+        raise Exception(f'The start {grammar.start} derives no sentence')
+
+    removed = [nonterminal for nonterminal in grammar.data if nonterminal not in productive]
+    for nonterminal in removed:
+        del grammar.data[nonterminal]
+        report.unproductive.append(str(nonterminal))
+    for nonterminal, rule in grammar.data.items():
+        if isinstance(nonterminal, Repeat):
+            continue
+        rule.alts = [alt for alt in rule.alts
+                        if all(not isinstance(x, NonTerminal) or x in productive
+                               for x in alt.data)]
+    return bool(removed)
+
+def _remove_unreachable(grammar: Grammar, report: OptimizationReport) -> bool:
+    reachable = {grammar.start}
+    todo = [grammar.start]
+    while todo:
+        for alt in grammar.data[todo.pop()].alts:
+            for x in alt.data: # pylint: disable=invalid-name
+                if isinstance(x, NonTerminal) and x in grammar.data and x not in reachable:
+                    reachable.add(x)
+                    todo.append(x)
+    removed = [nonterminal for nonterminal in grammar.data if nonterminal not in reachable]
+    for nonterminal in removed:
+        del grammar.data[nonterminal]
+        report.unreachable.append(str(nonterminal))
+    return bool(removed)
+
+def _join(grammar: Grammar, *parts: tuple[GrammarToken, ...]) -> Alternate:
+    '''
+        the alternate of parts concatenated, without ε unless it is empty
+    '''
+    data = tuple(x for part in parts for x in part if not isinstance(x, Epsilon))
+    return Alternate(data or (grammar.epsilon,))
+
+def _inline(grammar: Grammar, report: OptimizationReport) -> bool:
+    pinned = {grammar.start}
+    for nonterminal in grammar.data:
+        if isinstance(nonterminal, Repeat):
+            pinned.add(nonterminal)
+            pinned.update(x for x in nonterminal.body if isinstance(x, NonTerminal))
+
+    # single alternates are substituted all at once, through each other
+    bodies = {nonterminal: rule.alts[0].data for nonterminal, rule in grammar.data.items()
+                if len(rule.alts) == 1 and nonterminal not in pinned and
+                    nonterminal not in rule.alts[0].data}
+    expanded: dict[NonTerminal, tuple[GrammarToken, ...]] = {}
+    def expand(nonterminal: NonTerminal, visiting: frozenset) -> tuple[GrammarToken, ...]:
+        if nonterminal not in expanded:
+            expanded[nonterminal] = tuple(
+                y for x in bodies[nonterminal] # pylint: disable=invalid-name
+                    for y in (expand(x, visiting | {nonterminal})
+                              if x in bodies and x not in visiting else (x,)))
+        return expanded[nonterminal]
+
+    used = {x for rule in grammar.data.values() for alt in rule.alts for x in alt.data}
+    inlined = [nonterminal for nonterminal in bodies if nonterminal in used]
+    if inlined:
+        for nonterminal in inlined:
+            expand(nonterminal, frozenset())
+        for owner, rule in grammar.data.items():
+            if isinstance(owner, Repeat) or owner in expanded:
+                continue
+            rule.alts = [_join(grammar, *(expanded[x] if x in expanded else (x,)
+                                            for x in alt.data))
+                            if any(x in expanded for x in alt.data) else alt
+                         for alt in rule.alts]
+        for nonterminal in inlined:
+            del grammar.data[nonterminal]
+            report.inlined.append(str(nonterminal))
+        return True
+
+    # a nonterminal used once, first in an alternate, gives that alternate
+    # one alternate per alternate of its own
+    uses: dict[NonTerminal, list[tuple[NonTerminal, int, int]]] = {}
+    for owner, rule in grammar.data.items():
+        if isinstance(owner, Repeat):
+            continue
+        for idx, alt in enumerate(rule.alts):
+            for position, x in enumerate(alt.data): # pylint: disable=invalid-name
+                if isinstance(x, NonTerminal):
+                    uses.setdefault(x, []).append((owner, idx, position))
+    changed = False
+    for nonterminal, sites in uses.items():
+        if nonterminal in pinned or nonterminal not in grammar.data or \
+                len(sites) != 1 or sites[0][2] != 0 or sites[0][0] == nonterminal:
+            continue
+        owner, idx, _ = sites[0]
+        if owner not in grammar.data or \
+                any(nonterminal in alt.data for alt in grammar.data[nonterminal].alts):
+            continue
+        alts = grammar.data[owner].alts
+        if idx >= len(alts) or not alts[idx].data or alts[idx].data[0] != nonterminal:
+            # the owner was rewritten by an earlier inline of this pass
+            continue
+        rest = alts[idx].data[1:]
+        alts[idx:idx + 1] = [_join(grammar, alt.data, rest)
+                                for alt in grammar.data.pop(nonterminal).alts]
+        report.inlined.append(str(nonterminal))
+        changed = True
+    return changed
+
+def _merge(grammar: Grammar, report: OptimizationReport) -> bool:
+    merged = 0
+    for nonterminal, rule in grammar.data.items():
+        if isinstance(nonterminal, Repeat):
+            continue
+        unique: dict[tuple[GrammarToken, ...], Alternate] = {}
+        for alt in rule.alts:
+            unique.setdefault(alt.data, alt)
+        merged += len(rule.alts) - len(unique)
+        rule.alts = list(unique.values())
+    report.merged += merged
+    return merged > 0
+
+def _factored_name(grammar: Grammar, nonterminal: NonTerminal) -> NonTerminal:
+    symbol = nonterminal.symbol + "'"
+    while NonTerminal(symbol) in grammar.data:
+        symbol += "'"
+    return NonTerminal(symbol)
+
+def _left_factor(grammar: Grammar, report: OptimizationReport) -> bool:
+    changed = False
+    todo = [nonterminal for nonterminal in grammar.data if not isinstance(nonterminal, Repeat)]
+    while todo:
+        nonterminal = todo.pop()
+        rule = grammar.data[nonterminal]
+        groups: dict[GrammarToken, list[Alternate]] = {}
+        for alt in rule.alts:
+            if alt.data and not isinstance(alt.data[0], Epsilon):
+                groups.setdefault(alt.data[0], []).append(alt)
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            prefix = 1
+            while all(len(alt.data) > prefix for alt in group) and \
+                    len({alt.data[prefix] for alt in group}) == 1:
+                prefix += 1
+            if grammar.epsilon is None:
+                grammar.epsilon = Epsilon('ε')
+            factored = _factored_name(grammar, nonterminal)
+            grammar.data[factored] = Rule([_join(grammar, alt.data[prefix:]) for alt in group],
+                                          factored)
+            first = rule.alts.index(group[0])
+            grouped = {id(alt) for alt in group}
+            rule.alts = [alt for alt in rule.alts if id(alt) not in grouped]
+            rule.alts.insert(first, Alternate(group[0].data[:prefix] + (factored,)))
+            report.factored.append(str(factored))
+            todo.append(factored)
+            changed = True
+    return changed
@@ -0,0 +1,170 @@
+'''
+    Module profiler provides opt-in instrumentation for LLParser
+
+    A ParserProfile is handed to LLParser(grammar, profile=...). When no
+    profile is given the parser runs with the plain Stack, TokenReader and
+    parser table, so the instrumentation costs nothing when disabled.
+    When a profile is given, parse() swaps in the counting wrappers below.
+'''
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .elements import NonTerminal, SymbolTable
+from .stack import Stack
+from .tokenizer import Token
+
+ProfilePath = tuple[str, ...]
+
+@dataclass
+class ParserProfile: # pylint: disable=too-many-instance-attributes
+    '''
+        Data class to hold the counters collected by an instrumented LLParser
+
+        expansions = nonterminal symbol -> number of times it was expanded
+        table_lookups = number of parser table lookups
+        max_stack_depth = high-water mark of the parser stack
+        tokens = number of tokens read (spaces excluded)
+        parse_seconds = wall time spent inside parse()
+        fixed_point_iterations = iterations needed to compute first/follow sets
+        phase_seconds = phase name -> wall time spent in _setup_llparser phases
+        samples = nonterminal path -> number of parser steps taken under it
+
+        Counters accumulate over every parse() made with the same profile.
+    '''
+    expansions: Counter = field(default_factory=Counter)
+    table_lookups: int = 0
+    max_stack_depth: int = 0
+    tokens: int = 0
+    parse_seconds: float = 0.0
+    fixed_point_iterations: int = 0
+    phase_seconds: dict[str, float] = field(default_factory=dict)
+    samples: Counter = field(default_factory=Counter)
+
+    @property
+    def tokens_per_second(self) -> float:
+        '''
+            parse throughput, 0.0 when nothing was parsed yet
+        '''
+        if self.parse_seconds <= 0:
+            return 0.0
+        return self.tokens / self.parse_seconds
+
+    def add_phase(self, name: str, seconds: float):
+        '''
+            accumulate the wall time of a setup phase
+        '''
+        self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        '''
+            returns the profile as a plain (json serializable) dict
+        '''
+        return {
+            'expansions': dict(self.expansions),
+            'table_lookups': self.table_lookups,
+            'max_stack_depth': self.max_stack_depth,
+            'tokens': self.tokens,
+            'parse_seconds': self.parse_seconds,
+            'tokens_per_second': self.tokens_per_second,
+            'fixed_point_iterations': self.fixed_point_iterations,
+            'phase_seconds': dict(self.phase_seconds),
+        }
+
+    def collapsed_stacks(self) -> str:
+        '''
+            returns the samples in the collapsed-stack format understood by
+            flamegraph.pl and speedscope, one 'S;E;T count' line per path
+        '''
+        lines = [f'{";".join(path)} {count}'
+                    for path, count in sorted(self.samples.items())]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def write_collapsed(self, filename: str):
+        '''
+            writes collapsed_stacks() to filename
+        '''
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write(self.collapsed_stacks())
+
+class ProfiledStack(Stack[int]):
+    '''
+        Stack of symbol ids that tracks depth, expansions and the
+        nonterminal path of every element it holds.
+
+        An element pushed right after a nonterminal was popped is a child
+        of that nonterminal, which is how LLParser expands productions.
+        Elements pushed with no pop since the last peek are the body of
+        the (w)* loop on top, which stays on the stack, and are children
+        of the loop.
+    '''
+    def __init__(self, profile: ParserProfile, symbols: SymbolTable):
+        super().__init__()
+        self._profile = profile
+        self._symbols = symbols
+        self._paths: list[ProfilePath] = []
+        self._parent: ProfilePath = ()
+        self._peeked = False
+
+    def push(self, element: int):
+        super().push(element)
+        self._paths.append(self._parent)
+        if len(self._paths) > self._profile.max_stack_depth:
+            self._profile.max_stack_depth = len(self._paths)
+
+    def extend(self, elements):
+        if self._peeked and self._paths:
+            self._parent = self._paths[-1] + (str(self._symbols.token(super().peek())),)
+            self._profile.samples[self._parent] += 1
+        for element in elements:
+            self.push(element)
+
+    def peek(self) -> int:
+        self._peeked = True
+        return super().peek()
+
+    def pop(self) -> int:
+        self._peeked = False
+        idx = super().pop()
+        element = self._symbols.token(idx)
+        path = self._paths.pop()
+        if isinstance(element, NonTerminal):
+            self._parent = path + (str(element),)
+            self._profile.expansions[str(element)] += 1
+            self._profile.samples[self._parent] += 1
+        else:
+            self._profile.samples[path or (str(element),)] += 1
+        return idx
+
+class CountingReader: # pylint: disable=too-few-public-methods
+    '''
+        Wraps a TokenReader and counts the tokens handed to the parser
+    '''
+    def __init__(self, reader, profile: ParserProfile):
+        self._reader = reader
+        self._profile = profile
+
+    def nexttoken(self) -> Optional[Token]:
+        '''
+            see TokenReader.nexttoken
+        '''
+        token = self._reader.nexttoken()
+        if token is not None:
+            self._profile.tokens += 1
+        return token
+
+class CountingTable: # pylint: disable=too-few-public-methods
+    '''
+        Wraps a parser table and counts the lookups made through get()
+    '''
+    def __init__(self, table: dict, profile: ParserProfile):
+        self._table = table
+        self._profile = profile
+
+    def get(self, key, default=None):
+        '''
+            see dict.get
+        '''
+        self._profile.table_lookups += 1
+        return self._table.get(key, default)
@@ -1,7 +1,7 @@
 '''
     Module Stack contains generic Stack
 '''
-from typing import Generic, Iterator, TypeVar
+from typing import Generic, Iterable, Iterator, TypeVar
 
 T = TypeVar('T') # pylint: disable=invalid-name
 
@@ -18,6 +18,12 @@ class Stack(Generic[T]):
         '''
         self._data.append(element)
 
+    def extend(self, elements: Iterable[T]):
+        '''
+            push every element in order, the last one ends up on top
+        '''
+        self._data.extend(elements)
+
     def pop(self) -> T:
         '''
             pop
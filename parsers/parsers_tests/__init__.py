@@ -1,4 +1,13 @@
 from .test_tokenizer import TokenizerTests
 from .test_elements import TestElements
-from .test_firstfollowsets import TestFirstFollow
-from .test_llparser import TestLLParser
\ No newline at end of file
+from .test_firstfollowsets import TestFirstFollow, TestBitsetFirstFollow
+from .test_llparser import TestLLParser
+from .test_profiler import TestProfiler
+from .test_checkpoint import TestCheckpoint
+from .test_ff_worklist import TestWorklist
+from .test_grammar_edit import TestGrammarEdit
+from .test_optimizer import TestOptimizer
+from .test_generator import TestGenerator
+from .test_nestedlist import TestNestedList
+from .test_token_class import TestTokenClass
+from .test_cache import TestCache
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from parsers import tokenizer, create_grammar, Alternate, CachedParser, GrammarTerminal, LLParser, NonTerminal, \
+    grammar_fingerprint
+
+class TestCache(unittest.TestCase):
+    '''
+        Outcomes are parsed once, evicted least recently used first and
+        found again on disk
+    '''
+    language = '''
+        S : ( S + F )
+        S : F
+        F : a
+    '''
+
+    def setUp(self):
+        self.tokenized = []
+
+        def tokenize(text):
+            self.tokenized.append(text)
+            return tokenizer(iter(text))
+
+        self.tokenize = tokenize
+
+    def cached(self, **kwargs):
+        parser = LLParser(create_grammar(language_buf=self.language))
+        return CachedParser(parser, tokenize=self.tokenize, **kwargs)
+
+    def test_hits(self):
+        cache = self.cached()
+        cache.parse('( a + a )')
+        cache.parse(b'( a + a )')
+        with self.assertRaises(Exception) as first:
+            cache.parse('( a + )')
+        with self.assertRaises(Exception) as second:
+            cache.parse('( a + )')
+        self.assertEqual(str(first.exception), str(second.exception))
+        self.assertEqual(self.tokenized, ['( a + a )', '( a + )'])
+        self.assertEqual((cache.stats.hits, cache.stats.misses, cache.stats.entries), (2, 2, 2))
+        self.assertEqual(cache.stats.hit_rate, 0.5)
+        self.assertFalse(cache.outcome('( a + )').accepted)
+
+    def test_eviction(self):
+        cache = self.cached()
+        cache.parse('a')
+        entry = cache.stats.size
+        cache.max_bytes = 2 * entry
+        cache.parse('( a + a )')
+        cache.parse('a')
+        cache.parse('( ( a + a ) + a )')
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.entries, 2)
+        self.assertLessEqual(cache.stats.size, cache.max_bytes)
+        # 'a' was used last, '( a + a )' was evicted
+        cache.parse('a')
+        cache.parse('( a + a )')
+        self.assertEqual(self.tokenized.count('a'), 1)
+        self.assertEqual(self.tokenized.count('( a + a )'), 2)
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.cached(directory=directory).outcome('( a + a )')
+            self.assertFalse(self.cached(directory=directory).outcome('( a + ').accepted)
+            cache = self.cached(directory=directory)
+            self.assertTrue(cache.outcome('( a + a )').accepted)
+            self.assertFalse(cache.outcome('( a + ').accepted)
+            self.assertEqual((cache.stats.disk_hits, cache.stats.misses), (2, 0))
+            self.assertEqual(self.tokenized, ['( a + a )', '( a + '])
+
+    def test_fingerprint(self):
+        fingerprint = grammar_fingerprint(create_grammar(language_buf=self.language))
+        self.assertEqual(fingerprint, grammar_fingerprint(
+                            create_grammar(language_buf=self.language)))
+        self.assertNotEqual(fingerprint, grammar_fingerprint(create_grammar(
+                            language_buf=self.language.replace('F : a', 'F : b'))))
+
+        cache = self.cached()
+        self.assertFalse(cache.outcome('b').accepted)
+        cache._parser.add_alternate(NonTerminal('F'), Alternate([GrammarTerminal('b', 'b')]))
+        self.assertTrue(cache.outcome('b').accepted)
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_other_errors_raise(self):
+        def tokenize(text):
+            raise RuntimeError(text)
+
+        cache = CachedParser(LLParser(create_grammar(language_buf=self.language)),
+                             tokenize=tokenize)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                cache.outcome('a')
+        self.assertEqual((cache.stats.misses, cache.stats.entries), (2, 0))
+
+    def test_disk_write_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self.cached(directory=directory)
+            key = (cache.fingerprint, hashlib.blake2b(b'a', digest_size=16).digest())
+            os.mkdir(cache._path(key))
+            self.assertTrue(cache.outcome('a').accepted)
+            self.assertTrue(cache.outcome('a').accepted)
+            self.assertEqual(os.listdir(directory), [os.path.basename(cache._path(key))])
+            self.assertEqual(self.tokenized, ['a'])
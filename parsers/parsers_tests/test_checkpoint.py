@@ -0,0 +1,79 @@
+import unittest
+from itertools import islice
+
+from parsers import tokenizer, create_grammar, Alternate, GrammarTerminal, LLParser, \
+    NonTerminal, ParseCheckpoint
+
+class TestCheckpoint(unittest.TestCase):
+    language = '''
+        S : E
+        E : T Z
+        Z : + T Z
+        Z : e
+        T : a
+        T : ( E )
+    '''
+
+    def setUp(self):
+        grammar = create_grammar(language_buf=self.language,
+                                 epsilon='e')
+        self.llparser = LLParser(grammar)
+        self.tokens = list(tokenizer(iter('a + ( a + a ) + a + ( ( a ) )')))
+
+    def test_checkpoint_bytes(self):
+        checkpoint = ParseCheckpoint(token_offset=12345678901, stack=(0, 3, 7),
+                                     grammar=bytes(range(16)))
+        buffer = checkpoint.to_bytes()
+        self.assertEqual(len(buffer), 36 + 3 * 4)
+        self.assertEqual(ParseCheckpoint.from_bytes(buffer), checkpoint)
+        for bad in [b'XXXX' + buffer[4:], buffer[:4] + b'\x02' + buffer[5:]]:
+            with self.assertRaises(Exception):
+                ParseCheckpoint.from_bytes(bad)
+
+    def test_checkpoint_every(self):
+        checkpoints = []
+        self.llparser.parse(self.tokens, checkpoint_every=5,
+                            on_checkpoint=checkpoints.append)
+        self.assertGreater(len(checkpoints), 3)
+        offsets = [c.token_offset for c in checkpoints]
+        self.assertEqual(offsets, sorted(offsets))
+        for earlier, later in zip(offsets, offsets[1:]):
+            self.assertGreaterEqual(later - earlier, 5)
+
+    def test_resume(self):
+        checkpoints = []
+        self.llparser.parse(self.tokens, checkpoint_every=3,
+                            on_checkpoint=checkpoints.append)
+        for checkpoint in checkpoints:
+            restored = ParseCheckpoint.from_bytes(checkpoint.to_bytes())
+            resumed = []
+            self.llparser.resume(restored,
+                                 islice(self.tokens, restored.token_offset, None),
+                                 checkpoint_every=3,
+                                 on_checkpoint=resumed.append)
+            # resuming takes the same later checkpoints as the full parse
+            self.assertEqual(resumed,
+                [c for c in checkpoints if c.token_offset > restored.token_offset])
+
+    def test_resume_rejects_bad_input(self):
+        checkpoints = []
+        self.llparser.parse(self.tokens, checkpoint_every=4,
+                            on_checkpoint=checkpoints.append)
+        with self.assertRaises(Exception):
+            self.llparser.resume(checkpoints[0], tokenizer(iter('+ +')))
+
+    def test_resume_rejects_other_grammar(self):
+        checkpoints = []
+        self.llparser.parse(self.tokens, checkpoint_every=4,
+                            on_checkpoint=checkpoints.append)
+        checkpoint = ParseCheckpoint.from_bytes(checkpoints[0].to_bytes())
+        rest = self.tokens[checkpoint.token_offset:]
+        other = LLParser(create_grammar(language_buf=self.language.replace('T : a', 'T : b'),
+                                        epsilon='e'))
+        with self.assertRaises(Exception):
+            other.resume(checkpoint, rest)
+        self.llparser.add_alternate(NonTerminal('T'), Alternate([GrammarTerminal('b', 'b')]))
+        with self.assertRaises(Exception):
+            self.llparser.resume(checkpoint, rest)
+        same = LLParser(create_grammar(language_buf=self.language, epsilon='e'))
+        same.resume(checkpoint, rest)
@@ -1,6 +1,7 @@
+import pickle
 import unittest
 
-from parsers import GrammarTerminal
+from parsers import GrammarTerminal, NonTerminal, Start, Eof, Epsilon, Alternate, Rule, Grammar
 
 class TestElements(unittest.TestCase):
     def test_grammarterminal(self):
@@ -22,4 +23,48 @@ class TestElements(unittest.TestCase):
         myset.add(second)
         self.assertEqual(len(myset), 1)
         myset.add(third)
-        self.assertEqual(len(myset), 2)
\ No newline at end of file
+        self.assertEqual(len(myset), 2)
+
+    def test_symbol_table(self):
+        '''
+            Ids are dense, stable across grammar edits and map back to tokens
+        '''
+        start, a, e = Start('S'), GrammarTerminal('a', 'a'), Epsilon('e')
+        grammar = Grammar({a}, {start: Rule([Alternate([a, start]), Alternate([e])], start)},
+                          start, Eof('$'), e)
+        table = grammar.symbol_table()
+        self.assertEqual(table.tokens, [Eof('$'), start, a, e])
+        self.assertEqual(table.terminals, {'a': 2})
+
+        b, other = GrammarTerminal('b', 'b'), NonTerminal('T')
+        grammar.terminals.add(b)
+        grammar.data[other] = Rule([Alternate([b])], other)
+        self.assertIs(grammar.symbol_table(), table)
+        self.assertEqual(table.tokens[:4], [Eof('$'), start, a, e])
+        self.assertEqual([table.ids[other], table.ids[b]], [4, 5])
+        self.assertEqual(table.token(table.intern(GrammarTerminal('b', 5))), b)
+        self.assertEqual(len(table), 6)
+
+    def test_slots(self):
+        '''
+            Elements carry no __dict__ and keep their equality semantics
+        '''
+        elements = [NonTerminal('A'), Start('S'), Eof('$'), Epsilon('e'),
+                    GrammarTerminal('a', 1), Alternate([NonTerminal('A')]),
+                    Rule([], NonTerminal('A'))]
+        for element in elements:
+            self.assertFalse(hasattr(element, '__dict__'))
+            self.assertEqual(pickle.loads(pickle.dumps(element)), element)
+        self.assertEqual(Eof(None), Eof('anything'))
+        self.assertEqual(hash(Eof(None)), hash(Eof('anything')))
+        self.assertNotEqual(Start('S'), NonTerminal('S'))
+        self.assertEqual(Alternate([NonTerminal('A')]).data, (NonTerminal('A'),))
+
+    def test_freeze(self):
+        start, a = Start('S'), GrammarTerminal('a', 'a')
+        grammar = Grammar({a}, {start: Rule([Alternate([a])], start)}, start, Eof('$'), None)
+        self.assertFalse(grammar.frozen)
+        self.assertIs(grammar.freeze(), grammar)
+        self.assertTrue(grammar.frozen)
+        self.assertIsInstance(grammar.terminals, frozenset)
+        self.assertEqual(grammar.data[start].alts, (Alternate([a]),))
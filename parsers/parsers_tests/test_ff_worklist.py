@@ -0,0 +1,75 @@
+import random
+import unittest
+
+from parsers import create_grammar
+from parsers.ff_worklist import first_follow
+from parsers.llparser import LLParser
+
+class TestWorklist(unittest.TestCase):
+    '''
+        The worklist solver has to give the same sets, keys included,
+        as the fixed point loop
+    '''
+    languages = [
+        '''
+        S : F
+        S : ( S + F )
+        F : a
+        ''',
+        '''
+        S : E
+        S : E a
+        E : b
+        E : e
+        ''',
+        '''
+        S : E
+        E : E + a
+        E : b
+        E : c
+        ''',
+        '''
+        Statement : if E then Statement EStatement
+        Statement : a
+        EStatement : else Statement
+        EStatement : e
+        E : b
+        ''',
+        '''
+        S : A B C d
+        A : B C
+        A : e
+        B : C A
+        B : b
+        B : e
+        C : c
+        C : e
+        ''',
+    ]
+
+    def assertSameSets(self, grammar):
+        firsts, follows, _ = LLParser._fixed_point_first_follow(grammar)
+        wfirsts, wfollows, _ = first_follow(grammar)
+        self.assertEqual(wfirsts.data, firsts.data)
+        self.assertEqual(wfollows.data, follows.data)
+
+    def test_languages(self):
+        for language in self.languages:
+            grammar = create_grammar(language_buf=language,
+                                     epsilon='e')
+            self.assertSameSets(grammar)
+
+    def test_random_grammars(self):
+        rng = random.Random(31)
+        for _ in range(200):
+            nonterminals = [f'N{i}' for i in range(rng.randint(1, 6))]
+            symbols = nonterminals + ['a', 'b', 'c']
+            lines = []
+            for nonterminal in nonterminals:
+                for _ in range(rng.randint(1, 3)):
+                    length = rng.randint(0, 4)
+                    rhs = [rng.choice(symbols) for _ in range(length)] or ['e']
+                    lines.append(f'{nonterminal} : {" ".join(rhs)}')
+            grammar = create_grammar(language_buf='\n'.join(lines),
+                                     epsilon='e')
+            self.assertSameSets(grammar)
@@ -1,6 +1,7 @@
 import unittest
 
 from parsers import FirstFollowSet
+from parsers.ll_ff import BitsetFirstFollowSet, TokenIds
 from parsers.elements import GrammarTerminal, NonTerminal, Eof, Epsilon
 
 class TestFirstFollow(unittest.TestCase):
@@ -112,4 +113,81 @@ class TestFirstFollow(unittest.TestCase):
         # also a test for empty return
         t2 = list(reversed(t1))
         self.assertEqual(f.get(t2), set())
-        self.assertEqual(f.get(tuple(t2)), set())
\ No newline at end of file
+        self.assertEqual(f.get(tuple(t2)), set())
+
+def numbered(*token_s) -> TokenIds:
+    ids = TokenIds()
+    for tokens in token_s:
+        for token in tokens:
+            ids.intern(token)
+    return ids
+
+class TestBitsetFirstFollow(unittest.TestCase):
+
+    def test_bitset_add_get(self):
+        t = NonTerminal('a')
+        v1 = [GrammarTerminal('x', 1), Epsilon('e')]
+        v2 = [GrammarTerminal('x', 2), Eof(None)]
+        f = BitsetFirstFollowSet(numbered(v1, v2))
+
+        f.add_empty(t)
+        self.assertEqual(f.dirty, True)
+        self.assertEqual(f.get(t), set())
+        self.assertEqual(len(f.data), 1)
+
+        f.dirty = False
+        f.add(t, v1)
+        self.assertEqual(f.dirty, True)
+        self.assertEqual(f.get([t]), set(v1))
+
+        f.dirty = False
+        f.add(t, v2)
+        self.assertEqual(f.dirty, True)
+        self.assertEqual(f.get(tuple([t])), set(v1).union(v2))
+
+        # nothing new, dirty stays False
+        f.dirty = False
+        f.add(t, v1)
+        self.assertEqual(f.dirty, False)
+
+    def test_bitset_remove(self):
+        t = GrammarTerminal('a', 10)
+        v_add = [GrammarTerminal('x', 10), NonTerminal('y'), Eof('4')]
+        v_remove = [GrammarTerminal('x', 15), NonTerminal('p')]
+        f = BitsetFirstFollowSet(numbered(v_add, v_remove))
+        f.add(t, v_add)
+
+        f.dirty = False
+        f.remove(t, v_remove)
+        self.assertEqual(f.get(t), set(v_add) - set(v_remove))
+        self.assertEqual(f.dirty, True)
+
+        f.dirty = False
+        f.remove(t, v_remove)
+        self.assertEqual(f.dirty, False)
+
+    def test_bitset_shared_ids(self):
+        a, b = GrammarTerminal('a', 1), GrammarTerminal('b', 2)
+        ids = numbered([a, b])
+        firsts, follows = BitsetFirstFollowSet(ids), BitsetFirstFollowSet(ids)
+        firsts.add(NonTerminal('A'), [a])
+        follows.add(NonTerminal('A'), [b])
+        firsts.add_bits(NonTerminal('B'), firsts.get_bits(NonTerminal('A')) |
+                                          follows.get_bits(NonTerminal('A')))
+        self.assertEqual(firsts.get(NonTerminal('B')), {a, b})
+        self.assertEqual(ids.mask([a, b]), 0b11)
+        self.assertEqual(ids.tokens_of(0b10), {b})
+
+    def test_bitset_unknown_token(self):
+        a = GrammarTerminal('a', 1)
+        ids = numbered([a])
+        f = BitsetFirstFollowSet(ids)
+        f.add(NonTerminal('A'), a)
+        for token_s in [GrammarTerminal('b', 2), [a, Eof('$')]]:
+            with self.subTest(token_s=token_s):
+                with self.assertRaises(Exception):
+                    f.add(NonTerminal('A'), token_s)
+                with self.assertRaises(Exception):
+                    f.remove(NonTerminal('A'), token_s)
+        self.assertEqual(len(ids.tokens), 1)
+        self.assertEqual(f.get(NonTerminal('A')), {a})
@@ -0,0 +1,74 @@
+import io
+import itertools
+import unittest
+
+from parsers import tokenizer, create_grammar, LLParser, NonTerminal, SentenceGenerator, min_derivations, text_cost
+
+class TestGenerator(unittest.TestCase):
+    '''
+        Generated sentences are in the language and within the target size
+    '''
+    language = '''
+        S : E
+        E : T Z
+        Z : + T Z
+        Z : e
+        T : ( E )
+        T : a
+        U : U u
+        S : U
+    '''
+
+    def test_min_derivations(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        lengths, cheapest = min_derivations(grammar)
+        self.assertEqual({str(nt): length for nt, length in lengths.items()},
+                         {'S': 1, 'E': 1, 'Z': 0, 'T': 1})
+        self.assertEqual(cheapest[NonTerminal('T')], 1)
+        self.assertEqual(cheapest[NonTerminal('Z')], 1)
+        lengths, _ = min_derivations(grammar, text_cost)
+        self.assertEqual(lengths[NonTerminal('E')], 2)
+
+    def test_sentences_parse(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        llparser = LLParser(create_grammar(
+                            language_buf=self.language.replace('S : U', ''), epsilon='e'))
+        generator = SentenceGenerator(grammar, seed=40)
+        for size in [0, 1, 5, 50, 500]:
+            for _ in range(20):
+                terminals = list(generator.sentence(size))
+                self.assertLessEqual(len(terminals), max(size, 1))
+                llparser.parse(list(tokenizer(iter(' '.join(t.symbol for t in terminals)))))
+
+    def test_weights(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        # never stop a sum while there is room
+        generator = SentenceGenerator(grammar, weights={NonTerminal('Z'): [1, 0]}, seed=1)
+        self.assertGreater(len(list(generator.sentence(200))), 150)
+        with self.assertRaises(Exception):
+            SentenceGenerator(grammar, weights={NonTerminal('Z'): [1]})
+
+    def test_text(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        generator = SentenceGenerator(grammar, seed=2, cost=text_cost)
+        buffer = io.StringIO()
+        written = generator.write(buffer, 10000, chunk=100)
+        text = buffer.getvalue()
+        self.assertEqual(written, len(text))
+        self.assertGreaterEqual(len(text), 10000)
+        self.assertLessEqual(len(text), 10000 + 2)
+        chunks = list(SentenceGenerator(grammar, seed=2, cost=text_cost).text(10000, chunk=100))
+        self.assertEqual(''.join(chunks), text)
+        self.assertLess(max(len(chunk) for chunk in chunks), 200)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_max_depth(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        llparser = LLParser(create_grammar(
+                            language_buf=self.language.replace('S : U', ''), epsilon='e'))
+        generator = SentenceGenerator(grammar, weights={NonTerminal('T'): [3, 1]},
+                                      seed=3, max_depth=10)
+        terminals = [t.symbol for t in generator.sentence(2000)]
+        depth = max(itertools.accumulate({'(': 1, ')': -1}.get(t, 0) for t in terminals))
+        self.assertLessEqual(depth, 10)
+        llparser.parse(list(tokenizer(iter(' '.join(terminals)))))
@@ -0,0 +1,131 @@
+import random
+import unittest
+
+from parsers import tokenizer, create_grammar, Alternate, GrammarTerminal, NonTerminal, Repeat, Rule
+from parsers.llparser import LLParser
+
+class TestGrammarEdit(unittest.TestCase):
+    '''
+        Editing a live parser has to end up with the same sets and tables
+        as building a new parser for the edited grammar
+    '''
+
+    def assertSameAsRebuilt(self, llparser):
+        rebuilt = LLParser(llparser._grammar)
+        self.assertEqual(llparser._firsts.data, rebuilt._firsts.data)
+        self.assertEqual(llparser._follows.data, rebuilt._follows.data)
+        self.assertEqual(llparser._parser_table, rebuilt._parser_table)
+        self.assertEqual(llparser._push_table, rebuilt._push_table)
+        # parse() runs on the id table, which has to mirror the push table
+        self.assertEqual(llparser._id_table,
+                         {llparser._id_key(key): llparser._id_push(key, push)
+                            for key, push in llparser._push_table.items()})
+
+    def test_add_keyword(self):
+        language = '''
+        S : Stmt S
+        S : e
+        Stmt : print E
+        E : a
+        E : b
+        '''
+        grammar = create_grammar(language_buf=language, epsilon='e')
+        llparser = LLParser(grammar)
+        with self.assertRaises(Exception):
+            llparser.parse(list(tokenizer(iter('print a echo b'))))
+
+        echo = GrammarTerminal('echo', 'echo')
+        conflicts = llparser.add_alternate(NonTerminal('Stmt'),
+                                           Alternate([echo, NonTerminal('E')]))
+        self.assertEqual(conflicts, [])
+        self.assertSameAsRebuilt(llparser)
+        llparser.parse(list(tokenizer(iter('print a echo b'))))
+
+        llparser.remove_alternate(NonTerminal('Stmt'),
+                                  Alternate([echo, NonTerminal('E')]))
+        self.assertSameAsRebuilt(llparser)
+        with self.assertRaises(Exception):
+            llparser.parse(list(tokenizer(iter('print a echo b'))))
+
+    def test_report_conflicts(self):
+        language = '''
+        S : A a b
+        A : c
+        A : e
+        '''
+        grammar = create_grammar(language_buf=language, epsilon='e')
+        llparser = LLParser(grammar)
+        a = GrammarTerminal('a', 'a')
+        conflicts = llparser.add_alternate(NonTerminal('A'), Alternate([a]))
+        self.assertEqual(conflicts, [(NonTerminal('A'), a)])
+        self.assertSameAsRebuilt(llparser)
+
+    def test_frozen_grammar(self):
+        language = '''
+        S : x B
+        B : b
+        '''
+        grammar = create_grammar(language_buf=language, epsilon='e').freeze()
+        llparser = LLParser(grammar)
+        llparser.parse(list(tokenizer(iter('x b'))))
+        with self.assertRaises(Exception):
+            llparser.add_alternate(NonTerminal('B'), Alternate([GrammarTerminal('c', 'c')]))
+        with self.assertRaises(Exception):
+            llparser.remove_rule(NonTerminal('B'))
+        self.assertEqual(len(grammar.data[NonTerminal('B')].alts), 1)
+
+    def test_add_repeat(self):
+        language = '''
+        S : x B
+        B : b
+        '''
+        grammar = create_grammar(language_buf=language, epsilon='e')
+        llparser = LLParser(grammar)
+        comma, b = GrammarTerminal(',', ','), GrammarTerminal('b', 'b')
+        llparser.add_alternate(NonTerminal('B'), Alternate([GrammarTerminal('[', '['),
+                                                            Repeat.of([b, comma], '*'),
+                                                            GrammarTerminal(']', ']')]))
+        self.assertSameAsRebuilt(llparser)
+        llparser.parse(list(tokenizer(iter('x [ b , b , ]'))))
+        llparser.parse(list(tokenizer(iter('x [ ]'))))
+
+    def test_add_remove_rule(self):
+        language = '''
+        S : x B
+        B : b
+        '''
+        grammar = create_grammar(language_buf=language, epsilon='e')
+        llparser = LLParser(grammar)
+        c = NonTerminal('C')
+        llparser.add_alternate(NonTerminal('B'), Alternate([c]))
+        llparser.add_rule(Rule(alts=[Alternate([GrammarTerminal('c', 'c')])], ident=c))
+        self.assertSameAsRebuilt(llparser)
+        llparser.parse(list(tokenizer(iter('x c'))))
+        llparser.remove_rule(c)
+        self.assertSameAsRebuilt(llparser)
+
+    def test_random_edits(self):
+        rng = random.Random(33)
+        for _ in range(40):
+            names = [f'N{i}' for i in range(rng.randint(2, 5))]
+            symbols = names + ['a', 'b', 'c']
+            def random_rhs():
+                return [rng.choice(symbols) for _ in range(rng.randint(0, 3))] or ['e']
+            lines = [f'{name} : {" ".join(random_rhs())}' for name in names]
+            grammar = create_grammar(language_buf='\n'.join(lines),
+                                     epsilon='e')
+            tokens = {t.symbol: t for t in grammar.terminals}
+            tokens.update({n.symbol: n for n in grammar.data})
+            tokens['e'] = grammar.epsilon
+            for name in 'abc':
+                tokens.setdefault(name, GrammarTerminal(name, name))
+            llparser = LLParser(grammar)
+            for _ in range(15):
+                nonterminal = rng.choice(list(grammar.data))
+                alts = grammar.data[nonterminal].alts
+                if alts and rng.random() < 0.4:
+                    llparser.remove_alternate(nonterminal, rng.choice(alts))
+                else:
+                    llparser.add_alternate(nonterminal,
+                        Alternate([tokens[x] for x in random_rhs()]))
+                self.assertSameAsRebuilt(llparser)
@@ -1,8 +1,11 @@
 from lib2to3.pgen2 import token
 import unittest
-from parsers import tokenizer, GrammarTerminal, Start, NonTerminal, Rule, Alternate, Eof
-from parsers.elements import Epsilon, Grammar
+from itertools import chain
+from parsers import tokenizer, GrammarTerminal, Start, NonTerminal, Rule, Alternate, Eof, ParserProfile
+from parsers.elements import Epsilon, Grammar, Repeat, TokenClass
+from parsers.tokenizer import TokenType
 from parsers.llparser import LLParser
+from parsers.grammar_text import create_grammar
 
 class TestLLParser(unittest.TestCase):
     '''
@@ -21,78 +24,7 @@ class TestLLParser(unittest.TestCase):
 
         return result
 
-    @staticmethod
-    def create_grammar(language_buf, epsilon=None):
-        '''
-            Test utility to create a grammar
-            $ is reserved
-            Parses NT: singrule[\n|eof]*
-            singlerule = NT or t where t is everything not recognized as NT
-        '''
-
-        parser_lines = language_buf.strip().splitlines()
-
-        nonterminals = {}
-        start = None
-        for p in parser_lines:
-            match p.split(':'):
-                case nonterminal_str, _:
-                    nonterminal_str = nonterminal_str.strip()
-                    if start is None:
-                        start = Start(symbol=nonterminal_str)
-                        nonterminals[nonterminal_str] = start
-                    else:
-                        nonterminals[nonterminal_str] = \
-                            nonterminals.get(nonterminal_str,
-                                NonTerminal(symbol=nonterminal_str))
-                case _:
-                    raise Exception('parse: Unable to parse :{}'.format(p))
-
-        # TODO: do one pass for collecting terminals as well as
-        # generating rules
-        terminals = {}
-
-        for p in parser_lines:
-            _, rulestr = p.split(':')
-            for token in rulestr.split():
-                if token not in nonterminals and token != start.symbol and token != epsilon:
-                    terminals[token] = terminals.get(token,
-                                        GrammarTerminal(symbol=token,
-                                                        val=token))
-
-
-        symbol_db = { start.symbol:start }
-
-        if epsilon:
-            symbol_db[epsilon] =  Epsilon(epsilon)
-
-        symbol_db.update(nonterminals)
-        symbol_db.update(terminals)
-
-        rules = {}
-
-        for p in parser_lines:
-            nonterminal_str, rulestr = p.split(':')
-            nonterminal_sym = nonterminals[nonterminal_str.strip()]
-            altdata = []
-            for token in rulestr.split():
-                altdata.append(symbol_db[token])
-            # this is guarenteed to be nonterminal or start
-            if nonterminal_sym not in rules:
-                rules[nonterminal_sym] = Rule(alts=[], ident = nonterminal_sym)
-            rules[nonterminal_sym].alts.append(Alternate(altdata))
-
-        data = {}
-        for k in nonterminals:
-            data[nonterminals[k]] = rules[nonterminals[k]]
-
-        return Grammar(
-                set(terminals.values()),
-                data,
-                start,
-                Eof('$'),
-                symbol_db.get(epsilon)
-        )
+    create_grammar = staticmethod(create_grammar)
 
     def test_basic_without_parsing(self):
         '''
@@ -335,4 +267,114 @@ class TestLLParser(unittest.TestCase):
                                             epsilon='e')
         llparser = LLParser(grammar)
         p = llparser._parser_table
-        self.assertEqual(len(p[(NonTerminal('EStatement'), GrammarTerminal('else','else'))]), 2)
\ No newline at end of file
+        self.assertEqual(len(p[(NonTerminal('EStatement'), GrammarTerminal('else','else'))]), 2)
+
+    def test_push_table(self):
+        '''
+            Push tuples are pre-reversed, drop ε and collapse the
+            unit chain S -> E -> T when the lookahead fixes it
+            S : E
+            E : T Z
+            Z : + T Z | ε
+            T : b
+        '''
+        language = '''
+        S : E
+        E : T Z
+        Z : + T Z
+        Z : e
+        T : b
+        '''
+        grammar = TestLLParser.create_grammar(language_buf=language,
+                                            epsilon='e')
+        llparser = LLParser(grammar)
+        pushes = {(str(nt), str(t)): ''.join(str(x) for x in push)
+                    for (nt, t), push in llparser._push_table.items()}
+        self.assertDictEqual(pushes, {('S', 'b'): 'ZT',
+                                      ('E', 'b'): 'ZT',
+                                      ('Z', '+'): 'ZT+',
+                                      ('Z', '$'): '',
+                                      ('T', 'b'): 'b'})
+        llparser.parse(list(tokenizer(iter('b + b + b'))))
+
+    def test_parse_records(self):
+        '''
+            Documents separated by EOF tokens or by a separator value
+            are parsed one after the other on a single token iterator
+        '''
+        language = '''
+        S : b E
+        S : E
+        E : a
+        E : e
+        '''
+        grammar = TestLLParser.create_grammar(language_buf=language,
+                                            epsilon='e')
+        llparser = LLParser(grammar)
+
+        stream = chain(tokenizer(iter('b a')), tokenizer(iter('a')),
+                       tokenizer(iter('b')))
+        records = [[t.value for t in r] for r in llparser.parse_records(stream)]
+        self.assertEqual(records, [['b', 'a'], ['a'], ['b']])
+
+        stream = tokenizer(iter('b a ; a ; ; b'))
+        records = [[t.value for t in r]
+                    for r in llparser.parse_records(stream, separator=';')]
+        self.assertEqual(records, [['b', 'a'], ['a'], ['b']])
+
+        with self.assertRaises(Exception):
+            list(llparser.parse_records(tokenizer(iter('b a ; a a')),
+                                        separator=';'))
+
+    def test_repeat(self):
+        '''
+            EBNF repetitions, nested ones included
+            S : a (, a)*  |  [ (a (; a)*)? ]  |  + (b)+
+        '''
+        a, b, comma, semicolon, plus = (GrammarTerminal(x, x) for x in 'ab,;+')
+        opening, closing = GrammarTerminal('[', '['), GrammarTerminal(']', ']')
+        start = Start('S')
+        inner = Repeat.of([a, Repeat.of([semicolon, a], '*')], '?')
+        grammar = Grammar({a, b, comma, semicolon, plus, opening, closing},
+                          {start: Rule([Alternate([a, Repeat.of([comma, a], '*')]),
+                                        Alternate([opening, inner, closing]),
+                                        Alternate([plus, Repeat.of([b], '+')])], start)},
+                          start, Eof('$'), None)
+        llparser = LLParser(grammar)
+        # the repeat rules are generated, with an epsilon
+        self.assertIn(Repeat.of([semicolon, a], '*'), grammar.data)
+        self.assertIn(Repeat.of([b], '*'), grammar.data)
+        self.assertIsNotNone(grammar.epsilon)
+
+        for text in ['a', 'a , a , a', '[ ]', '[ a ]', '[ a ; a ; a ]', '+ b', '+ b b b']:
+            llparser.parse(list(tokenizer(iter(text))))
+        for text in ['a ,', 'a a', '[ a ; ]', '[ ; a ]', '+', '+ b a']:
+            with self.assertRaises(Exception):
+                llparser.parse(list(tokenizer(iter(text))))
+
+    def test_repeat_loop(self):
+        '''
+            (, a)* stays on the stack: no expansion per element and
+            a constant stack depth
+        '''
+        a, comma = GrammarTerminal('a', 'a'), GrammarTerminal(',', ',')
+        start = Start('S')
+        loop = Repeat.of([comma, a], '*')
+        grammar = Grammar({a, comma}, {start: Rule([Alternate([a, loop])], start)},
+                          start, Eof('$'), Epsilon('e'))
+        for items in (2, 200):
+            profile = ParserProfile()
+            LLParser(grammar, profile=profile).parse(
+                list(tokenizer(iter(' , '.join(['a'] * items)))))
+            self.assertEqual(profile.expansions, {'S': 1, str(loop): 1})
+            self.assertEqual(profile.max_stack_depth, 4)
+
+    def test_repeat_empty_body(self):
+        a = GrammarTerminal('a', 'a')
+        start, empty = Start('S'), NonTerminal('E')
+        epsilon = Epsilon('e')
+        grammar = Grammar({a}, {start: Rule([Alternate([Repeat.of([empty], '*'), a])], start),
+                                empty: Rule([Alternate([epsilon])], empty)},
+                          start, Eof('$'), epsilon)
+        with self.assertRaises(Exception):
+            LLParser(grammar)
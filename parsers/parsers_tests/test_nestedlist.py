@@ -0,0 +1,46 @@
+import sys
+import unittest
+
+from parsers import parse_flat, parse_nested
+
+class TestNestedList(unittest.TestCase):
+    '''
+        Both parsers agree, reject what the grammar does not derive and
+        go deeper than the recursion limit
+    '''
+    def test_nested(self):
+        self.assertEqual(parse_nested('[test, me, [I, am, nested, [no, kidding]]]'),
+                         ['test', 'me', ['I', 'am', 'nested', ['no', 'kidding']]])
+        self.assertEqual(parse_nested(' [ [ ] ,x ] '), [[], 'x'])
+        self.assertEqual(parse_nested('[]'), [])
+
+    def test_flat(self):
+        flat = parse_flat('[a, [b, [c]], d]')
+        self.assertEqual(flat.words, [None, 'a', None, 'b', None, 'c', 'd'])
+        self.assertEqual(list(flat.parents), [-1, 0, 0, 2, 2, 4, 0])
+        self.assertEqual(list(flat.ends), [7, 2, 6, 4, 6, 6, 7])
+        self.assertEqual(list(flat.children(0)), [1, 2, 6])
+        self.assertEqual(list(flat.children(2)), [3, 4])
+        self.assertEqual(flat.to_nested(), parse_nested('[a, [b, [c]], d]'))
+
+    def test_errors(self):
+        for text in ['', 'a', '[', ']', '[a b]', '[a,]', '[,a]', '[a,,b]', '[a][b]', '[[a] b]']:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    parse_nested(text)
+                with self.assertRaises(Exception):
+                    parse_flat(text)
+
+    def test_deep(self):
+        depth = sys.getrecursionlimit() * 20
+        text = '[a,' * depth + 'b' + ']' * depth
+        flat = parse_flat(text)
+        self.assertEqual(len(flat), 2 * depth + 1)
+        self.assertEqual(flat.parents[-1], 2 * (depth - 1))
+        nested = parse_nested(text)
+        levels = 0
+        while len(nested) == 2:
+            self.assertEqual(nested[0], 'a')
+            nested = nested[1]
+            levels += 1
+        self.assertEqual((levels, nested), (depth, 'b'))
@@ -0,0 +1,113 @@
+import itertools
+import random
+import unittest
+
+from parsers import (tokenizer, create_grammar, LLParser, NonTerminal, ParseException, Token,
+                     TokenizerException, TokenType)
+from parsers.optimizer import optimize_grammar
+
+class TestOptimizer(unittest.TestCase):
+    '''
+        The optimized grammar accepts the same language with a smaller table
+    '''
+    language = '''
+        S : A
+        S : x y
+        S : x z
+        S : U
+        A : B c
+        B : b
+        B : d
+        B : d
+        D : a
+        U : U u
+    '''
+
+    def test_passes(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        optimized, report = optimize_grammar(grammar)
+        self.assertEqual(report.unproductive, ['U'])
+        self.assertEqual(report.unreachable, ['D'])
+        self.assertEqual(report.merged, 1)
+        self.assertEqual(report.inlined, ['A', 'B'])
+        self.assertEqual(report.factored, ["S'"])
+        self.assertEqual({str(nt): [str(alt) for alt in rule.alts]
+                            for nt, rule in optimized.data.items()},
+                         {'S': ['bc', 'dc', "xS'"], "S'": ['y', 'z']})
+        # the input grammar is left as it was
+        self.assertIn(NonTerminal('D'), grammar.data)
+
+    def test_report(self):
+        grammar = create_grammar(language_buf=self.language, epsilon='e')
+        llparser = LLParser(grammar, optimize=True)
+        report = llparser.optimization
+        self.assertEqual((report.productions_before, report.productions_after), (10, 5))
+        self.assertEqual((report.conflicts_before, report.conflicts_after), (2, 0))
+        self.assertLess(report.table_cells_after, report.table_cells_before)
+        self.assertIn('conflicts: 2 -> 0', str(report))
+        for text in ['b c', 'd c', 'x y', 'x z']:
+            llparser.parse(list(tokenizer(iter(text))))
+        plain = LLParser(create_grammar(language_buf=self.language, epsilon='e'))
+        self.assertEqual((report.table_cells_before, report.conflicts_before),
+                         (len(plain._parser_table), plain._conflicts()))
+
+    def test_input_untouched(self):
+        grammar = create_grammar(language_buf='''
+            S : x a* A
+            A : a b
+            A : a c
+        ''')
+        LLParser(grammar, optimize=True)
+        self.assertEqual(grammar, create_grammar(language_buf='''
+            S : x a* A
+            A : a b
+            A : a c
+        '''))
+        self.assertIsNone(grammar.epsilon)
+        self.assertIsNone(grammar._symbols)
+
+    def test_empty_alternate(self):
+        grammar = create_grammar(language_buf='''
+            S : x A
+            A : a b
+            A : a c
+            A :
+        ''')
+        llparser = LLParser(grammar, optimize=True)
+        self.assertEqual(llparser.optimization.factored, ["A'"])
+        for text in ['x a b', 'x a c']:
+            llparser.parse(list(tokenizer(iter(text))))
+
+    def test_same_language(self):
+        rng = random.Random(39)
+        for _ in range(200):
+            names = [f'N{i}' for i in range(rng.randint(1, 5))]
+            symbols = names + ['a', 'b', 'c']
+            lines = [f'{name} : {" ".join(rng.choice(symbols) for _ in range(rng.randint(0, 3))) or "e"}'
+                        for name in names for _ in range(rng.randint(1, 3))]
+            language = '\n'.join(lines)
+            llparser = LLParser(create_grammar(language_buf=language, epsilon='e'))
+            if llparser._conflicts():
+                continue
+            try:
+                optimized = LLParser(create_grammar(language_buf=language, epsilon='e'),
+                                     optimize=True)
+            except Exception as error: # pylint: disable=broad-except
+                # only a start that derives no sentence has no optimized grammar
+                self.assertIn('derives no sentence', str(error))
+                continue
+            self.assertEqual(optimized.optimization.conflicts_after, 0)
+            for length in range(4):
+                for words in itertools.product('abc', repeat=length):
+                    tokens = list(tokenizer(iter(' '.join(words)))) if words \
+                                else [Token(TokenType.EOF, None)]
+                    self.assertEqual(self.accepts(llparser, tokens),
+                                     self.accepts(optimized, tokens), (language, words))
+
+    @staticmethod
+    def accepts(llparser, tokens):
+        try:
+            llparser.parse(tokens)
+        except (ParseException, TokenizerException):
+            return False
+        return True
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from parsers import tokenizer, create_grammar, Alternate, Eof, Epsilon, Grammar, GrammarTerminal, \
+    LLParser, NonTerminal, ParserProfile, Repeat, Rule, Start
+
+class TestProfiler(unittest.TestCase):
+    language = '''
+        S : F
+        S : ( S + F )
+        F : a
+    '''
+
+    def test_profile_counters(self):
+        grammar = create_grammar(language_buf=self.language)
+        profile = ParserProfile()
+        llparser = LLParser(grammar, profile=profile)
+
+        self.assertGreater(profile.fixed_point_iterations, 0)
+        self.assertEqual(set(profile.phase_seconds),
+                         {'first_follow', 'parser_table'})
+
+        llparser.parse(list(tokenizer(iter('( a + a )'))))
+
+        # S -> ( S + F ), S -> F -> a (unit chain collapsed), F -> a
+        self.assertEqual(profile.expansions, {'S': 2, 'F': 1})
+        self.assertEqual(profile.table_lookups, 3)
+        # ( a + a ) and EOF
+        self.assertEqual(profile.tokens, 6)
+        # $ ) F + S after expanding S -> ( S + F ) and popping (
+        self.assertEqual(profile.max_stack_depth, 6)
+        self.assertGreater(profile.tokens_per_second, 0)
+
+    def test_profile_accumulates(self):
+        grammar = create_grammar(language_buf=self.language)
+        profile = ParserProfile()
+        llparser = LLParser(grammar, profile=profile)
+        llparser.parse(list(tokenizer(iter('a'))))
+        llparser.parse(list(tokenizer(iter('a'))))
+        self.assertEqual(profile.expansions, {'S': 2})
+
+    def test_collapsed_stacks(self):
+        grammar = create_grammar(language_buf=self.language)
+        profile = ParserProfile()
+        llparser = LLParser(grammar, profile=profile)
+        llparser.parse(list(tokenizer(iter('( a + a )'))))
+
+        lines = profile.collapsed_stacks().splitlines()
+        # S expansion plus ( + ) matched directly under S
+        self.assertEqual(lines, ['$ 1', 'S 4', 'S;F 2', 'S;S 2'])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'parse.folded')
+            profile.write_collapsed(filename)
+            with open(filename, encoding='utf-8') as file:
+                self.assertEqual(file.read(), profile.collapsed_stacks())
+
+    def test_collapsed_stacks_loop(self):
+        a, b, comma = (GrammarTerminal(x, x) for x in 'ab,')
+        start, item = Start('S'), NonTerminal('I')
+        loop = Repeat.of([comma, item], '*')
+        grammar = Grammar({a, b, comma}, {start: Rule([Alternate([a, loop])], start),
+                                          item: Rule([Alternate([b])], item)},
+                          start, Eof('$'), Epsilon('e'))
+        profile = ParserProfile()
+        LLParser(grammar, profile=profile).parse(list(tokenizer(iter('a , b , b'))))
+
+        # the body of the loop, pushed while it stays on the stack, is
+        # under the loop: 2 loop steps, 2 commas and leaving the loop
+        self.assertEqual(profile.collapsed_stacks().splitlines(),
+                         ['$ 1', 'S 2', 'S;(, I)* 5', 'S;(, I)*;I 4'])
+        self.assertEqual(profile.expansions, {'S': 1, str(loop): 1, 'I': 2})
+
+    def test_as_dict(self):
+        grammar = create_grammar(language_buf=self.language)
+        profile = ParserProfile()
+        LLParser(grammar, profile=profile).parse(list(tokenizer(iter('a'))))
+        result = profile.as_dict()
+        self.assertEqual(result['expansions'], {'S': 1})
+        self.assertIn('tokens_per_second', result)
+        self.assertIn('first_follow', result['phase_seconds'])
@@ -0,0 +1,91 @@
+import unittest
+from itertools import chain
+
+from parsers import tokenizer, create_grammar, LLParser, SentenceGenerator, TokenClass, TokenType
+
+class TestTokenClass(unittest.TestCase):
+    '''
+        <INT>, <NAME> and <STRING> match any token of their TokenType,
+        literal terminals first
+    '''
+    language = '''
+        S : let <NAME> = V
+        S : print V
+        V : <INT>
+        V : <STRING>
+        V : <NAME>
+        V : none
+    '''
+
+    def parser(self):
+        return LLParser(create_grammar(language_buf=self.language))
+
+    def test_classes(self):
+        parser = self.parser()
+        for text in ['let x = 42', "let x = 'hello'", 'let x = y', 'print 7', 'let x = none']:
+            with self.subTest(text=text):
+                parser.parse(tokenizer(iter(text)))
+        for text in ['let 5 = 42', 'let x = =', 'let let = 1', 'print']:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    parser.parse(tokenizer(iter(text)))
+
+    def test_literal_first(self):
+        parser = LLParser(create_grammar(language_buf='''
+            S : none !
+            S : <NAME> ?
+        '''))
+        parser.parse(tokenizer(iter('none !')))
+        parser.parse(tokenizer(iter('other ?')))
+        with self.assertRaises(Exception):
+            parser.parse(tokenizer(iter('none ?')))
+
+    def test_numeric_literal_first(self):
+        parser = LLParser(create_grammar(language_buf='''
+            S : 0 !
+            S : <INT> ?
+        '''))
+        parser.parse(tokenizer(iter('0 !')))
+        parser.parse(tokenizer(iter('7 ?')))
+        for text in ['0 ?', '7 !']:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    parser.parse(tokenizer(iter(text)))
+
+    def test_numeric_symbols(self):
+        parser = LLParser(create_grammar(language_buf='''
+            S : 5 a
+            S : 05 b
+            S : ½ c
+        '''))
+        terminals = parser._symbols.terminals
+        self.assertEqual({key for key in terminals if key not in ('a', 'b', 'c')}, {5, '05', '½'})
+        self.assertEqual(len({terminals[5], terminals['05'], terminals['½']}), 3)
+        parser.parse(tokenizer(iter('5 a')))
+        # the tokenizer reads 05 as the INT 5
+        for text in ['5 b', '05 b']:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    parser.parse(tokenizer(iter(text)))
+
+    def test_table_size(self):
+        parser = self.parser()
+        cells = len(parser._id_table)
+        tokens = chain.from_iterable(tokenizer(iter(f'let v{i} = {i}')) for i in range(1000))
+        records = list(parser.parse_records(tokens))
+        self.assertEqual(len(records), 1000)
+        self.assertEqual([t.value for t in records[-1]], ['let', 'v999', '=', 999])
+        self.assertEqual(len(parser._id_table), cells)
+        self.assertEqual(len(parser._symbols.classes), 3)
+
+    def test_of(self):
+        self.assertEqual(TokenClass.of(TokenType.INT), TokenClass.of(TokenType.INT))
+        self.assertEqual(str(TokenClass.of(TokenType.NAME)), '<NAME>')
+        with self.assertRaises(Exception):
+            TokenClass.of(TokenType.SPACE)
+
+    def test_generated_text_parses(self):
+        grammar = create_grammar(language_buf=self.language)
+        parser = LLParser(create_grammar(language_buf=self.language))
+        for line in ''.join(SentenceGenerator(grammar, seed=4).text(200)).splitlines():
+            parser.parse(tokenizer(iter(line)))